@@ -0,0 +1,321 @@
+import json
+import random
+import threading
+import time
+import unittest
+from unittest import mock
+
+from flask import Flask, g
+
+from blueprints import trip_plan
+from core.algorithms import NSGAIIAlgorithm
+from core.testing import make_places
+from services.job_queue import JobQueue, SUCCEEDED, DEFAULT_LANE, QUICK_LANE, current_job
+from services.result_cache import ResultCache
+
+FORM_DATA = {
+    'p_name': '台北三日遊',
+    'city': 1,
+    'budget': 3000,
+    'ngen': 5,
+    'travel_mode': False,
+    'place_types_keywords': {1: ['museum']},
+    'daily_depart_time': '09:00',
+    'daily_return_time': '21:00',
+    'departure_datetime': '2024-11-19T09:00',
+    'return_datetime': '2024-11-21T18:00'
+}
+
+RESULT = {'journey_data': {'journey': [], 'route': {}, 'recommended_places': [],
+                           'form_data': {'uuid': 'preference'}},
+          'uuid': 'preference'}
+
+
+def fake_plan_trip(app, form_data, user_id=None, **kwargs):
+    """取代搜尋景點、GA 與路線規劃"""
+    return RESULT
+
+
+class TripPlanTestCase(unittest.TestCase):
+    """以測試用的 Flask app 掛載 trip_plan blueprint，工作佇列與規劃流程以假物件取代"""
+
+    def setUp(self):
+        app = Flask(__name__)
+        app.secret_key = 'test'
+        app.register_blueprint(trip_plan.trip_plan_bp)
+        app.add_url_rule('/', 'homepage', lambda: 'home')
+        app.before_request(lambda: setattr(g, 'user', None))
+        self.app = app
+        self.client = app.test_client()
+
+        self.queue = JobQueue(max_workers=1, lanes={QUICK_LANE: 1})
+        self.addCleanup(self.queue.shutdown)
+        self.patch('job_queue', self.queue)
+
+    def patch(self, name, value):
+        patcher = mock.patch.object(trip_plan, name, value)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def stub_form(self):
+        """表單前處理與驗證直接回傳 FORM_DATA，快取停用"""
+        form_service = mock.Mock()
+        form_service.return_value.pre_process_form_data.return_value = dict(FORM_DATA)
+        self.patch('PreferenceFormService', form_service)
+        validator = mock.Mock()
+        validator.validate_form_data.return_value = []
+        self.patch('PreferenceValidator', validator)
+        self.patch('clear_journey_data', lambda: None)
+        self.patch('_result_cache_key', lambda form_data: None)
+
+    def submit(self, func, *args, owner='alice'):
+        """以 owner 的身分加入工作，並讓 client 的 session 成為擁有者"""
+        with self.client.session_transaction() as session:
+            session['job_owner'] = owner
+        return self.queue.submit(func, *args, owner=owner)
+
+    def wait_done(self, job_id, owner='alice', timeout=5.0):
+        job = self.queue.get(job_id, owner=owner)
+        deadline = time.time() + timeout
+        while not job.done and time.time() < deadline:
+            job.wait(job.version, timeout=0.1)
+        self.assertTrue(job.done)
+        return job
+
+
+class TestPlanJobs(TripPlanTestCase):
+    def test_trip_planning_queues_job_and_returns_result(self):
+        self.stub_form()
+        self.patch('plan_trip', fake_plan_trip)
+
+        response = self.client.post('/trip_plan/trip_planning', data={})
+        self.assertEqual(response.status_code, 202)
+        body = response.get_json()
+        job_id = body['job_id']
+        self.assertEqual(body['status_url'], f'/trip_plan/jobs/{job_id}')
+
+        with self.client.session_transaction() as session:
+            owner = session['job_owner']
+        self.wait_done(job_id, owner=owner)
+
+        status = self.client.get(body['status_url']).get_json()
+        self.assertEqual(status['status'], SUCCEEDED)
+        self.assertEqual(status['result_url'], body['result_url'])
+
+        result = self.client.get(body['result_url'], headers={'Accept': 'application/json'})
+        self.assertEqual(result.get_json(), {'status': 'OK', **RESULT})
+
+        # 瀏覽器直接開啟時保存到 session 並導向結果頁面
+        response = self.client.get(body['result_url'])
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response.location.endswith('/trip_plan/show_result'))
+        with self.client.session_transaction() as session:
+            self.assertEqual(session['journey_data'], RESULT['journey_data'])
+
+    def test_other_sessions_cannot_read_job(self):
+        job_id = self.submit(fake_plan_trip, None, FORM_DATA)
+        self.wait_done(job_id)
+
+        other = self.app.test_client()
+        self.assertEqual(other.get(f'/trip_plan/jobs/{job_id}').status_code, 404)
+        response = other.get(f'/trip_plan/jobs/{job_id}/result',
+                             headers={'Accept': 'application/json'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_unowned_jobs_are_hidden(self):
+        job_id = self.queue.submit(fake_plan_trip, None, FORM_DATA)
+        self.assertEqual(self.client.get(f'/trip_plan/jobs/{job_id}').status_code, 404)
+
+
+def read_events(response):
+    """把 SSE 回應拆成 (event, data)，略過 keep-alive 註解"""
+    for chunk in response.iter_encoded():
+        for message in chunk.decode('utf-8').split('\n\n'):
+            lines = dict(line.split(': ', 1) for line in message.splitlines()
+                         if not line.startswith(':'))
+            if 'event' in lines:
+                yield lines['event'], json.loads(lines['data'])
+
+
+class TestJobEvents(TripPlanTestCase):
+    def test_progress_then_done(self):
+        release = threading.Event()
+
+        def work():
+            current_job().report({'stage': 'plan', 'generation': 1})
+            release.wait(5)
+            return RESULT
+
+        job_id = self.submit(work)
+        response = self.client.get(f'/trip_plan/jobs/{job_id}/events', buffered=False)
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        events = read_events(response)
+        self.assertEqual(next(events), ('progress', {'stage': 'plan', 'generation': 1}))
+
+        release.set()
+        self.assertEqual(next(events), ('done', {
+            'status': SUCCEEDED, 'error': None,
+            'result_url': f'/trip_plan/jobs/{job_id}/result'}))
+        self.assertEqual(list(events), [])
+        response.close()
+
+    def test_keep_alive_without_progress(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        self.patch('SSE_KEEPALIVE_SECONDS', 0.05)
+        job_id = self.submit(release.wait, 5)
+
+        response = self.client.get(f'/trip_plan/jobs/{job_id}/events', buffered=False)
+        chunks = response.iter_encoded()
+        self.assertIn(b': keep-alive', b''.join(next(chunks) for _ in range(2)))
+        response.close()
+
+    def test_events_require_owner(self):
+        job_id = self.submit(lambda: RESULT)
+        self.wait_done(job_id)
+        other = self.app.test_client()
+        self.assertEqual(other.get(f'/trip_plan/jobs/{job_id}/events').status_code, 404)
+
+
+class TestStopJob(TripPlanTestCase):
+    def test_stop_reaches_ga_stopping_config(self):
+        places = make_places(30, random.Random(3))
+        form_data = dict(FORM_DATA, ngen=100000)
+        algorithms = []
+
+        class RecordingNSGAII(NSGAIIAlgorithm):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                algorithms.append(self)
+
+        self.patch('NSGAIIAlgorithm', RecordingNSGAII)
+        self.patch('GA_ISLANDS', 1)
+        self.patch('print_trip_statistics', lambda *args: None)
+        started = threading.Event()
+
+        def work():
+            # 停止要求送出後才開始 GA
+            started.wait(5)
+            return trip_plan.run(places, form_data, current_job())
+
+        job_id = self.submit(work)
+        response = self.client.post(f'/trip_plan/jobs/{job_id}/stop')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.get_json()['stop_requested'])
+        started.set()
+
+        job = self.wait_done(job_id, timeout=60)
+        self.assertEqual(job.status, SUCCEEDED)
+        self.assertTrue(job.result)
+        algo, = algorithms
+        self.assertTrue(algo.stopping.stop_requested())
+        self.assertEqual(algo.stop_reason, 'stopped')
+        self.assertEqual(algo.generations, 0)
+
+    def test_stop_requires_owner(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        job_id = self.submit(release.wait, 5)
+
+        other = self.app.test_client()
+        self.assertEqual(other.post(f'/trip_plan/jobs/{job_id}/stop').status_code, 404)
+        self.assertFalse(self.queue.get(job_id, owner='alice').stop_requested)
+
+
+class TestQuickPlanWhenBusy(TripPlanTestCase):
+    def setUp(self):
+        super().setUp()
+        self.stub_form()
+        self.calls = []
+
+        def record_plan_trip(app, form_data, user_id=None, quick=False):
+            self.calls.append((quick, current_job().lane))
+            return RESULT
+
+        self.patch('plan_trip', record_plan_trip)
+        # 佔住預設 lane 唯一的 worker
+        release = threading.Event()
+        self.addCleanup(release.set)
+        self.submit(release.wait, 5)
+        self.assertTrue(self.queue.saturated)
+
+    def post(self):
+        response = self.client.post('/trip_plan/trip_planning', data={})
+        self.assertEqual(response.status_code, 202)
+        return response.get_json()
+
+    def test_busy_queue_plans_quickly_on_separate_lane(self):
+        self.patch('QUICK_PLAN_WHEN_BUSY', True)
+        body = self.post()
+        self.assertTrue(body['quick'])
+
+        # 預設 lane 仍被佔住時，快速規劃在 quick lane 完成
+        with self.client.session_transaction() as session:
+            owner = session['job_owner']
+        self.assertEqual(self.wait_done(body['job_id'], owner=owner).status, SUCCEEDED)
+        self.assertEqual(self.calls, [(True, QUICK_LANE)])
+        result = self.client.get(body['result_url'], headers={'Accept': 'application/json'})
+        self.assertEqual(result.get_json(), {'status': 'OK', **RESULT})
+
+    def test_disabled_by_default(self):
+        self.assertFalse(trip_plan.QUICK_PLAN_WHEN_BUSY)
+        body = self.post()
+        self.assertFalse(body['quick'])
+        job = self.queue.get(body['job_id'], owner='alice')
+        self.assertEqual((job.lane, job.done), (DEFAULT_LANE, False))
+
+
+class TestResultCacheRefresh(TripPlanTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = ResultCache()
+        self.patch('result_cache', self.cache)
+        self.patch('_result_cache_key', lambda form_data: 'key')
+        self.preference_service = self.patch('PreferenceService', mock.Mock())
+
+    def test_cache_hit_refreshes_without_owner(self):
+        self.stub_form()
+        # stub_form() 停用快取，這裡重新啟用
+        self.patch('_result_cache_key', lambda form_data: 'key')
+        self.patch('RESULT_CACHE_REFRESH', True)
+        self.preference_service.return_value.save_preference.return_value.p_id = 'new'
+        self.cache.put('key', RESULT)
+        calls = []
+
+        def record_plan_trip(app, form_data, user_id=None, **kwargs):
+            calls.append(kwargs)
+            return RESULT
+
+        self.patch('plan_trip', record_plan_trip)
+        response = self.client.post('/trip_plan/trip_planning', data={})
+        self.assertEqual(response.get_json()['cached'], True)
+        with self.client.session_transaction() as session:
+            self.assertEqual(session['journey_data']['form_data']['uuid'], 'new')
+
+        self.queue.shutdown()
+        self.assertEqual(calls, [{'refresh': True}])
+        self.preference_service.return_value.save_preference.assert_called_once()
+
+    def test_refresh_only_updates_cache(self):
+        self.preference_service.return_value.search_available_places.return_value = [{'place_id': 'a'}]
+        form_service = self.patch('PreferenceFormService', mock.Mock())
+        form_service.return_value.post_process_form_data.side_effect = \
+            lambda form_data, preference_uuid: form_data
+        journey_service = self.patch('JourneyDataService', mock.Mock())
+        journey_service.return_value.process_journey_data.return_value = ([{'place_id': 'a'}], [])
+        routes_api = self.patch('GoogleRoutesAPI', mock.Mock())
+        routes_api.return_value.get_route_info.return_value = {'status': 'ERROR'}
+        places_api = self.patch('GooglePlacesAPI', mock.Mock())
+        self.patch('run', lambda places, form_data, job=None, quick=False: [[{'place_id': 'a'}]])
+
+        result = trip_plan.plan_trip(self.app, dict(FORM_DATA), refresh=True)
+        self.assertIsNone(result['uuid'])
+        self.assertEqual(self.cache.get('key'), result)
+        # 不儲存偏好，也不向 Google 取得景點
+        self.preference_service.return_value.save_preference_and_fetch_places.assert_not_called()
+        self.preference_service.return_value.save_preference.assert_not_called()
+        places_api.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
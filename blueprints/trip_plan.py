@@ -1,36 +1,51 @@
 from datetime import datetime, timedelta
-from flask import Blueprint, render_template, request, flash, redirect, url_for, g, session, jsonify
-from extensions import db
-from config import API_KEY, NEARBY_URL, DETAIL_URL, DIRECTIONS_URL
+from flask import Blueprint, render_template, request, flash, redirect, url_for, g, session, jsonify, current_app, \
+    Response
+from extensions import db, job_queue, result_cache
+from config import API_KEY, NEARBY_URL, DETAIL_URL, DIRECTIONS_URL, GA_PROCESSES, GA_BATCH_EVALUATION, \
+    GA_DELTA_EVALUATION, \
+    GA_FITNESS_CACHE_SIZE, GA_TIME_LIMIT, GA_MAX_EVALUATIONS, GA_PLATEAU_GENERATIONS, GA_ISLANDS, \
+    GA_SEED_STORE_DIR, GA_SEED_STORE_MAX_FILES, GA_LOCAL_SEARCH_INTERVAL, GA_LOCAL_SEARCH_FINAL, RESULT_CACHE_REFRESH, \
+    EXACT_SOLVER_MAX_PLACES, QUICK_PLAN_WHEN_BUSY
+import copy
 import json
 import logging
+import uuid
 from api.google_routes import GoogleRoutesAPI
 from api.google_places import GooglePlacesAPI
 from services.journey_data_service import JourneyDataService
-from services.journey_service import JourneyService
 from services.preference_service import PreferenceService
+from services.place_service import PlaceService
 from services.form_data_service import PreferenceFormService
+from services.job_queue import JobError, SUCCEEDED, FAILED, DEFAULT_LANE, QUICK_LANE, current_job
 from utils.session_utils import clear_journey_data
 from utils.validators import PreferenceValidator
 from core.read_from_csv import DictReader
-from core.algorithms import NSGAIIAlgorithm
+from core.algorithms import NSGAIIAlgorithm, IslandNSGAIIAlgorithm, ExactAlgorithm, QuickPlanAlgorithm, \
+    StoppingConfig, LocalSearchConfig
+from core.seed_store import SeedStore
 
 trip_plan_bp = Blueprint('trip_plan', __name__, url_prefix='/trip_plan')
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# SSE 沒有新進度時送出 keep-alive 的間隔秒數
+SSE_KEEPALIVE_SECONDS = 15
+
 
 @trip_plan_bp.route('/trip_planning', methods=['POST'])
 def trip_planning():
-    """處理偏好設定表單提交"""
-    try:
-        form_data_service = PreferenceFormService(db.session)
-        preference_service = PreferenceService(db.session)
-        journey_service = JourneyService(db.session)
-        journey_data_service = JourneyDataService()
-        google_api = GooglePlacesAPI(API_KEY, NEARBY_URL, DETAIL_URL)
-        routes_api = GoogleRoutesAPI(API_KEY, DIRECTIONS_URL)
+    """
+    處理偏好設定表單提交
 
+    表單驗證後將行程規劃加入背景工作佇列並立即回傳工作 ID（202），
+    前端以 /trip_plan/jobs/<job_id> 輪詢狀態（或以 /trip_plan/jobs/<job_id>/events 接收 SSE 進度），
+    完成後前往 /trip_plan/jobs/<job_id>/result。
+    佇列忙碌時（QUICK_PLAN_WHEN_BUSY）改在獨立的 quick lane 以快速規劃取代 GA，回應中 quick 為 true
+    """
+    form_data = None
+    form_data_service = PreferenceFormService(db.session)
+    try:
         # 清除先前生成之行程
         clear_journey_data()
         # 獲取並處理表單數據
@@ -50,26 +65,82 @@ def trip_planning():
             return form_data_service.render_home_page(form_data)
 
         # 抓取user是否有登入
-        user_id = g.user if g.user else None
+        user_id = str(g.user.u_id) if g.user else None
+
+        # 相同的請求直接使用快取的行程
+        cache_key = _result_cache_key(form_data)
+        cached = result_cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            if RESULT_CACHE_REFRESH:
+                # 背景重新規劃並更新快取，不儲存偏好；沒有擁有者因此無法被查詢
+                job_queue.submit(plan_trip, current_app._get_current_object(),
+                                 copy.deepcopy(form_data), refresh=True)
+            new_preference = PreferenceService(db.session).save_preference(form_data, user_id)
+            _show_cached_journey(cached['journey_data'], form_data, str(new_preference.p_id))
+            return jsonify({
+                'status': 'OK',
+                'cached': True,
+                'result_url': url_for('trip_plan.show_result')
+            })
+
+        # 佇列忙碌時不排在 GA 工作後面，以快速規劃產生行程
+        quick = QUICK_PLAN_WHEN_BUSY and job_queue.saturated
+        job_id = job_queue.submit(plan_trip, current_app._get_current_object(), form_data,
+                                  user_id, quick=quick, owner=_job_owner(),
+                                  lane=QUICK_LANE if quick else DEFAULT_LANE)
+        return jsonify({
+            'status': 'OK',
+            'job_id': job_id,
+            'quick': quick,
+            'status_url': url_for('trip_plan.job_status', job_id=job_id),
+            'events_url': url_for('trip_plan.job_events', job_id=job_id),
+            'stop_url': url_for('trip_plan.stop_job', job_id=job_id),
+            'result_url': url_for('trip_plan.job_result', job_id=job_id)
+        }), 202
+
+    except Exception as e:
+        logger.error(f"行程規劃錯誤: {str(e)}")
+        flash({'message': f'系統錯誤：{str(e)}'}, 'error')
+        return form_data_service.render_home_page(form_data)
+
+
+def plan_trip(app, form_data, user_id=None, quick=False, refresh=False):
+    """
+    在背景工作中執行行程規劃：搜尋景點、GA、路線規劃，回傳序列化後的行程資料。
+    quick 為 True 時以快速規劃取代 GA，結果不放入快取。
+    refresh 為 True 時只更新結果快取：不儲存偏好，也不向 Google 重新取得景點，
+    直接使用資料庫中的候選景點（結果的 uuid 為 None，命中快取時會填入新的偏好 uuid）。
+    無法規劃時以 JobError 回報給使用者的訊息
+    """
+    with app.app_context():
+        preference_service = PreferenceService(db.session)
+        form_data_service = PreferenceFormService(db.session)
+        journey_data_service = JourneyDataService()
+        routes_api = GoogleRoutesAPI(API_KEY, DIRECTIONS_URL)
 
         # 儲存此偏好
-        new_preference = preference_service.save_preference_and_fetch_places(
-            form_data=form_data, api=google_api, user_id=user_id)
+        _report_stage('search_places')
+        new_preference = None
+        if not refresh:
+            google_api = GooglePlacesAPI(API_KEY, NEARBY_URL, DETAIL_URL)
+            new_preference = preference_service.save_preference_and_fetch_places(
+                form_data=form_data, api=google_api, user_id=user_id)
+        # 取得景點之後候選集合的版本才是最新的
+        cache_key = _result_cache_key(form_data)
 
         # 尋找符合條件的景點
         available_places = preference_service.search_available_places(
             form_data)
         if not available_places:
             logger.error("無法找到符合條件的地點")
-            flash({'message': '無法找到符合條件的地點，請調整搜尋條件'}, 'error')
-            return form_data_service.render_home_page(form_data)
+            raise JobError('無法找到符合條件的地點，請調整搜尋條件')
 
-        # 進行行程規畫並取最佳解
-        journey = run(available_places, form_data)[0]
+        # 進行行程規畫並取最佳解，GA 每代的進度回報給工作
+        _report_stage('plan')
+        journey = run(available_places, form_data, current_job(), quick=quick)[0]
         if not journey:
             logger.error("無法規劃行程")
-            flash({'message': '行程規劃失敗，請稍後再試'}, 'error')
-            return form_data_service.render_home_page(form_data)
+            raise JobError('行程規劃失敗，請稍後再試')
 
         # 對journey進行數據補齊並推薦景點
         enhanced_journey, recommended_places = journey_data_service.process_journey_data(
@@ -78,10 +149,10 @@ def trip_planning():
             budget=int(form_data['budget']))
         if not enhanced_journey:
             logger.error("無法生成增強行程資料")
-            flash({'message': '行程規劃失敗：無法生成行程'}, 'error')
-            return form_data_service.render_home_page(form_data)
+            raise JobError('行程規劃失敗：無法生成行程')
 
         # 規劃路程
+        _report_stage('routes')
         route_info = routes_api.get_route_info(enhanced_journey)
         if route_info['status'] == 'OK':
             # 根據交通時間調整景點開始時間
@@ -90,7 +161,8 @@ def trip_planning():
         else:
             logger.error(f"路線規劃錯誤: {route_info}")
 
-        form_data = form_data_service.post_process_form_data(form_data, str(new_preference.p_id))
+        preference_uuid = str(new_preference.p_id) if new_preference is not None else None
+        form_data = form_data_service.post_process_form_data(form_data, preference_uuid)
         # 準備行程、路線，以及推薦景點資料
         journey_data = {
             'journey': enhanced_journey,
@@ -99,24 +171,146 @@ def trip_planning():
             'form_data': form_data
         }
         # FIXME: change datetime.datetime to datetime
-        # 序列化資料並保存到 session
+        # 序列化資料，完成後由 job_result 保存到 session
         serialized_data = json.loads(
             json.dumps(journey_data,
                        default=journey_data_service.serialize_datetime))
-        session['journey_data'] = serialized_data
+        result = {'journey_data': serialized_data, 'uuid': preference_uuid}
+        # 快速規劃與 GA 被使用者提前停止的結果不放入快取
+        job = current_job()
+        if cache_key and not quick and not (job is not None and job.stop_requested):
+            result_cache.put(cache_key, result)
+        return result
+
+
+def _result_cache_key(form_data):
+    """form_data 與城市候選景點版本的快取 key，快取停用時回傳 None"""
+    if not result_cache.enabled:
+        return None
+    candidate_version = PlaceService(db.session).candidate_version(int(form_data['city']))
+    return result_cache.key(form_data, candidate_version)
+
+
+def _show_cached_journey(journey_data, form_data, preference_uuid):
+    """將快取的行程填入本次的行程名稱與偏好 uuid 後保存到 session"""
+    journey_data['form_data']['p_name'] = form_data['p_name']
+    journey_data['form_data']['uuid'] = preference_uuid
+    _show_journey(journey_data, preference_uuid)
+
+
+def _show_journey(journey_data, preference_uuid):
+    """將行程保存到 session 並顯示成功訊息"""
+    session['journey_data'] = journey_data
+    session.modified = True
+    flash({
+        'message': '行程規劃成功！',
+        'uuid': preference_uuid
+    }, 'success')
+
+
+def _report_stage(stage, **progress):
+    """回報目前執行到的步驟（search_places、plan、routes），不在工作中執行時忽略"""
+    job = current_job()
+    if job is not None:
+        job.report({'stage': stage, **progress})
+
+
+def _job_owner() -> str:
+    """目前 session 的工作擁有者代碼，只有建立工作的 session 可以查詢結果"""
+    if 'job_owner' not in session:
+        session['job_owner'] = uuid.uuid4().hex
         session.modified = True
-        print(serialized_data)
-        # 顯示成功訊息
-        flash({
-            'message': '行程規劃成功！',
-            'uuid': str(new_preference.p_id)
-        }, 'success')
-        return redirect(url_for('trip_plan.show_result'))
+    return session['job_owner']
 
-    except Exception as e:
-        logger.error(f"行程規劃錯誤: {str(e)}")
-        flash({'message': f'系統錯誤：{str(e)}'}, 'error')
-        return form_data_service.render_home_page(form_data)
+
+@trip_plan_bp.route('/jobs/<job_id>')
+def job_status(job_id):
+    """查詢行程規劃工作的狀態"""
+    job = job_queue.get(job_id, owner=session.get('job_owner'))
+    if job is None:
+        return jsonify({'status': 'ERROR', 'message': '找不到此規劃工作'}), 404
+    response = job.to_dict()
+    if job.status == SUCCEEDED:
+        response['result_url'] = url_for('trip_plan.job_result', job_id=job_id)
+    return jsonify(response)
+
+
+@trip_plan_bp.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """
+    以 Server-Sent Events 推送規劃進度：每次進度更新送出 progress 事件
+    （GA 每代的代數、各目標的最佳值與目前最佳行程的摘要），結束時送出 done 事件
+    """
+    job = job_queue.get(job_id, owner=session.get('job_owner'))
+    if job is None:
+        return jsonify({'status': 'ERROR', 'message': '找不到此規劃工作'}), 404
+    result_url = url_for('trip_plan.job_result', job_id=job_id)
+
+    def stream():
+        version = -1
+        while True:
+            latest, progress = job.wait(version, timeout=SSE_KEEPALIVE_SECONDS)
+            if job.done:
+                yield _sse('done', {'status': job.status, 'error': job.error,
+                                    'result_url': result_url})
+                return
+            if latest == version:
+                # 沒有新進度時送出註解，避免連線被 proxy 關閉
+                yield ': keep-alive\n\n'
+                continue
+            version = latest
+            if progress is not None:
+                yield _sse('progress', progress)
+
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+def _sse(event, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@trip_plan_bp.route('/jobs/<job_id>/stop', methods=['POST'])
+def stop_job(job_id):
+    """接受目前的結果：GA 在下一代結束時停止，以目前的 Pareto front 完成規劃"""
+    job = job_queue.get(job_id, owner=session.get('job_owner'))
+    if job is None:
+        return jsonify({'status': 'ERROR', 'message': '找不到此規劃工作'}), 404
+    job.request_stop()
+    return jsonify(job.to_dict())
+
+
+@trip_plan_bp.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    """
+    取得完成的行程：要求 JSON 時直接回傳行程資料，
+    否則保存到 session 並導向結果頁面
+    """
+    wants_json = request.accept_mimetypes.best == 'application/json'
+    job = job_queue.get(job_id, owner=session.get('job_owner'))
+    if job is None:
+        if wants_json:
+            return jsonify({'status': 'ERROR', 'message': '找不到此規劃工作'}), 404
+        flash({'message': '找不到行程資料，請重新規劃行程'}, 'error')
+        return redirect(url_for('homepage'))
+
+    if not job.done:
+        if wants_json:
+            return jsonify(job.to_dict()), 409
+        flash({'message': '行程仍在規劃中，請稍後再試'}, 'error')
+        return redirect(url_for('homepage'))
+
+    if job.status == FAILED:
+        if wants_json:
+            return jsonify({'status': 'ERROR', 'message': job.error}), 200
+        flash({'message': job.error}, 'error')
+        return redirect(url_for('homepage'))
+
+    if wants_json:
+        return jsonify({'status': 'OK', **job.result})
+
+    _show_journey(job.result['journey_data'], job.result['uuid'])
+    return redirect(url_for('trip_plan.show_result'))
 
 
 @trip_plan_bp.route('/show_result')
@@ -187,7 +381,7 @@ def print_trip_statistics(route, place_to_price_rating, waypoint_distances):
     Args:
         route: List of AttractionModify objects containing the trip itinerary
         place_to_price_rating: Dictionary containing price, rating and user_ratings data for each place
-        waypoint_distances: Dictionary containing distances between pairs of places
+        waypoint_distances: DistanceMatrix containing distances between pairs of places
     """
     total_price_level = 0
     total_rating = 0
@@ -209,7 +403,9 @@ def print_trip_statistics(route, place_to_price_rating, waypoint_distances):
         distance = 0
         if i < len(route) - 1:
             next_place = route[i + 1].attr.name
-            distance = waypoint_distances[frozenset([place_id, next_place])]
+            distance = waypoint_distances.distance(
+                waypoint_distances.index(place_id),
+                waypoint_distances.index(next_place))
             total_distance += distance
 
         # Add to totals
@@ -248,7 +444,11 @@ def get_departure_return_time(form_data):
 '''
 
 
-def run(available_places, form_data):
+def run(available_places, form_data, job=None, quick=False):
+    """
+    job 不為 None 時把 GA 每代的進度回報給工作，並在使用者要求時提前停止；
+    quick 為 True 時不執行 GA，以快速規劃產生行程
+    """
     dict_reader = DictReader(data=available_places,
                              stay_time=get_stay_time_from_form_data(form_data))
     waypoint_distances, waypoint_durations, all_waypoints_set, attractionsDetail, place_additional_info = dict_reader.read(
@@ -260,16 +460,48 @@ def run(available_places, form_data):
 
     all_waypoints = list(all_waypoints_set)
 
-    algo = NSGAIIAlgorithm(population_size=500, ngen=form_data['ngen'], cxpb=0.5, mutpb=0.2)
+    # 使用者接受目前的結果時提前停止，並把 GA 每代的進度回報給工作
+    stop_requested = (lambda: job.stop_requested) if job else None
+    progress = (lambda snapshot: job.report({'stage': 'plan', **snapshot})) if job else None
+
+    # (mu + lambda) 迴圈以 varOr 產生子代：cxpb + mutpb 為 1 時每個子代都經過交配或突變，
+    # 不會產生與親代相同、之後被去除重複移除的複本
+    ga_options = dict(ngen=form_data['ngen'], cxpb=0.7, mutpb=0.3,
+                      batch_evaluation=GA_BATCH_EVALUATION, delta_evaluation=GA_DELTA_EVALUATION,
+                      cache_size=GA_FITNESS_CACHE_SIZE,
+                      seed_store=SeedStore(GA_SEED_STORE_DIR, max_files=GA_SEED_STORE_MAX_FILES)
+                      if GA_SEED_STORE_DIR else None,
+                      stopping=StoppingConfig(time_limit=GA_TIME_LIMIT or None,
+                                              max_evaluations=GA_MAX_EVALUATIONS or None,
+                                              plateau_generations=GA_PLATEAU_GENERATIONS or None,
+                                              stop_requested=stop_requested),
+                      local_search=LocalSearchConfig(interval=GA_LOCAL_SEARCH_INTERVAL or None,
+                                                     final_front=GA_LOCAL_SEARCH_FINAL))
+    if quick:
+        algo = QuickPlanAlgorithm(population_size=500, processes=GA_PROCESSES, progress=progress,
+                                  **ga_options)
+    elif ExactAlgorithm.suitable(len(attractionsDetail), EXACT_SOLVER_MAX_PLACES):
+        # 候選景點很少時直接求精確解（以景點數、餐廳懲罰、距離排序，不考慮價格與評分）
+        algo = ExactAlgorithm(population_size=500, processes=GA_PROCESSES, progress=progress,
+                              **ga_options)
+    elif GA_ISLANDS > 1:
+        # 島嶼模型：總族群大小平均分給各島
+        algo = IslandNSGAIIAlgorithm(population_size=500 // GA_ISLANDS, islands=GA_ISLANDS, **ga_options)
+    else:
+        algo = NSGAIIAlgorithm(population_size=500, processes=GA_PROCESSES, progress=progress,
+                               **ga_options)
     # algo = NSGAIIAlgorithm(population_size=500, ngen=51, cxpb=0.5, mutpb=0.2)
     algo.setup(all_waypoints_set, waypoint_distances, attractionsDetail,
                place_additional_info, form_data['daily_depart_time'],
                form_data['daily_return_time'], form_data['departure_datetime'],
                form_data['return_datetime'])
     pop, hof, route_list = algo.run()
+    latest = algo.telemetry.latest
+    logger.info(f"GA 結束 ({algo.stop_reason}): {algo.generations} 代, {algo.evaluations} 次評估, "
+                f"前沿 {latest.front_size} 個, 耗時 {latest.elapsed:.2f}s")
 
     # Print statistics for the best route (first route in hall of fame)
-    best_route = list(hof)[0]
+    best_route = algo.decode(list(hof)[0])
     print_trip_statistics(best_route, place_additional_info, waypoint_distances)
 
     return route_list
@@ -26,6 +26,41 @@ DETAIL_URL = 'https://maps.googleapis.com/maps/api/place/details/json?'
 DIRECTIONS_URL = 'https://maps.googleapis.com/maps/api/directions/json?'
 # booking config
 BOOKING_API_KEY = 'your-booking-api-key'
+# GA config
+GA_PROCESSES = int(os.environ.get('GA_PROCESSES', 1))  # 平行評估個體的 process 數量
+GA_ISLANDS = int(os.environ.get('GA_ISLANDS', 1))  # 大於 1 時以島嶼模型在多個 process 中各自演化族群
+# 暖啟動種子的保存目錄（應位於原始碼目錄之外，例如 /var/cache/trip_planner/ga_seeds），空字串表示停用
+GA_SEED_STORE_DIR = os.environ.get('GA_SEED_STORE_DIR', '')
+GA_SEED_STORE_MAX_FILES = int(os.environ.get('GA_SEED_STORE_MAX_FILES', 500))  # 最多保存的種子檔案數
+GA_BATCH_EVALUATION = os.environ.get('GA_BATCH_EVALUATION', '1') == '1'  # 以 NumPy 批次評估族群
+# 增量評估（只重新計算運算子修改過的路段與天數）為選用功能，預設關閉。
+# 它只取代逐一評估，因此只在 GA_BATCH_EVALUATION=0 且 GA_PROCESSES=1 時生效；
+# 預設的批次評估整個族群更快（每代約 0.12s，增量 0.35s、逐一完整評估 0.39s），
+# 停用批次評估時（例如記憶體受限）可設為 1 節省約一成的評估時間
+GA_DELTA_EVALUATION = os.environ.get('GA_DELTA_EVALUATION', '0') == '1'
+GA_FITNESS_CACHE_SIZE = int(os.environ.get('GA_FITNESS_CACHE_SIZE', 10000))  # fitness 快取的最大筆數，0 表示停用
+# GA 提前停止條件，0 表示不限制
+GA_TIME_LIMIT = float(os.environ.get('GA_TIME_LIMIT', 0))  # 每個請求的最長執行秒數
+GA_MAX_EVALUATIONS = int(os.environ.get('GA_MAX_EVALUATIONS', 0))  # 最多評估的個體數
+GA_PLATEAU_GENERATIONS = int(os.environ.get('GA_PLATEAU_GENERATIONS', 0))  # 各目標的最佳值連續幾代沒有改善就停止
+# memetic 區域搜尋：每幾代改善菁英個體（0 表示停用）與是否改善最終的 Pareto front
+GA_LOCAL_SEARCH_INTERVAL = int(os.environ.get('GA_LOCAL_SEARCH_INTERVAL', 0))
+GA_LOCAL_SEARCH_FINAL = os.environ.get('GA_LOCAL_SEARCH_FINAL', '1') == '1'
+# 候選景點不超過此數量時以精確解（branch-and-bound）規劃，不執行 GA；0 表示停用。
+# 精確解只以景點數、餐廳懲罰、總距離的字典序排序，不考慮價格與評分目標；
+# 單日行程不另外觸發（候選景點多時搜尋會達到節點上限）
+EXACT_SOLVER_MAX_PLACES = int(os.environ.get('EXACT_SOLVER_MAX_PLACES', 12))
+# 行程規劃工作佇列
+TRIP_PLAN_WORKERS = int(os.environ.get('TRIP_PLAN_WORKERS', 2))  # 同時執行的規劃工作數
+TRIP_PLAN_JOB_TTL = int(os.environ.get('TRIP_PLAN_JOB_TTL', 3600))  # 完成的工作保留秒數
+# 工作佇列忙碌時不排在 GA 工作後面，改在獨立的 quick lane 以快速規劃（regret 插入 + 區域搜尋）取代 GA
+QUICK_PLAN_WHEN_BUSY = os.environ.get('QUICK_PLAN_WHEN_BUSY', '0') == '1'
+TRIP_PLAN_QUICK_WORKERS = int(os.environ.get('TRIP_PLAN_QUICK_WORKERS', 1))  # quick lane 同時執行的工作數
+# 相同規劃請求的結果快取
+RESULT_CACHE_SIZE = int(os.environ.get('RESULT_CACHE_SIZE', 200))  # 最多保存的結果數，0 表示停用
+RESULT_CACHE_TTL = int(os.environ.get('RESULT_CACHE_TTL', 6 * 3600))  # 結果的有效秒數
+# 命中快取時立即回傳快取的結果，同時在背景重新規劃並更新快取
+RESULT_CACHE_REFRESH = os.environ.get('RESULT_CACHE_REFRESH', '0') == '1'
 
 
 class Config:
@@ -1,23 +1,85 @@
 import numpy as np
-from deap import (algorithms, tools, creator)
-import copy
-from tqdm import tqdm
-from typing import Dict, Set, FrozenSet, List, Tuple, Any
+from deap import (algorithms, tools)
+import logging
+import math
+import multiprocessing
+import multiprocessing.connection
+import random
+import time
+import traceback
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Set, FrozenSet, List, Tuple, Any, Optional
 
 from core.problems import OptimizationProblem
+from core.telemetry import Telemetry
+from core.diversity import DiversityFilter
+from core.seed_store import SeedStore
 from datetime import datetime, timedelta
 
 from core.generate_initial_trip import InitIndividual, Attraction
 
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StoppingConfig:
+    """提前停止的條件，None 表示不限制；任一條件成立即停止並回傳目前的 Pareto front"""
+    time_limit: Optional[float] = None  # 從 run() 開始的秒數（包含產生初始族群）
+    max_evaluations: Optional[int] = None  # 最多評估的個體數
+    # 各目標在 Pareto front 中的最佳值（ideal point）連續幾代都沒有改善超過 plateau_tolerance 就停止
+    plateau_generations: Optional[int] = None
+    plateau_tolerance: float = 1e-3  # 相對改善幅度，以 max(1, |原本的最佳值|) 為基準
+    # 外部要求停止（例如使用者接受目前的結果），回傳 True 時停止；島嶼模型經由 pipe 轉送給各島
+    stop_requested: Optional[Callable[[], bool]] = None
+
+
+@dataclass
+class LocalSearchConfig:
+    """memetic 區域搜尋（每天的 2-opt / or-opt）的執行時機"""
+    interval: Optional[int] = None  # 每幾代改善一次族群中的菁英個體，None 表示不執行
+    elites: int = 10  # 每次改善的個體數（選擇後族群的前幾個，即最前面的前沿）
+    final_front: bool = False  # 結束時改善最終的 Pareto front
+
 
 class NSGAIIAlgorithm:
 
-    def __init__(self, population_size: int, ngen: int, cxpb=0., mutpb=1.0):
+    def __init__(self, population_size: int, ngen: int, cxpb=0., mutpb=1.0, processes: int = 1,
+                 batch_evaluation: bool = False, cache_size: int = 10000,
+                 delta_evaluation: bool = False, stopping: Optional[StoppingConfig] = None,
+                 telemetry: Optional[Telemetry] = None, seed_store: Optional[SeedStore] = None,
+                 local_search: Optional[LocalSearchConfig] = None,
+                 progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 deduplicate: bool = True):
         self.population_size = population_size
         self.ngen = ngen
+        if cxpb + mutpb > 1.0:
+            raise ValueError("cxpb + mutpb 不可大於 1（varOr 每個子代只做交配或突變其中之一）")
         self.cxpb = cxpb
         self.mutpb = mutpb
-        self.problem: OptimizationProblem = OptimizationProblem()
+        self.stopping = stopping or StoppingConfig()
+        self.local_search = local_search or LocalSearchConfig()
+        # 每代的統計資料（前沿大小、目標範圍、評估數、快取命中與運算子耗時）
+        self.telemetry = telemetry or Telemetry()
+        # 每代結束時以 progress_snapshot() 的結果呼叫，用於回報進度給前端
+        self.progress = progress
+        # 移除與族群中個體順序完全相同的子代，避免重複的個體佔據前沿
+        self.deduplicate = deduplicate
+        # 上次 run() 的停止原因、實際執行的代數與評估次數
+        self.stop_reason = None
+        self.generations = 0
+        self.evaluations = 0
+        self.stagnant = 0  # ideal point 連續沒有改善的代數
+        self.started = None
+        # processes > 1 時以 process pool 平行評估個體；batch_evaluation 則以 NumPy 一次評估整個族群
+        # cache_size 為 fitness 快取的最大筆數，重複的行程不會重新評估
+        # delta_evaluation 在逐一評估時只重新計算運算子修改過的路段與天數；需自行啟用，
+        # batch_evaluation 或 processes > 1 時不使用
+        # seed_store 保存最終的 Pareto front，之後相同的問題以它暖啟動
+        self.problem: OptimizationProblem = OptimizationProblem(processes=processes,
+                                                                batch_evaluation=batch_evaluation,
+                                                                cache_size=cache_size,
+                                                                delta_evaluation=delta_evaluation,
+                                                                seed_store=seed_store)
 
     def setup(self, all_waypoints_set: Set[list[str]], waypoint_distances: Dict[FrozenSet[str], float],
               attractionsDetail: List[Attraction], place_additional_info, daily_depart_time: str, daily_return_time: str, departure_datetime, return_datetime):
@@ -34,9 +96,12 @@ class NSGAIIAlgorithm:
         generate = InitIndividual(self.attractionsDetail, startTime, endTime, 3)
         return generate.getInitIndi()
 
+    def decode(self, individual):
+        """將 Genome 個體還原為 AttractionModify 行程"""
+        return self.problem.codec.decode(individual)
+
     # TODO: change to multiple day
-    @staticmethod
-    def to_list(hof):
+    def to_list(self, hof):
 
         return [
             [
@@ -45,7 +110,7 @@ class NSGAIIAlgorithm:
                     "place_start_datetime": attraction.time_range.start_time,
                     "place_end_datetime": attraction.time_range.end_time,
                 }
-                for attraction in route
+                for attraction in self.decode(route)
             ]
             for route in hof
         ]
@@ -53,7 +118,9 @@ class NSGAIIAlgorithm:
 
 
     def run(self):
-        pop = self.problem.toolbox.population()
+        started = time.perf_counter()
+        pop = self.problem.toolbox.population(self.population_size,
+                                              self.initial_time_budget())
         # exit()
 
         # allSchedules = generateByDfs()
@@ -70,32 +137,536 @@ class NSGAIIAlgorithm:
         #     print(f"type {type(ind)}")
 
         hof = tools.ParetoFront(similar=self.pareto_eq)
-        pbar = tqdm(total=self.ngen)
-        stats = self.define_statistics(hof, pbar)
 
         # How many iterations of the genetic algorithm to run
         # The more iterations you allow it to run, the better the solutions it will find
-        pop, log = algorithms.eaSimple(pop,
-                                       self.problem.toolbox,
-                                       cxpb=self.cxpb,
-                                       mutpb=self.mutpb,
-                                       ngen=self.ngen,
-                                       stats=stats,
-                                       halloffame=hof,
-                                       verbose=False)
-        pbar.close()
+        try:
+            self.start(pop, hof, started)
+            pop = self.evolve(pop, hof, self.ngen)
+            if self.local_search.final_front:
+                improved, nevals = self.improve(list(hof))
+                self.evaluations += nevals
+                hof.update(improved)
+            self.problem.save_seeds(hof)
+        finally:
+            self.problem.close_evaluator()
         return pop, hof, self.to_list(hof)
 
-    def define_statistics(self, hof, pbar):
-        stats = tools.Statistics(lambda ind: (int(ind.fitness.values[0]), round(ind.fitness.values[1], 2)))
-        stats.register('Minimum', np.min, axis=0)
-        stats.register('Maximum', np.max, axis=0)
-        # This stores a copy of the Pareto front for every generation of the genetic algorithm
-        stats.register('ParetoFront', lambda x: copy.deepcopy(hof))
-        # This is a hack to make the tqdm progress bar work
-        stats.register('Progress', lambda x: pbar.update())
-        return stats
+    def initial_time_budget(self) -> Optional[float]:
+        """產生初始族群的秒數上限：time_limit 的一半，其餘留給演化"""
+        if self.stopping.time_limit is None:
+            return None
+        return self.stopping.time_limit / 2
+
+    def run_individual(self, individual, started: Optional[float] = None):
+        """
+        不演化，以 individual 作為唯一的結果（回傳值與 run() 相同）。
+        不保存暖啟動種子，以免單一個體取代 GA 保存的 Pareto front
+        """
+        population = [individual]
+        hof = tools.ParetoFront(similar=self.pareto_eq)
+        try:
+            self.start(population, hof, started)
+        finally:
+            self.problem.close_evaluator()
+        return population, hof, self.to_list(hof)
+
+    def start(self, population, hof, started: Optional[float] = None):
+        """重設計數並評估初始族群；started 為計算 time_limit 的起始時間"""
+        self.started = time.perf_counter() if started is None else started
+        self.stop_reason = None
+        self.generations = 0
+        self.stagnant = 0
+        self.problem.reset()
+        telemetry = self.telemetry
+        cache = self.problem.fitness_cache
+
+        offspring_counter = self.problem.offspring_counter
+        telemetry.start(cache, self.started, offspring_counter)
+        with telemetry.timer('evaluate'):
+            self.evaluations = self.evaluate(population)
+        with telemetry.timer('hof'):
+            hof.update(population)
+        telemetry.record(0, population, hof, self.evaluations, cache,
+                         offspring_counter, force=True)
+        self.__report_progress(hof)
+
+    def evolve(self, population, hof, ngen: int):
+        """
+        (mu + lambda) NSGA-II：親代與子代合併後由 NSGA-II 選出下一代。
+        與 eaMuPlusLambda 相同，但每代結束後檢查 StoppingConfig 以便提前停止，
+        並將統計資料記錄到 telemetry。從目前的計數繼續演化最多 ngen 代，
+        需先呼叫 start()。
+        子代由 varOr 產生，每個子代以 cxpb 的機率交配、mutpb 的機率突變，其餘為親代的複本；
+        複本會被 unique_offspring 移除，因此 cxpb + mutpb 應為 1，每代才會有 lambda 個新子代
+        """
+        toolbox = self.problem.toolbox
+        telemetry = self.telemetry
+        cache = self.problem.fitness_cache
+        mu = lambda_ = len(population)
+        target = self.generations + ngen
+
+        reason = self.__stop_reason(self.started, self.stagnant)
+        while reason is None and self.generations < target:
+            gen = self.generations + 1
+            with telemetry.timer('variation'):
+                offspring = algorithms.varOr(population, toolbox, lambda_,
+                                             self.cxpb, self.mutpb)
+                if self.deduplicate:
+                    offspring = self.unique_offspring(population, offspring)
+            with telemetry.timer('evaluate'):
+                nevals = self.evaluate(offspring)
+            self.evaluations += nevals
+
+            with telemetry.timer('hof'):
+                ideal = self.ideal_point(hof)
+                hof.update(offspring)
+
+            with telemetry.timer('select'):
+                population[:] = toolbox.select(population + offspring, mu)
+            self.generations = gen
+
+            interval = self.local_search.interval
+            if interval and gen % interval == 0:
+                # 改善後只縮短距離，其他目標不變，因此直接取代原本的菁英個體
+                elites = self.local_search.elites
+                population[:elites], improved_evals = self.improve(population[:elites])
+                hof.update(population[:elites])
+                nevals += improved_evals
+                self.evaluations += improved_evals
+            self.stagnant = 0 if self.__improved(ideal, self.ideal_point(hof)) else self.stagnant + 1
+
+            reason = self.__stop_reason(self.started, self.stagnant)
+            # 最後一代不論取樣設定都會記錄
+            telemetry.record(gen, population, hof, nevals, cache,
+                             self.problem.offspring_counter,
+                             force=reason is not None or gen == target)
+            self.__report_progress(hof)
+
+        self.stop_reason = reason or 'ngen'
+        return population
+
+    def unique_offspring(self, population, offspring) -> List:
+        """移除與族群或先前的子代景點順序完全相同的子代"""
+        place_count = len(self.problem.place_index)
+        duplicates = DiversityFilter(threshold=1.0)
+
+        def sequence(individual):
+            # (位置, 景點) 作為元素，元素相同即順序相同
+            return (position * place_count + index
+                    for position, index in enumerate(individual))
+
+        for individual in population:
+            duplicates.add(sequence(individual))
+        return [child for child in offspring if duplicates.add(sequence(child))]
+
+    def improve(self, individuals) -> Tuple[List, int]:
+        """
+        以區域搜尋改善 individuals 的複本並評估改善後的個體；
+        回傳與 individuals 對應的結果（沒有改善時為原個體）與評估的數量
+        """
+        toolbox = self.problem.toolbox
+        with self.telemetry.timer('local_search'):
+            result, improved = [], []
+            for individual in individuals:
+                candidate = toolbox.clone(individual)
+                if toolbox.local_search(candidate):
+                    del candidate.fitness.values
+                    improved.append(candidate)
+                    result.append(candidate)
+                else:
+                    result.append(individual)
+        with self.telemetry.timer('evaluate'):
+            nevals = self.evaluate(improved)
+        return result, nevals
+
+    def evaluate(self, individuals) -> int:
+        """評估 fitness 無效的個體，回傳評估的數量"""
+        invalid_ind = [ind for ind in individuals if not ind.fitness.valid]
+        fitnesses = self.problem.toolbox.map(self.problem.toolbox.evaluate,
+                                             invalid_ind)
+        for ind, fit in zip(invalid_ind, fitnesses):
+            ind.fitness.values = fit
+        return len(invalid_ind)
+
+    def progress_snapshot(self, hof) -> Dict[str, Any]:
+        """
+        目前的進度：代數、評估數、前沿大小、各目標在前沿中的最佳值，
+        以及前沿第一個行程（最後輸出的行程）的摘要，皆可直接序列化為 JSON
+        """
+        snapshot = {
+            'generation': self.generations,
+            'evaluations': self.evaluations,
+            'elapsed': time.perf_counter() - self.started,
+            'front_size': len(hof),
+            'best_objectives': [],
+            'best': None
+        }
+        if len(hof) == 0:
+            return snapshot
+
+        weights = hof[0].fitness.weights
+        snapshot['best_objectives'] = [
+            max(ind.fitness.values[i] * weight for ind in hof) * weight
+            for i, weight in enumerate(weights)
+        ]
+        best = hof[0]
+        metrics = self.problem.calculate_raw_metrics(best)
+        snapshot['best'] = {
+            'place_count': metrics['place_count'],
+            'trip_length': metrics['trip_length'],
+            'rating': metrics['rating'],
+            'restaurant_penalty': metrics['restaurant_penalty'],
+            'places': [
+                {
+                    'place_id': place['place_id'],
+                    'place_start_datetime': place['place_start_datetime'].isoformat(),
+                    'place_end_datetime': place['place_end_datetime'].isoformat()
+                }
+                for place in self.to_list([best])[0]
+            ]
+        }
+        return snapshot
+
+    def __report_progress(self, hof):
+        if self.progress is None:
+            return
+        try:
+            self.progress(self.progress_snapshot(hof))
+        except Exception:
+            # 回報進度失敗不影響演化
+            logger.exception("回報 GA 進度失敗")
+
+    def __stop_reason(self, started, stagnant) -> Optional[str]:
+        stopping = self.stopping
+        if stopping.stop_requested is not None and stopping.stop_requested():
+            return 'stopped'
+        if (stopping.time_limit is not None
+                and time.perf_counter() - started >= stopping.time_limit):
+            return 'time_limit'
+        if (stopping.max_evaluations is not None
+                and self.evaluations >= stopping.max_evaluations):
+            return 'max_evaluations'
+        if (stopping.plateau_generations is not None
+                and stagnant >= stopping.plateau_generations):
+            return 'plateau'
+        return None
+
+    @staticmethod
+    def ideal_point(hof) -> Optional[np.ndarray]:
+        """各目標在 Pareto front 中的最佳值（乘上權重，越大越好），前沿為空時為 None"""
+        if len(hof) == 0:
+            return None
+        weights = np.asarray(hof[0].fitness.weights)
+        return (np.asarray([ind.fitness.values for ind in hof]) * weights).max(axis=0)
+
+    def __improved(self, before: Optional[np.ndarray], after: Optional[np.ndarray]) -> bool:
+        """ideal point 是否有任一目標改善超過 plateau_tolerance"""
+        if before is None or after is None:
+            return after is not None
+        tolerance = self.stopping.plateau_tolerance * np.maximum(1.0, np.abs(before))
+        return bool(np.any(after - before > tolerance))
 
     @staticmethod
     def pareto_eq(ind1, ind2):
         return np.all(ind1.fitness.values == ind2.fitness.values)
+
+
+def _genome_payload(individuals) -> List[Tuple[List[int], List[int]]]:
+    """以純資料傳送個體，避免在 process 之間傳送 DEAP 動態建立的類別"""
+    return [(list(ind), list(ind.starts)) for ind in individuals]
+
+
+def _run_island(seed: int, algorithm_kwargs: Dict[str, Any], setup_args: tuple,
+                migration_interval: int, migrants: int, deadline: Optional[float], connection):
+    """
+    在 worker process 中執行一個島：每 migration_interval 代送出 migrants 個
+    非支配個體並接收鄰島的個體，結束時回傳島上的 Pareto front。
+    deadline 為所有島共用的截止時間（time.time()），主程序以 ('stop', None) 要求停止
+    """
+    started = time.perf_counter()
+    random.seed(seed)
+    np.random.seed(seed % (2 ** 32))
+    algo = NSGAIIAlgorithm(**algorithm_kwargs)
+    stop = {'requested': False}
+
+    def handle(message):
+        """處理主程序的訊息，回傳遷移的個體（停止要求回傳 None）"""
+        kind, payload = message
+        if kind == 'stop':
+            stop['requested'] = True
+            return None
+        return payload
+
+    def stop_requested() -> bool:
+        # 演化期間主程序只會送出停止要求，遷移的個體在送出後才同步接收
+        while not stop['requested'] and connection.poll():
+            handle(connection.recv())
+        return stop['requested']
+
+    stopping = replace(algo.stopping, stop_requested=stop_requested)
+    if deadline is not None:
+        stopping = replace(stopping, time_limit=max(0.0, deadline - time.time()))
+    algo.stopping = stopping
+    immigrant_count = 0
+    try:
+        algo.setup(*setup_args)
+        toolbox = algo.problem.toolbox
+        population = toolbox.population(algo.population_size, algo.initial_time_budget())
+        hof = tools.ParetoFront(similar=algo.pareto_eq)
+
+        algo.start(population, hof, started)
+        while True:
+            algo.evolve(population, hof,
+                        min(migration_interval, algo.ngen - algo.generations))
+            if algo.stop_reason != 'ngen' or algo.generations >= algo.ngen:
+                break
+
+            emigrants = random.sample(list(hof), min(migrants, len(hof)))
+            connection.send(('migrants', _genome_payload(emigrants)))
+            payload = None
+            while payload is None:
+                payload = handle(connection.recv())
+            immigrants = [
+                algo.problem.Individual(indices, starts)
+                for indices, starts in payload
+            ]
+            immigrant_count += len(immigrants)
+            if immigrants:
+                # 各島的歸一化範圍不同，移入的個體在本島重新評估
+                algo.evaluations += algo.evaluate(immigrants)
+                hof.update(immigrants)
+                population[:] = toolbox.select(population + immigrants,
+                                               len(population))
+
+        connection.send(('done', {
+            'front': _genome_payload(hof),
+            'generations': algo.generations,
+            'evaluations': algo.evaluations,
+            'stop_reason': algo.stop_reason,
+            'immigrants': immigrant_count,
+            'telemetry': algo.telemetry.to_list()
+        }))
+    except Exception:
+        connection.send(('error', traceback.format_exc()))
+    finally:
+        algo.problem.close_evaluator()
+        connection.close()
+
+
+class ExactAlgorithm(NSGAIIAlgorithm):
+    """
+    小型實例的精確解
+
+    候選景點很少時（見 suitable()）以 ExactSolver（branch-and-bound）直接求出
+    景點數最多、餐廳懲罰最小、總距離最短的行程，不執行 GA。
+    搜尋超過 max_nodes 個節點時回傳目前找到的最佳行程（stop_reason 為 'node_limit'），
+    沒有任何可行行程時才改以一般的 NSGA-II 執行；其餘參數與 NSGAIIAlgorithm 相同。
+    「精確」只針對上述的字典序目標：價格、評分與評價數不納入排序，
+    結果是單一行程而不是 Pareto front。
+    只依候選景點數選用：單日但候選景點多的行程搜尋會達到 max_nodes，
+    無法證明最佳，因此仍由 GA 處理。
+    """
+    MAX_PLACES = 12
+
+    def __init__(self, population_size: int, ngen: int, max_nodes: int = 50000, **kwargs):
+        super().__init__(population_size, ngen, **kwargs)
+        self.max_nodes = max_nodes
+
+    @classmethod
+    def suitable(cls, place_count: int, max_places: int = MAX_PLACES) -> bool:
+        """place_count 個候選景點是否適合以精確解處理"""
+        return 0 < place_count <= max_places
+
+    def run(self):
+        started = time.perf_counter()
+        solver = self.problem.create_exact_solver(self.max_nodes)
+        individual = solver.solve(self.problem.Individual)
+        if individual is None:
+            logger.info("精確解找不到可行的行程，改用 NSGA-II")
+            return super().run()
+
+        result = self.run_individual(individual, started)
+        self.stop_reason = 'exact' if solver.optimal else 'node_limit'
+        logger.info(f"精確解搜尋 {solver.nodes} 個節點 ({self.stop_reason})，"
+                    f"耗時 {time.perf_counter() - started:.3f} 秒")
+        return result
+
+
+class QuickPlanAlgorithm(NSGAIIAlgorithm):
+    """
+    不經演化的快速行程（QuickPlanner：regret 插入 + 一次區域搜尋），通常在 100ms 內完成。
+    用於預覽或工作佇列忙碌時；沒有任何景點可以排入時改以一般的 NSGA-II 執行，
+    其餘參數與 NSGAIIAlgorithm 相同
+    """
+
+    def run(self):
+        started = time.perf_counter()
+        individual = self.problem.create_quick_planner().plan(self.problem.Individual)
+        if individual is None:
+            logger.info("快速規劃無法排入任何景點，改用 NSGA-II")
+            return super().run()
+
+        result = self.run_individual(individual, started)
+        self.stop_reason = 'quick'
+        return result
+
+
+class IslandNSGAIIAlgorithm(NSGAIIAlgorithm):
+    """
+    島嶼模型 NSGA-II
+
+    在 islands 個 worker process 中以不同的 seed 各自演化一個族群，
+    每 migration_interval 代依環狀拓撲把 migrants 個非支配個體送到下一個島。
+    全部結束後在主程序重新評估各島的 Pareto front，合併為一個 ParetoFront。
+    population_size 以每個島計算；StoppingConfig 的 time_limit 為所有島共用的截止時間
+    （從 run() 開始計算），max_evaluations 平均分給各島，stop_requested 由主程序檢查後
+    經由 pipe 轉送給各島。
+    """
+
+    def __init__(self, population_size: int, ngen: int, cxpb=0., mutpb=1.0, islands: int = 4,
+                 migration_interval: int = 5, migrants: int = 2, seed: Optional[int] = None,
+                 batch_evaluation: bool = False, cache_size: int = 10000,
+                 delta_evaluation: bool = False, stopping: Optional[StoppingConfig] = None,
+                 telemetry: Optional[Telemetry] = None, seed_store: Optional[SeedStore] = None,
+                 local_search: Optional[LocalSearchConfig] = None, deduplicate: bool = True):
+        super().__init__(population_size, ngen, cxpb=cxpb, mutpb=mutpb,
+                         batch_evaluation=batch_evaluation, cache_size=cache_size,
+                         delta_evaluation=delta_evaluation, stopping=stopping,
+                         telemetry=telemetry, seed_store=seed_store,
+                         local_search=local_search, deduplicate=deduplicate)
+        self.islands = islands
+        self.migration_interval = max(1, migration_interval)
+        self.migrants = migrants
+        self.seed = seed
+        self.setup_args = None
+        self.island_results: Dict[int, Dict[str, Any]] = {}
+
+        # 外部停止要求與截止時間由 run() 轉送給各島
+        island_stopping = replace(self.stopping, stop_requested=None, time_limit=None)
+        if island_stopping.max_evaluations is not None:
+            island_stopping = replace(island_stopping, max_evaluations=math.ceil(
+                island_stopping.max_evaluations / islands))
+        # 島上不再開 process pool，平行度來自島本身
+        self.island_kwargs = dict(population_size=population_size, ngen=ngen, cxpb=cxpb,
+                                  mutpb=mutpb, processes=1, batch_evaluation=batch_evaluation,
+                                  cache_size=cache_size, delta_evaluation=delta_evaluation,
+                                  stopping=island_stopping, seed_store=seed_store,
+                                  local_search=replace(self.local_search, final_front=False),
+                                  deduplicate=deduplicate)
+
+    def setup(self, *args):
+        # 主程序也建立問題，用於合併時重新評估與輸出時解碼
+        super().setup(*args)
+        self.setup_args = args
+
+    def run(self):
+        started = time.perf_counter()
+        base_seed = self.seed if self.seed is not None else random.randrange(2 ** 31)
+        # 各島以 time.time() 比較截止時間，perf_counter 不保證在 process 之間一致
+        deadline = (time.time() + self.stopping.time_limit
+                    if self.stopping.time_limit is not None else None)
+
+        connections, workers = [], []
+        for island in range(self.islands):
+            parent_connection, child_connection = multiprocessing.Pipe()
+            worker = multiprocessing.Process(
+                target=_run_island,
+                args=(base_seed + island, self.island_kwargs, self.setup_args,
+                      self.migration_interval, self.migrants, deadline, child_connection),
+                daemon=True)
+            worker.start()
+            child_connection.close()
+            connections.append(parent_connection)
+            workers.append(worker)
+
+        try:
+            self.island_results = self.__coordinate(connections)
+        finally:
+            for connection in connections:
+                connection.close()
+            for worker in workers:
+                worker.join()
+
+        if not self.island_results:
+            raise RuntimeError("all islands failed")
+
+        population = [
+            self.problem.Individual(indices, starts)
+            for result in self.island_results.values()
+            for indices, starts in result['front']
+        ]
+        hof = tools.ParetoFront(similar=self.pareto_eq)
+        try:
+            self.problem.reset()
+            self.telemetry.start(self.problem.fitness_cache, started)
+            self.evaluate(population)
+            hof.update(population)
+            # 最終前沿的區域搜尋只在合併後執行一次
+            if self.local_search.final_front:
+                improved, _ = self.improve(list(hof))
+                hof.update(improved)
+            self.problem.save_seeds(hof)
+        finally:
+            self.problem.close_evaluator()
+
+        results = self.island_results.values()
+        self.generations = max((result['generations'] for result in results), default=0)
+        self.evaluations = sum(result['evaluations'] for result in results)
+        self.stop_reason = ','.join(sorted({result['stop_reason'] for result in results})) or None
+        self.telemetry.record(self.generations, population, hof, self.evaluations,
+                              self.problem.fitness_cache, force=True)
+        return population, hof, self.to_list(hof)
+
+    def __coordinate(self, connections) -> Dict[int, Dict[str, Any]]:
+        """
+        轉送各島的遷移個體，直到所有島結束；等待期間檢查 stop_requested，
+        成立時要求所有仍在演化的島停止
+        """
+        results = {}
+        active = list(range(len(connections)))
+        stop_sent = False
+        while active:
+            migrants = {}
+            pending = set(active)
+            while pending:
+                if not stop_sent and self.__stop_requested():
+                    stop_sent = True
+                    for island in active:
+                        self.__send(connections[island], ('stop', None))
+                ready = multiprocessing.connection.wait(
+                    [connections[island] for island in pending], timeout=0.1)
+                for connection in ready:
+                    island = connections.index(connection)
+                    pending.discard(island)
+                    try:
+                        kind, payload = connection.recv()
+                    except EOFError:
+                        kind, payload = 'error', 'worker exited unexpectedly'
+                    if kind == 'migrants':
+                        migrants[island] = payload
+                        continue
+                    active.remove(island)
+                    if kind == 'done':
+                        results[island] = payload
+                    else:
+                        logger.error(f"island {island} failed: {payload}")
+
+            # 環狀拓撲：每個島接收前一個仍在演化的島送出的個體
+            for position, island in enumerate(active):
+                source = active[position - 1]
+                self.__send(connections[island],
+                            ('migrants', migrants[source] if source != island else []))
+        return results
+
+    def __stop_requested(self) -> bool:
+        stop_requested = self.stopping.stop_requested
+        return stop_requested is not None and stop_requested()
+
+    @staticmethod
+    def __send(connection, message):
+        try:
+            connection.send(message)
+        except (BrokenPipeError, OSError):
+            # 島已結束，結果會在下次接收時處理
+            pass
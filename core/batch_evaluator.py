@@ -0,0 +1,173 @@
+import numpy as np
+from typing import Dict, List, Any, Tuple
+
+from core.distance_matrix import DistanceMatrix
+from core.genome import Genome, MINUTES_PER_DAY, minutes_of_day
+
+
+class BatchEvaluator:
+    """
+    以 NumPy 一次計算整個族群的原始評估指標
+
+    族群先被打包成以 -1 補齊的 (個體數, 最大長度) 索引陣列，
+    距離、價格、評分、評價數與餐廳懲罰皆以 gather 與 bincount 計算，
+    不需對每個個體呼叫評估函式。回傳格式與
+    OptimizationProblem.calculate_raw_metrics 相同。
+    """
+
+    def __init__(self, waypoint_distances: DistanceMatrix,
+                 place_additional_info: Dict[str, Dict[str, Any]],
+                 restaurant_config: Dict[str, Any]):
+        self.waypoint_distances = waypoint_distances
+        self.place_index = waypoint_distances.place_index
+        self.restaurant_config = restaurant_config
+
+        size = waypoint_distances.size
+        self.price_level = np.zeros(size, dtype=np.float64)
+        self.rating = np.zeros(size, dtype=np.float64)
+        self.user_rating_totals = np.zeros(size, dtype=np.float64)
+        self.is_restaurant = np.zeros(size, dtype=bool)
+
+        for place_id, index in self.place_index.items():
+            place_info = place_additional_info.get(place_id, {})
+            self.price_level[index] = place_info.get('price_level', 0)
+            self.rating[index] = place_info.get('rating', 0)
+            self.user_rating_totals[index] = place_info.get(
+                'user_rating_totals', 0)
+            self.is_restaurant[index] = bool(
+                restaurant_config['restaurant_categories'].intersection(
+                    place_info.get('category', set())))
+
+        self.lunch_window = (
+            minutes_of_day(restaurant_config['lunch_window']['start']),
+            minutes_of_day(restaurant_config['lunch_window']['end']))
+        self.dinner_window = (
+            minutes_of_day(restaurant_config['dinner_window']['start']),
+            minutes_of_day(restaurant_config['dinner_window']['end']))
+
+    def map(self, individuals: List[Genome]) -> List[Dict]:
+        """依原順序回傳每個個體的原始評估指標"""
+        if not individuals:
+            return []
+
+        indices, starts, mask = self.pack(individuals)
+        days = starts // MINUTES_PER_DAY
+        minutes = starts % MINUTES_PER_DAY
+        safe_indices = np.where(mask, indices, 0)
+
+        # 與逐一評估相同：價格、評分與評價數只累計每段路程的起點
+        leg_mask = mask[:, 1:]
+        head_mask = np.zeros_like(mask)
+        head_mask[:, :-1] = leg_mask
+
+        leg_distances = self.waypoint_distances.distances(
+            safe_indices[:, :-1], safe_indices[:, 1:]).astype(np.float64)
+        trip_length = np.where(leg_mask, leg_distances, 0.0).sum(axis=1)
+        price_level_sum = (self.price_level[safe_indices] * head_mask).sum(axis=1)
+        rating = (self.rating[safe_indices] * head_mask).sum(axis=1)
+        user_rating_totals = (self.user_rating_totals[safe_indices] *
+                              head_mask).sum(axis=1)
+
+        restaurant_penalty = self.__restaurant_penalty(safe_indices, days,
+                                                       minutes, mask)
+        place_count = self.__place_count(indices, mask)
+
+        return [{
+            'trip_length': values[0],
+            'price_level_sum': values[1],
+            'rating': values[2],
+            'user_rating_totals': values[3],
+            'restaurant_penalty': values[4],
+            'place_count': int(values[5])
+        } for values in zip(trip_length.tolist(), price_level_sum.tolist(),
+                            rating.tolist(), user_rating_totals.tolist(),
+                            restaurant_penalty.tolist(), place_count.tolist())]
+
+    def close(self):
+        pass
+
+    @staticmethod
+    def pack(individuals: List[Genome]) -> Tuple[np.ndarray, ...]:
+        """
+        將族群打包為補齊後的陣列
+
+        Returns:
+            indices: 景點索引，補齊位置為 -1
+            starts: 開始時間（距行程第一天 00:00 的分鐘數）
+            mask: 有效位置
+        """
+        length = max(len(individual) for individual in individuals)
+        shape = (len(individuals), max(length, 1))
+        indices = np.full(shape, -1, dtype=np.int64)
+        starts = np.zeros(shape, dtype=np.int64)
+
+        # Genome 底層是 int32 buffer，可直接以 frombuffer 複製整列
+        for row, individual in enumerate(individuals):
+            size = len(individual)
+            indices[row, :size] = np.frombuffer(individual, dtype=np.int32)
+            starts[row, :size] = np.frombuffer(individual.starts,
+                                               dtype=np.int32)
+
+        return indices, starts, indices >= 0
+
+    @staticmethod
+    def __place_count(indices: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """每個個體中不同景點的數量"""
+        ordered = np.sort(np.where(mask, indices, -1), axis=1)
+        is_new = np.ones_like(mask)
+        is_new[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+        return (is_new & (ordered >= 0)).sum(axis=1)
+
+    def __restaurant_penalty(self, indices: np.ndarray, days: np.ndarray,
+                             minutes: np.ndarray,
+                             mask: np.ndarray) -> np.ndarray:
+        """以 (個體, 日期) 分組計算餐廳頻率與時段懲罰"""
+        config = self.restaurant_config
+        population_size = indices.shape[0]
+
+        restaurant = self.is_restaurant[indices] & mask
+        if not restaurant.any():
+            return np.zeros(population_size, dtype=np.float64)
+
+        day_ids = days - days[mask].min()
+        day_count = int(day_ids[mask].max()) + 1
+        groups = (np.arange(population_size)[:, None] * day_count +
+                  np.where(mask, day_ids, 0))
+        group_size = population_size * day_count
+
+        def count(selected):
+            return np.bincount(groups[selected],
+                               minlength=group_size).reshape(
+                                   population_size, day_count)
+
+        in_lunch = ((minutes >= self.lunch_window[0]) &
+                    (minutes <= self.lunch_window[1]))
+        in_dinner = (~in_lunch & (minutes >= self.dinner_window[0]) &
+                     (minutes <= self.dinner_window[1]))
+        bad_timing = ~in_lunch & ~in_dinner
+
+        restaurant_count = count(restaurant)
+        lunch_found = count(restaurant & in_lunch) > 0
+        dinner_found = count(restaurant & in_dinner) > 0
+        bad_timing_count = count(restaurant & bad_timing)
+
+        # 頻率懲罰
+        min_count = config['min_restaurants_per_day']
+        max_count = config['max_restaurants_per_day']
+        frequency_penalty = np.where(
+            restaurant_count < min_count,
+            (min_count - restaurant_count) * config['restaurant_penalty'],
+            np.where(restaurant_count > max_count,
+                     (restaurant_count - max_count) *
+                     config['restaurant_penalty'], 0.0))
+
+        # 時段懲罰
+        timing_penalty = config['timing_penalty'] * (
+            (~lunch_found & (restaurant_count > 0)).astype(np.float64) +
+            (~dinner_found & (restaurant_count > 1)).astype(np.float64) +
+            bad_timing_count)
+
+        # 只有當天有餐廳時才計算懲罰
+        penalty = np.where(restaurant_count > 0,
+                           frequency_penalty + timing_penalty, 0.0)
+        return penalty.sum(axis=1)
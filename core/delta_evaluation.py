@@ -0,0 +1,216 @@
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set
+
+from core.distance_matrix import DistanceMatrix
+from core.genome import Genome, MINUTES_PER_DAY
+
+
+class DeltaState:
+    """
+    個體的增量評估狀態，存放在 individual.delta
+
+    legs[i] 為第 i 與 i + 1 個景點之間的距離，days 為每天的
+    (價格總和, 評分總和, 評價數總和, 餐廳懲罰)。運算子修改個體後以 mark_* 標記
+    受影響的位置與天數，下次評估時只重新計算這些路段與天數。
+    """
+
+    def __init__(self, legs: List[float], days: Dict[int, tuple], length: int,
+                 last_day: Optional[int]):
+        self.legs = legs
+        self.days = days
+        self.length = length  # 上次計算時的景點數
+        self.last_day = last_day  # 上次計算時最後一個景點所在的天數
+        self.dirty_positions: Set[int] = set()
+        self.dirty_days: Set[int] = set()
+
+    def __deepcopy__(self, memo):
+        # 元素皆為不可變物件，淺複製容器即可
+        state = DeltaState(list(self.legs), dict(self.days), self.length,
+                           self.last_day)
+        state.dirty_positions = set(self.dirty_positions)
+        state.dirty_days = set(self.dirty_days)
+        return state
+
+
+def _state(individual: Genome) -> Optional[DeltaState]:
+    return getattr(individual, 'delta', None)
+
+
+def mark_positions(individual: Genome, positions: Iterable[int]):
+    """標記景點被替換或交換的位置（長度不變）"""
+    state = _state(individual)
+    if state is not None:
+        state.dirty_positions.update(positions)
+
+
+def mark_inserted(individual: Genome, position: int):
+    """在 position 插入景點之後呼叫"""
+    state = _state(individual)
+    if state is None:
+        return
+    state.legs.insert(min(position, len(state.legs)), 0.0)
+    state.dirty_positions = {
+        p + 1 if p >= position else p for p in state.dirty_positions
+    }
+    state.dirty_positions.add(position)
+
+
+def mark_deleted(individual: Genome, position: int, day: int):
+    """刪除 position 的景點之後呼叫，day 為被刪除景點所在的天數"""
+    state = _state(individual)
+    if state is None:
+        return
+    if state.legs:
+        del state.legs[min(position, len(state.legs) - 1)]
+    state.dirty_positions = {
+        p - 1 if p > position else p for p in state.dirty_positions
+        if p != position
+    }
+    state.dirty_positions.add(position)
+    state.dirty_days.add(day)
+
+
+def mark_replaced(individual: Genome, start: int, end: Optional[int],
+                  old_days: Iterable[int]):
+    """
+    [start, end) 區間被另一個個體的片段取代之後呼叫；end 為 None 表示整個尾段，
+    此時長度可能改變。old_days 為被取代片段原本所在的天數
+    """
+    state = _state(individual)
+    if state is None:
+        return
+    if end is None:
+        kept = max(start - 1, 0)
+        state.legs = state.legs[:kept] + [0.0] * max(len(individual) - 1 - kept, 0)
+        end = len(individual)
+    state.dirty_positions.update(range(start, end))
+    state.dirty_days.update(old_days)
+
+
+def mark_all(individual: Genome):
+    """整個個體都需要重新計算"""
+    if _state(individual) is not None:
+        individual.delta = None
+
+
+def segment_days(individual: Genome, start: int, end: Optional[int] = None) -> Set[int]:
+    """[start, end) 區間內景點所在的天數"""
+    return {value // MINUTES_PER_DAY for value in individual.starts[start:end]}
+
+
+class DeltaEvaluator:
+    """
+    增量計算原始評估指標
+
+    結果與 OptimizationProblem.calculate_raw_metrics 相同（浮點數加總順序不同，
+    可能有極小的誤差）。沒有增量狀態或狀態與個體長度不一致時會完整重新計算。
+    """
+
+    def __init__(self, waypoint_distances: DistanceMatrix,
+                 head_values: Sequence[tuple], is_restaurant: Sequence[bool],
+                 restaurant_day_penalty: Callable[[List[int]], float]):
+        self.distance = waypoint_distances.distance
+        self.head_values = head_values  # 每個景點索引的 (價格, 評分, 評價數)
+        self.is_restaurant = is_restaurant
+        self.restaurant_day_penalty = restaurant_day_penalty
+        self.full_evaluations = 0
+        self.delta_evaluations = 0
+
+    def raw_metrics(self, individual: Genome) -> Dict:
+        state = _state(individual)
+        length = len(individual)
+        if state is None or len(state.legs) != max(length - 1, 0):
+            state = self.__full_state(individual)
+            self.full_evaluations += 1
+        else:
+            self.__update_state(individual, state)
+            self.delta_evaluations += 1
+        individual.delta = state
+
+        price_level_sum = rating = user_rating_totals = restaurant_penalty = 0
+        for price, day_rating, totals, penalty in state.days.values():
+            price_level_sum += price
+            rating += day_rating
+            user_rating_totals += totals
+            restaurant_penalty += penalty
+
+        return {
+            'trip_length': sum(state.legs),
+            'price_level_sum': price_level_sum,
+            'rating': rating,
+            'user_rating_totals': user_rating_totals,
+            'restaurant_penalty': restaurant_penalty,
+            'place_count': len(set(individual))
+        }
+
+    def __full_state(self, individual: Genome) -> DeltaState:
+        legs = [
+            self.distance(individual[i], individual[i + 1])
+            for i in range(len(individual) - 1)
+        ]
+        days = self.__day_aggregates(individual, None)
+        return DeltaState(legs, days, len(individual),
+                          self.__last_day(individual))
+
+    def __update_state(self, individual: Genome, state: DeltaState):
+        length = len(individual)
+        dirty_days = set(state.dirty_days)
+
+        # 每個被修改的位置影響前後兩段路程與所在的天數
+        for position in state.dirty_positions:
+            if 0 <= position < length:
+                dirty_days.add(individual.starts[position] // MINUTES_PER_DAY)
+            for leg in (position - 1, position):
+                if 0 <= leg < length - 1:
+                    state.legs[leg] = self.distance(individual[leg],
+                                                    individual[leg + 1])
+
+        # 價格與評分只累計每段路程的起點，最後一個景點改變時其所在天數也要重算
+        last_day = self.__last_day(individual)
+        if length != state.length or (length - 1) in state.dirty_positions:
+            dirty_days.update((state.last_day, last_day))
+        dirty_days.discard(None)
+
+        if dirty_days:
+            updated = self.__day_aggregates(individual, dirty_days)
+            for day in dirty_days:
+                # 已沒有景點的天數直接移除
+                if day in updated:
+                    state.days[day] = updated[day]
+                else:
+                    state.days.pop(day, None)
+
+        state.length = length
+        state.last_day = last_day
+        state.dirty_positions.clear()
+        state.dirty_days.clear()
+
+    @staticmethod
+    def __last_day(individual: Genome) -> Optional[int]:
+        return individual.starts[-1] // MINUTES_PER_DAY if individual else None
+
+    def __day_aggregates(self, individual: Genome,
+                         days: Optional[Set[int]]) -> Dict[int, tuple]:
+        """計算指定天數（None 表示全部）的每日彙總"""
+        sums: Dict[int, list] = {}
+        restaurants: Dict[int, List[int]] = {}
+        last = len(individual) - 1
+        for position, (index, start) in enumerate(zip(individual,
+                                                      individual.starts)):
+            day = start // MINUTES_PER_DAY
+            if days is not None and day not in days:
+                continue
+            values = sums.setdefault(day, [0, 0.0, 0])
+            if position < last:
+                price, rating, totals = self.head_values[index]
+                values[0] += price
+                values[1] += rating
+                values[2] += totals
+            if self.is_restaurant[index]:
+                restaurants.setdefault(day, []).append(start % MINUTES_PER_DAY)
+
+        return {
+            day: (values[0], values[1], values[2],
+                  self.restaurant_day_penalty(restaurants[day])
+                  if day in restaurants else 0.0)
+            for day, values in sums.items()
+        }
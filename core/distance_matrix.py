@@ -0,0 +1,104 @@
+import numpy as np
+from collections.abc import Mapping
+from typing import Dict, FrozenSet, Iterator, List, Sequence
+
+
+class DistanceMatrix(Mapping):
+    """
+    以整數索引存取的對稱距離矩陣
+
+    距離以 condensed 形式（只存上三角、float32）保存，評估時透過
+    place_index 取得整數索引後直接查表，不需再建立 frozenset。
+    同時實作 Mapping[FrozenSet[str], float]，可當作舊的
+    waypoint_distances dict 使用。
+    """
+
+    def __init__(self, place_ids: Sequence[str], condensed: np.ndarray):
+        self.place_ids: List[str] = list(place_ids)
+        self.place_index: Dict[str, int] = {
+            place_id: index
+            for index, place_id in enumerate(self.place_ids)
+        }
+        self.size = len(self.place_ids)
+        self.condensed = np.asarray(condensed, dtype=np.float32)
+
+        expected = self.size * (self.size - 1) // 2
+        if self.condensed.shape != (expected, ):
+            raise ValueError(
+                f"condensed 長度應為 {expected}，實際為 {self.condensed.shape}")
+
+    @classmethod
+    def from_dict(cls, waypoint_distances: Dict[FrozenSet[str], float]):
+        """由舊的 frozenset 字典建立距離矩陣"""
+        if isinstance(waypoint_distances, cls):
+            return waypoint_distances
+
+        place_ids = sorted(
+            {place_id
+             for pair in waypoint_distances for place_id in pair})
+        matrix = cls(place_ids,
+                     np.zeros(len(place_ids) * (len(place_ids) - 1) // 2))
+        for pair, distance in waypoint_distances.items():
+            place1, place2 = tuple(pair)
+            matrix.condensed[matrix.condensed_index(
+                matrix.place_index[place1],
+                matrix.place_index[place2])] = distance
+        return matrix
+
+    def scaled(self, factor: float):
+        """回傳所有距離乘上 factor 的新矩陣（例如由距離換算時間）"""
+        return DistanceMatrix(self.place_ids, self.condensed * factor)
+
+    def index(self, place_id: str) -> int:
+        return self.place_index[place_id]
+
+    def condensed_index(self, i: int, j: int) -> int:
+        if i > j:
+            i, j = j, i
+        return self.size * i - i * (i + 1) // 2 + (j - i - 1)
+
+    def distance(self, i: int, j: int) -> float:
+        """以整數索引取得兩地點間的距離"""
+        if i == j:
+            return 0.0
+        return float(self.condensed[self.condensed_index(i, j)])
+
+    def distances(self, from_indices: np.ndarray,
+                  to_indices: np.ndarray) -> np.ndarray:
+        """向量化的距離查詢，from_indices 與 to_indices 逐元素配對"""
+        i = np.minimum(from_indices, to_indices).astype(np.int64)
+        j = np.maximum(from_indices, to_indices).astype(np.int64)
+        same = i == j
+        positions = self.size * i - i * (i + 1) // 2 + (j - i - 1)
+        result = self.condensed[np.where(same, 0, positions)]
+        return np.where(same, np.float32(0.0), result)
+
+    def to_square(self) -> np.ndarray:
+        """展開為完整的 n x n 矩陣"""
+        square = np.zeros((self.size, self.size), dtype=np.float32)
+        rows, cols = np.triu_indices(self.size, k=1)
+        square[rows, cols] = self.condensed
+        square[cols, rows] = self.condensed
+        return square
+
+    # Mapping 介面：保留 waypoint_distances[frozenset([a, b])] 的用法
+    def __getitem__(self, key) -> float:
+        place1, place2 = tuple(key)
+        return self.distance(self.place_index[place1],
+                             self.place_index[place2])
+
+    def __iter__(self) -> Iterator[FrozenSet[str]]:
+        for i in range(self.size):
+            for j in range(i + 1, self.size):
+                yield frozenset([self.place_ids[i], self.place_ids[j]])
+
+    def __len__(self) -> int:
+        return len(self.condensed)
+
+    def __contains__(self, key) -> bool:
+        try:
+            place1, place2 = tuple(key)
+        except (TypeError, ValueError):
+            return False
+        return (place1 != place2 and place1 in self.place_index
+                and place2 in self.place_index)
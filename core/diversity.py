@@ -0,0 +1,93 @@
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+# MinHash 使用的質數；a * x + b 在 uint64 中不會溢位（a, b, x < 2^31）
+_PRIME = (1 << 31) - 1
+
+
+def _popcount(bits: int) -> int:
+    return bin(bits).count('1')
+
+
+class DiversityFilter:
+    """
+    依加入順序保留彼此不過於相似的項目（元素集合的 Jaccard 相似度不超過 threshold）
+
+    每個項目的元素（例如景點索引）編碼為 bitset（Python int），相似度以 popcount 計算
+    |a & b| / |a | b|。保留的項目不超過 exact_limit 個時與每個保留的項目逐一比較；
+    超過後改用 MinHash + LSH：簽章分成 bands 段，只與至少一段相同的項目比較，
+    比較次數因此與保留數量無關，但相似度接近 threshold 的項目可能漏判。
+    元素完全相同的項目以雜湊判斷，一定會被移除；threshold 為 1.0 時只移除這些項目。
+    """
+
+    def __init__(self, threshold: float, exact_limit: int = 256, num_perm: int = 64,
+                 bands: int = 16, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.exact_limit = exact_limit
+        self.bands = bands
+        self.items: List[Any] = []  # 保留的項目
+        self.__elements: List[List[int]] = []
+        self.__bitsets: List[int] = []
+        self.__seen = set()
+        # 每一段簽章 -> 保留項目的位置；超過 exact_limit 後才建立
+        self.__buckets: Optional[List[Dict[bytes, List[int]]]] = None
+        rng = np.random.default_rng(seed)
+        self.__a = rng.integers(1, _PRIME, num_perm, dtype=np.uint64)[:, None]
+        self.__b = rng.integers(0, _PRIME, num_perm, dtype=np.uint64)[:, None]
+
+    def add(self, elements: Iterable[int], item: Any = None) -> bool:
+        """項目與保留的項目都不過於相似時保留並回傳 True"""
+        elements = list(elements)
+        bits = 0
+        for element in elements:
+            bits |= 1 << element
+        if bits in self.__seen:
+            return False
+
+        if self.threshold < 1.0:
+            if self.__buckets is None:
+                candidates = range(len(self.__bitsets))
+            else:
+                candidates = set()
+                for band, key in enumerate(self.__band_keys(elements)):
+                    candidates.update(self.__buckets[band].get(key, ()))
+            for position in candidates:
+                if self.__similar(bits, self.__bitsets[position]):
+                    return False
+
+        position = len(self.items)
+        self.items.append(item)
+        self.__elements.append(elements)
+        self.__bitsets.append(bits)
+        self.__seen.add(bits)
+        if self.__buckets is not None:
+            self.__index(position)
+        elif self.threshold < 1.0 and len(self.items) > self.exact_limit:
+            self.__buckets = [defaultdict(list) for _ in range(self.bands)]
+            for kept in range(len(self.items)):
+                self.__index(kept)
+        return True
+
+    def __similar(self, a: int, b: int) -> bool:
+        union = _popcount(a | b)
+        return union > 0 and _popcount(a & b) / union > self.threshold
+
+    def __band_keys(self, elements: List[int]) -> List[bytes]:
+        """MinHash 簽章分段後每段的 key"""
+        if elements:
+            values = np.asarray(elements, dtype=np.uint64)[None, :]
+            signature = ((self.__a * values + self.__b) % _PRIME).min(axis=1)
+        else:
+            signature = np.full(len(self.__a), _PRIME, dtype=np.uint64)
+        return [band.tobytes() for band in np.split(signature, self.bands)]
+
+    def __index(self, position: int):
+        for band, key in enumerate(self.__band_keys(self.__elements[position])):
+            self.__buckets[band][key].append(position)
+
+    def __len__(self) -> int:
+        return len(self.items)
@@ -0,0 +1,156 @@
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from core.distance_matrix import DistanceMatrix
+from core.genome import Genome, GenomeCodec, MINUTES_PER_DAY
+
+
+class ExactSolver:
+    """
+    小型實例的精確解：在營業時間與每天時段限制下選擇並排序景點
+
+    以深度優先的 branch-and-bound 搜尋，目標依序為景點數最多、餐廳懲罰最小、總距離最短。
+    每天從當天開始時間出發，景點開始時間為 max(開門時間, 前一個景點結束 + travel_buffer)，
+    必須在關門與當天結束時間前離開（與修復子代時的排程方式相同）。
+    剪枝使用兩種方式：
+      - 上界：剩餘時間最多還能放入的景點數（以最短停留時間估計）
+      - 支配：相同（天數、最後景點、已選集合、當天餐廳的用餐時段）的狀態中，
+        時間、距離與懲罰都不比先前狀態好時不再展開
+    搜尋的節點數超過 max_nodes 時停止，optimal 為 False，回傳目前找到的最佳解。
+    「最佳」只針對上述的字典序目標，不考慮 GA 的價格、評分與評價數目標，
+    因此結果不一定在 GA 的 Pareto front 上，也只回傳一個行程。
+    """
+
+    def __init__(self, waypoint_distances: DistanceMatrix, codec: GenomeCodec,
+                 day_windows: Sequence[Tuple[int, int]], is_restaurant: Sequence[bool],
+                 restaurant_day_penalty: Callable[[List[int]], float],
+                 restaurant_meal: Callable[[int], Optional[str]], travel_buffer: int,
+                 max_nodes: int = 50000):
+        self.places = list(codec.attraction_indices)
+        self.day_windows = list(day_windows)  # 每天的 (開始, 結束) 分鐘數
+        self.travel_buffer = travel_buffer
+        self.restaurant_day_penalty = restaurant_day_penalty
+        self.restaurant_meal = restaurant_meal
+        self.max_nodes = max_nodes
+
+        # 以 0..n-1 的區域索引存取，避免在搜尋中查詢全域索引
+        self.open = [codec.open_minutes[index] for index in self.places]
+        self.close = [codec.close_minutes[index] for index in self.places]
+        self.stay = [codec.stay_minutes[index] for index in self.places]
+        self.is_restaurant = [is_restaurant[index] for index in self.places]
+        self.distance = [[waypoint_distances.distance(i, j) for j in self.places]
+                         for i in self.places]
+        self.step = min(self.stay, default=0) + travel_buffer
+        self.latest_start = [close - stay for close, stay in zip(self.close, self.stay)]
+        # 進入每個景點最短的一段距離，用於距離的下界
+        self.nearest = [min((row[place] for other, row in enumerate(self.distance)
+                             if other != place), default=0.0)
+                        for place in range(len(self.places))]
+
+        self.nodes = 0
+        self.optimal = False
+        self.__best: Tuple = (0, 0.0, 0.0)
+        self.__best_path: List[Tuple[int, int]] = []
+        self.__labels: Dict[tuple, List[Tuple[int, float, float]]] = {}
+
+    def solve(self, genome_class=Genome) -> Optional[Genome]:
+        """回傳最佳行程，沒有任何可行景點時回傳 None"""
+        self.nodes = 0
+        self.optimal = True
+        self.__best = (0, 0.0, 0.0)
+        self.__best_path = []
+        self.__labels = {}
+        if not self.places or not self.day_windows:
+            return None
+
+        self.__search(0, self.day_windows[0][0], None, 0, 0, 0.0, 0.0, (), [])
+        if not self.__best_path:
+            return None
+        return genome_class([self.places[place] for place, _ in self.__best_path],
+                            [start for _, start in self.__best_path])
+
+    def __capacity(self, day: int, time: int) -> int:
+        """從 day 的 time 開始最多還能放入的景點數"""
+        if self.step <= 0:
+            return len(self.places)
+        start, end = self.day_windows[day]
+        capacity = max(end - time + self.travel_buffer, 0) // self.step
+        for later_start, later_end in self.day_windows[day + 1:]:
+            capacity += max(later_end - later_start + self.travel_buffer, 0) // self.step
+        return capacity
+
+    def __reachable(self, day: int, time: int, mask: int) -> List[int]:
+        """尚未選擇、且在 day 的 time 之後還能在營業時間內安排的景點"""
+        later_day = day + 1 < len(self.day_windows)
+        return [place for place, latest in enumerate(self.latest_start)
+                if not mask & (1 << place)
+                and (time <= latest or later_day and self.open[place] <= latest)]
+
+    def __day_penalty(self, restaurants: tuple) -> float:
+        # 沒有餐廳的天數不計算懲罰（與 OptimizationProblem 相同）
+        return self.restaurant_day_penalty(list(restaurants)) if restaurants else 0.0
+
+    def __search(self, day, time, last, mask, count, distance, closed_penalty,
+                 restaurants, path):
+        if not self.optimal:
+            return
+        self.nodes += 1
+        if self.nodes > self.max_nodes:
+            self.optimal = False
+            return
+
+        # 目前的行程本身也是一個解（之後的天數不再安排景點）
+        value = (-count, closed_penalty + self.__day_penalty(restaurants), distance)
+        if not self.__best_path or value < self.__best:
+            self.__best = value
+            self.__best_path = list(path)
+
+        # 之後最多再增加的景點數；懲罰與距離只會增加
+        reachable = self.__reachable(day, time, mask)
+        upper = count + min(len(reachable), self.__capacity(day, time))
+        if (-upper, closed_penalty, distance) >= self.__best:
+            return
+        best_count = -self.__best[0]
+        if upper == best_count and count < best_count:
+            # 景點數無法超過目前的最佳解時，至少還要再走 best_count - count 段
+            bound = distance + sum(sorted(self.nearest[place] for place in reachable)
+                                   [:best_count - count])
+            if (closed_penalty, bound) >= self.__best[1:]:
+                return
+
+        # 餐廳懲罰只與每間餐廳落在哪個用餐時段有關
+        meals = tuple(sorted(str(self.restaurant_meal(start)) for start in restaurants))
+        key = (day, last, mask, meals)
+        labels = self.__labels.setdefault(key, [])
+        for label_time, label_distance, label_penalty in labels:
+            if (label_time <= time and label_distance <= distance
+                    and label_penalty <= closed_penalty):
+                return
+        labels[:] = [label for label in labels
+                     if not (time <= label[0] and distance <= label[1]
+                             and closed_penalty <= label[2])]
+        labels.append((time, distance, closed_penalty))
+
+        day_start, day_end = self.day_windows[day]
+        candidates = reachable
+        if last is not None:
+            # 先嘗試較近的景點，較早找到好的解以加強剪枝
+            candidates.sort(key=self.distance[last].__getitem__)
+        for place in candidates:
+            start = max(self.open[place], time)
+            end = start + self.stay[place]
+            if start > self.latest_start[place] or end > day_end:
+                continue
+            path.append((place, day * MINUTES_PER_DAY + start))
+            self.__search(day, end + self.travel_buffer, place, mask | (1 << place),
+                          count + 1,
+                          distance + (self.distance[last][place] if last is not None else 0.0),
+                          closed_penalty,
+                          restaurants + (start, ) if self.is_restaurant[place] else restaurants,
+                          path)
+            path.pop()
+
+        # 結束這一天，從下一天的開始時間繼續
+        if day + 1 < len(self.day_windows):
+            self.__search(day + 1, self.day_windows[day + 1][0], last, mask, count,
+                          distance, closed_penalty + self.__day_penalty(restaurants), (),
+                          path)
@@ -0,0 +1,74 @@
+import math
+from datetime import datetime, time
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from core.genome import GenomeCodec, minutes_of_day
+
+
+class FeasibilityTable:
+    """
+    每天各景點可行的開始時間範圍（當天的分鐘數）
+
+    earliest[day, i] 為 max(開門時間, 當天開始時間)，latest[day, i] 為
+    min(關門時間, 當天結束時間) - 停留時間；景點 i 可以在 day 的 minute 開始
+    當且僅當 earliest[day, i] <= minute <= latest[day, i]。表格建立後唯讀，
+    檢查可行性只需查表，不必每次以 datetime.combine 與 timedelta 計算。
+    """
+
+    def __init__(self, open_minutes: Sequence[int], close_minutes: Sequence[int],
+                 stay_minutes: Sequence[int], day_windows: Sequence[Tuple[int, int]],
+                 origins: Sequence[datetime] = ()):
+        open_minutes = np.asarray(open_minutes, dtype=np.int32)
+        stay_minutes = np.asarray(stay_minutes, dtype=np.int32)
+        close_minutes = np.asarray(close_minutes, dtype=np.int32)
+        windows = np.asarray(day_windows, dtype=np.int32).reshape(-1, 2)
+        self.earliest = np.maximum(open_minutes[None, :], windows[:, :1])
+        self.latest = np.minimum(close_minutes[None, :], windows[:, 1:]) - stay_minutes[None, :]
+        # 不受當天時間範圍限制的最晚開始時間（行程天數之外的景點使用）
+        self.latest_any = close_minutes - stay_minutes
+        for table in (self.earliest, self.latest, self.latest_any):
+            table.flags.writeable = False
+        # 每天 00:00，將 datetime 換算為當天的分鐘數
+        self.origins = list(origins)
+
+    @classmethod
+    def from_codec(cls, codec: GenomeCodec, day_configs) -> 'FeasibilityTable':
+        """以 place_index 為欄位的表格"""
+        return cls(codec.open_minutes, codec.close_minutes, codec.stay_minutes,
+                   cls.day_windows(day_configs), cls.day_origins(day_configs))
+
+    @classmethod
+    def from_attractions(cls, attractions, day_configs) -> 'FeasibilityTable':
+        """以景點在 attractions 中的位置為欄位的表格"""
+        return cls([minutes_of_day(a.open_time) for a in attractions],
+                   [minutes_of_day(a.close_time) for a in attractions],
+                   [round(a.stay_time * 60) for a in attractions],
+                   cls.day_windows(day_configs), cls.day_origins(day_configs))
+
+    @staticmethod
+    def day_windows(day_configs) -> List[Tuple[int, int]]:
+        return [(minutes_of_day(day.start_time), minutes_of_day(day.end_time))
+                for day in day_configs]
+
+    @staticmethod
+    def day_origins(day_configs) -> List[datetime]:
+        return [datetime.combine(day.date.date(), time.min) for day in day_configs]
+
+    def minute(self, day: int, value: datetime) -> int:
+        """value 換算為 day 當天的分鐘數（不足一分鐘進位）"""
+        return math.ceil((value - self.origins[day]).total_seconds() / 60)
+
+    def feasible(self, day: int, minute: int) -> np.ndarray:
+        """各景點能否在 day 的 minute 開始的布林陣列"""
+        return (self.earliest[day] <= minute) & (minute <= self.latest[day])
+
+    def can_start(self, day: int, place: int, minute: int) -> bool:
+        return self.earliest[day, place] <= minute <= self.latest[day, place]
+
+    def latest_starts(self, day: int) -> np.ndarray:
+        """day 各景點最晚的開始時間，day 超出行程天數時只考慮關門時間"""
+        if 0 <= day < len(self.latest):
+            return self.latest[day]
+        return self.latest_any
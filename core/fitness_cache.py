@@ -0,0 +1,55 @@
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+from core.genome import Genome
+
+
+class FitnessCache:
+    """
+    以 LRU 淘汰的評估結果快取
+
+    key 為行程的標準簽章（景點順序 + 開始時間），value 為尚未歸一化的原始指標。
+    因為歸一化仍在主程序中依序進行，命中快取與重新評估得到的 fitness 相同。
+    max_size 為 0 時停用快取。
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self.entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def signature(individual: Genome) -> Tuple[bytes, bytes]:
+        """行程的標準簽章：景點索引與開始時間的 buffer"""
+        return individual.tobytes(), individual.starts.tobytes()
+
+    def get(self, key: Hashable) -> Optional[Dict]:
+        metrics = self.entries.get(key)
+        if metrics is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return metrics
+
+    def put(self, key: Hashable, metrics: Dict):
+        if self.max_size <= 0:
+            return
+        self.entries[key] = metrics
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self):
+        return len(self.entries)
@@ -1,11 +1,19 @@
+import itertools
+import multiprocessing
 import random
+import time
 from datetime import datetime, timedelta
-from typing import List, Dict, Set, Tuple, Any
+from typing import List, Dict, Set, Tuple, Any, Optional, Iterator
 from dataclasses import dataclass
 import logging
 from collections import defaultdict
 import unittest
 
+import numpy as np
+
+from core.diversity import DiversityFilter
+from core.feasibility import FeasibilityTable
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -162,22 +170,53 @@ class GeneratorConfig:
     min_attractions_per_day: int = 2
     max_attractions_per_day: int = 6  # 增加最大值
     travel_time: timedelta = timedelta(minutes=30)
-    attempts_per_strategy: int = 500  # 每個策略的嘗試次數
+    attempts_per_strategy: int = 500  # 每個策略最多的嘗試次數
     max_retry_per_day: int = 10  # 每天的最大重試次數
     similarity_threshold: float = 0.95  # 提高相似度閾值
     min_total_schedules: int = 20  # 最少生成的行程數
-    max_total_schedules: int = 100  # 最多生成的行程數
+    max_total_schedules: int = 100  # 未指定數量時最多生成的行程數
+    workers: int = 1  # 大於 1 時以 process pool 平行執行各策略的嘗試
+    batch_size: int = 50  # 每個工作（策略、嘗試次數、亂數種子）的嘗試次數
+    seed: Optional[int] = None  # 產生每個工作亂數種子的主種子，None 表示由 random 模組產生
+    # 生成的預算，None 表示不限制；用完時回傳目前已有的行程
+    time_budget: Optional[float] = None  # 秒數
+    max_attempts: Optional[int] = None  # 所有策略合計的嘗試次數
+
+
+# 平行產生行程時，每個 worker process 各自持有一份生成器，於 pool 啟動時建立
+_worker_generator = None
+
+
+def _init_generator_worker(attractions, day_configs, place_additional_info, config):
+    global _worker_generator
+    _worker_generator = MultiDayScheduleGenerator(attractions, day_configs,
+                                                  place_additional_info, config)
+
+
+def _generate_batch(task: Tuple[str, int, int]):
+    return _worker_generator.generate_batch(*task)
 
 
 class MultiDayScheduleGenerator:
+    # 初始行程的生成策略，依序產生工作；geo 需要所有景點的經緯度
+    STRATEGIES = ('geo', 'greedy', 'random', 'timeslot', 'cluster')
 
     def __init__(self, attractions: List[Attraction],
                  day_configs: List[DayConfig],
-                 place_additional_info: Dict[str, Dict[str, Any]]):
+                 place_additional_info: Dict[str, Dict[str, Any]],
+                 config: Optional[GeneratorConfig] = None):
         self.attractions = attractions
         self.day_configs = day_configs
         self.place_additional_info = place_additional_info
-        self.config = GeneratorConfig()
+        self.config = config or GeneratorConfig()
+        # 景點在 attractions 中的位置，作為多樣性過濾的 bitset 元素
+        self.__place_index = {attraction.name: index
+                              for index, attraction in enumerate(attractions)}
+        # 每天各景點可行的開始時間範圍，以景點在 attractions 中的位置查表
+        self.__feasibility = FeasibilityTable.from_attractions(attractions, day_configs)
+        self.__coordinates = self.__init_coordinates()
+        # 各策略使用的亂數來源，generate_batch() 為每個工作建立獨立的亂數序列
+        self.rng = random.Random(self.config.seed)
         self.__init_attraction_stats()
 
     def __init_attraction_stats(self):
@@ -205,6 +244,28 @@ class MultiDayScheduleGenerator:
             })
         }
 
+    def __init_coordinates(self) -> Optional[np.ndarray]:
+        """
+        景點的平面座標 (緯度, 經度 * cos(平均緯度))，在城市的範圍內距離與實際距離成正比；
+        任一景點缺少經緯度時為 None
+        """
+        points = []
+        for attraction in self.attractions:
+            info = self.place_additional_info.get(attraction.name, {})
+            if info.get('lat') is None or info.get('lng') is None:
+                return None
+            points.append((info['lat'], info['lng']))
+        if not points:
+            return None
+        points = np.asarray(points, dtype=float)
+        points[:, 1] *= np.cos(np.radians(points[:, 0].mean()))
+        return points
+
+    def strategies(self) -> Tuple[str, ...]:
+        """可以使用的策略"""
+        return tuple(name for name in self.STRATEGIES
+                     if name != 'geo' or self.__coordinates is not None)
+
     def __normalize_values(self, value_dict: Dict[str,
                                                   float]) -> Dict[str, float]:
         """將值正規化到0-1範圍"""
@@ -219,52 +280,161 @@ class MultiDayScheduleGenerator:
             for k, v in value_dict.items()
         }
 
-    def generate_population(self) -> List[List[List[AttractionModify]]]:
-        """生成多天行程方案"""
-        all_schedules = []
-
-        # 使用不同策略生成行程
-        strategies = [('greedy', self.__generate_greedy_schedules),
-                      ('random', self.__generate_random_schedules),
-                      ('timeslot', self.__generate_timeslot_based_schedules),
-                      ('cluster', self.__generate_cluster_based_schedules)]
-
-        for strategy_name, strategy_func in strategies:
-            logger.info(f"Generating schedules using {strategy_name} strategy")
-            schedules = strategy_func()
-            valid_schedules = [
-                s for s in schedules if self.__is_valid_schedule(s)
-            ]
-            all_schedules.extend(valid_schedules)
+    def generate_population(self, target: Optional[int] = None) -> List[List[List[AttractionModify]]]:
+        """
+        生成最多 target 個（預設 max_total_schedules）彼此不過於相似的多天行程方案
+
+        各策略輪流以工作為單位產生行程：每個工作嘗試 batch_size 次並有獨立的亂數種子，
+        workers > 1 時以 process pool 平行執行。有效的行程依工作順序加入，
+        與已保留的行程過於相似者（DiversityFilter）捨棄；保留的數量達到 target、用完時間或嘗試次數的預算，
+        或所有策略都達到 attempts_per_strategy 時停止。
+        結果依工作順序合併，因此沒有時間預算時，相同的 seed 不論 workers 多少都產生相同的行程
+        """
+        target = target or self.config.max_total_schedules
+        deadline = (time.perf_counter() + self.config.time_budget
+                    if self.config.time_budget is not None else None)
+        seed = self.config.seed if self.config.seed is not None else random.getrandbits(32)
+        seeds = random.Random(seed)
+        diverse = DiversityFilter(self.config.similarity_threshold)
+        valid_counts = defaultdict(int)
+        attempts = 0
+
+        def enough() -> bool:
+            return (len(diverse) >= target
+                    or deadline is not None and time.perf_counter() >= deadline)
+
+        def collect(tasks, results):
+            nonlocal attempts
+            for (strategy_name, batch_attempts, _), valid_schedules in zip(tasks, results):
+                attempts += batch_attempts
+                valid_counts[strategy_name] += len(valid_schedules)
+                for schedule in valid_schedules:
+                    diverse.add((self.__place_index[attr_mod.attr.name]
+                                 for day_schedule in schedule for attr_mod in day_schedule),
+                                schedule)
+                if enough():
+                    break
+
+        tasks = list(self.__tasks(seeds))
+        workers = min(self.config.workers, len(tasks))
+        if workers > 1:
+            # imap 依工作順序取得結果；提前停止時離開 with 會終止其餘的工作
+            with multiprocessing.Pool(processes=workers,
+                                      initializer=_init_generator_worker,
+                                      initargs=(self.attractions, self.day_configs,
+                                                self.place_additional_info,
+                                                self.config)) as pool:
+                collect(tasks, pool.imap(_generate_batch, tasks))
+        else:
+            collect(tasks, (self.generate_batch(*task) for task in tasks))
+
+        for strategy_name in self.strategies():
             logger.info(
-                f"Generated {len(valid_schedules)} valid schedules using {strategy_name} strategy"
+                f"Generated {valid_counts[strategy_name]} valid schedules using {strategy_name} strategy"
             )
 
-        # 確保生成足夠的行程
-        while len(all_schedules) < self.config.min_total_schedules:
+        # 確保生成足夠的行程；預算用完或一批都沒有新的行程時停止
+        while len(diverse) < self.config.min_total_schedules and not enough():
+            if self.config.max_attempts is not None and attempts >= self.config.max_attempts:
+                break
             logger.info(
-                f"Not enough schedules ({len(all_schedules)}), generating more..."
+                f"Not enough schedules ({len(diverse)}), generating more..."
             )
-            additional = self.__generate_random_schedules()
-            valid_additional = [
-                s for s in additional if self.__is_valid_schedule(s)
-            ]
-            all_schedules.extend(valid_additional)
-
-        # 確保多樣性並限制數量
-        diverse_schedules = self.__ensure_diversity(all_schedules)
-        if len(diverse_schedules) > self.config.max_total_schedules:
-            diverse_schedules = diverse_schedules[:self.config.
-                                                  max_total_schedules]
-
+            before = len(diverse)
+            task = ('random', self.config.batch_size, seeds.getrandbits(32))
+            collect([task], [self.generate_batch(*task)])
+            if len(diverse) == before:
+                break
+
+        # 依綜合得分排序
+        schedules = sorted(diverse.items, key=self.__calculate_schedule_score,
+                           reverse=True)[:target]
         logger.info(
-            f"Final number of diverse schedules: {len(diverse_schedules)}")
-        return diverse_schedules
+            f"Final number of diverse schedules: {len(schedules)} ({attempts} attempts)")
+        return schedules
+
+    def __tasks(self, seeds: random.Random) -> Iterator[Tuple[str, int, int]]:
+        """各策略輪流的工作 (策略, 嘗試次數, 亂數種子)，受 attempts_per_strategy 與 max_attempts 限制"""
+        remaining = {name: self.config.attempts_per_strategy for name in self.strategies()}
+        budget = self.config.max_attempts
+        while any(remaining.values()) and (budget is None or budget > 0):
+            for strategy_name in remaining:
+                attempts = min(self.config.batch_size, remaining[strategy_name])
+                if budget is not None:
+                    attempts = min(attempts, budget)
+                    budget -= attempts
+                if attempts <= 0:
+                    continue
+                remaining[strategy_name] -= attempts
+                yield strategy_name, attempts, seeds.getrandbits(32)
+
+    def generate_batch(self, strategy_name: str, attempts: int,
+                       seed: int) -> List[List[List[AttractionModify]]]:
+        """以 seed 的亂數序列執行 strategy_name 策略 attempts 次，回傳有效的行程"""
+        self.rng = random.Random(seed)
+        strategies = {'geo': self.__iter_geo_schedules,
+                      'greedy': self.__iter_greedy_schedules,
+                      'random': self.__iter_random_schedules,
+                      'timeslot': self.__iter_timeslot_based_schedules,
+                      'cluster': self.__iter_cluster_based_schedules}
+        schedules = itertools.islice(strategies[strategy_name](), attempts)
+        return [s for s in schedules if s and self.__is_valid_schedule(s)]
+
+    # 以下各策略為無限的產生器，每次嘗試產生一個行程，失敗時為空行程
+
+    def __iter_geo_schedules(self) -> Iterator[List[List[AttractionModify]]]:
+        """
+        使用地理分群策略生成行程：以 k-means 將景點依位置分成與天數相同的群，
+        每天從一群中以最近鄰順序安排景點，行程因此不會在城市中來回折返
+        """
+        while True:
+            labels = self.__kmeans(min(len(self.day_configs), len(self.attractions)))
+            clusters = [np.flatnonzero(labels == cluster).tolist()
+                        for cluster in range(labels.max() + 1)]
+            self.rng.shuffle(clusters)
 
-    def __generate_greedy_schedules(
-            self) -> List[List[List[AttractionModify]]]:
+            schedule = []
+            used_positions = set()
+            for day, day_config in enumerate(self.day_configs):
+                cluster = clusters[day] if day < len(clusters) else []
+                day_schedule = self.__generate_day_schedule_nearest(
+                    cluster, day, day_config, used_positions)
+                if not day_schedule:
+                    break
+                schedule.append(day_schedule)
+                used_positions.update(self.__place_index[attr_mod.attr.name]
+                                      for attr_mod in day_schedule)
+
+            yield schedule if len(schedule) == len(self.day_configs) else []
+
+    def __kmeans(self, k: int, iterations: int = 20) -> np.ndarray:
+        """以 k-means++ 初始化的 k-means，回傳每個景點所屬的群；初始中心由 self.rng 決定"""
+        points = self.__coordinates
+        centers = [points[self.rng.randrange(len(points))]]
+        for _ in range(1, k):
+            squared = ((points[:, None, :] - np.asarray(centers)[None, :, :])**2).sum(axis=2).min(axis=1)
+            cumulative = np.cumsum(squared)
+            if cumulative[-1] <= 0:
+                centers.append(points[self.rng.randrange(len(points))])
+                continue
+            position = int(np.searchsorted(cumulative, self.rng.random() * cumulative[-1],
+                                           side='right'))
+            centers.append(points[min(position, len(points) - 1)])
+
+        centers = np.asarray(centers)
+        labels = np.zeros(len(points), dtype=int)
+        for _ in range(iterations):
+            labels = ((points[:, None, :] - centers[None, :, :])**2).sum(axis=2).argmin(axis=1)
+            updated = np.array([points[labels == cluster].mean(axis=0)
+                                if (labels == cluster).any() else centers[cluster]
+                                for cluster in range(k)])
+            if np.allclose(updated, centers):
+                break
+            centers = updated
+        return labels
+
+    def __iter_greedy_schedules(self) -> Iterator[List[List[AttractionModify]]]:
         """使用貪婪策略生成行程"""
-        schedules = []
         priority_functions = [
             lambda a: self.attraction_stats['rating'][a.name],
             lambda a: -self.attraction_stats['price'][a.name],
@@ -274,39 +444,24 @@ class MultiDayScheduleGenerator:
                  'popularity'][a.name] * 0.3)
         ]
 
-        for _ in range(self.config.attempts_per_strategy):
-            priority_func = random.choice(priority_functions)
-            schedule = self.__generate_one_schedule(
+        while True:
+            priority_func = self.rng.choice(priority_functions)
+            yield self.__generate_one_schedule(
                 sorted(self.attractions, key=priority_func, reverse=True))
-            if schedule:
-                schedules.append(schedule)
 
-        return schedules
-
-    def __generate_random_schedules(
-            self) -> List[List[List[AttractionModify]]]:
+    def __iter_random_schedules(self) -> Iterator[List[List[AttractionModify]]]:
         """使用隨機策略生成行程"""
-        schedules = []
-        for _ in range(self.config.attempts_per_strategy):
+        while True:
             attractions = list(self.attractions)
-            random.shuffle(attractions)
-            schedule = self.__generate_one_schedule(attractions)
-            if schedule:
-                schedules.append(schedule)
-        return schedules
+            self.rng.shuffle(attractions)
+            yield self.__generate_one_schedule(attractions)
 
-    def __generate_timeslot_based_schedules(
-            self) -> List[List[List[AttractionModify]]]:
+    def __iter_timeslot_based_schedules(self) -> Iterator[List[List[AttractionModify]]]:
         """使用時間槽策略生成行程"""
-        schedules = []
-        for _ in range(self.config.attempts_per_strategy):
-            schedule = self.__generate_one_schedule_with_timeslots()
-            if schedule:
-                schedules.append(schedule)
-        return schedules
+        while True:
+            yield self.__generate_one_schedule_with_timeslots()
 
-    def __generate_cluster_based_schedules(
-            self) -> List[List[List[AttractionModify]]]:
+    def __iter_cluster_based_schedules(self) -> Iterator[List[List[AttractionModify]]]:
         """使用聚類策略生成行程"""
         # 根據營業時間聚類
         clusters = defaultdict(list)
@@ -315,24 +470,20 @@ class MultiDayScheduleGenerator:
                    attraction.close_time.hour // 3)
             clusters[key].append(attraction)
 
-        schedules = []
-        for _ in range(self.config.attempts_per_strategy):
+        while True:
             schedule = []
             used_attractions = set()
 
-            for day_config in self.day_configs:
+            for day, day_config in enumerate(self.day_configs):
                 day_schedule = self.__generate_day_schedule_from_clusters(
-                    clusters, day_config, used_attractions)
+                    clusters, day, day_config, used_attractions)
                 if not day_schedule:
                     break
                 schedule.append(day_schedule)
                 used_attractions.update(attr.attr.name
                                         for attr in day_schedule)
 
-            if len(schedule) == len(self.day_configs):
-                schedules.append(schedule)
-
-        return schedules
+            yield schedule if len(schedule) == len(self.day_configs) else []
 
     def __generate_one_schedule(
             self,
@@ -341,9 +492,9 @@ class MultiDayScheduleGenerator:
         schedule = []
         used_attractions = set()
 
-        for day_config in self.day_configs:
+        for day, day_config in enumerate(self.day_configs):
             day_schedule = self.__generate_day_schedule(
-                attractions, day_config, used_attractions)
+                attractions, day, day_config, used_attractions)
             if not day_schedule:
                 return []
             schedule.append(day_schedule)
@@ -352,7 +503,7 @@ class MultiDayScheduleGenerator:
         return schedule if len(schedule) == len(self.day_configs) else []
 
     def __generate_day_schedule(
-            self, attractions: List[Attraction], day_config: DayConfig,
+            self, attractions: List[Attraction], day: int, day_config: DayConfig,
             used_attractions: Set[str]) -> List[AttractionModify]:
         """生成單天行程"""
         for _ in range(self.config.max_retry_per_day):
@@ -367,15 +518,13 @@ class MultiDayScheduleGenerator:
                    and available_attractions):
 
                 # 找出當前時間可用的景點
-                suitable_attractions = [
-                    a for a in available_attractions
-                    if self.__can_add_to_schedule(a, current_time, day_config)
-                ]
+                suitable_attractions = self.__suitable(
+                    available_attractions, day, current_time)
 
                 if not suitable_attractions:
                     break
 
-                attraction = random.choice(suitable_attractions)
+                attraction = self.rng.choice(suitable_attractions)
                 available_attractions.remove(attraction)
 
                 end_time = current_time + timedelta(hours=attraction.stay_time)
@@ -396,7 +545,7 @@ class MultiDayScheduleGenerator:
         schedule = []
         used_attractions = set()
 
-        for day_config in self.day_configs:
+        for day, day_config in enumerate(self.day_configs):
             time_slots = self.__create_time_slots(day_config)
             day_schedule = []
 
@@ -405,13 +554,12 @@ class MultiDayScheduleGenerator:
                     break
 
                 suitable_attractions = [
-                    a for a in self.attractions
-                    if (a.name not in used_attractions and
-                        self.__can_add_to_schedule(a, slot_start, day_config))
+                    a for a in self.__suitable(self.attractions, day, slot_start)
+                    if a.name not in used_attractions
                 ]
 
                 if suitable_attractions:
-                    attraction = random.choice(suitable_attractions)
+                    attraction = self.rng.choice(suitable_attractions)
                     day_schedule.append(
                         AttractionModify(
                             attr=attraction,
@@ -429,7 +577,7 @@ class MultiDayScheduleGenerator:
 
     def __generate_day_schedule_from_clusters(
             self, clusters: Dict[Tuple[int, int],
-                                 List[Attraction]], day_config: DayConfig,
+                                 List[Attraction]], day: int, day_config: DayConfig,
             used_attractions: Set[str]) -> List[AttractionModify]:
         """從聚類中生成單天行程"""
         for _ in range(self.config.max_retry_per_day):
@@ -443,13 +591,12 @@ class MultiDayScheduleGenerator:
                     break
 
                 available_attractions = [
-                    a for a in clusters[key]
-                    if (a.name not in used_attractions and self.
-                        __can_add_to_schedule(a, current_time, day_config))
+                    a for a in self.__suitable(clusters[key], day, current_time)
+                    if a.name not in used_attractions
                 ]
 
                 if available_attractions:
-                    attraction = random.choice(available_attractions)
+                    attraction = self.rng.choice(available_attractions)
                     end_time = current_time + timedelta(
                         hours=attraction.stay_time)
                     day_schedule.append(
@@ -463,20 +610,58 @@ class MultiDayScheduleGenerator:
 
         return []
 
-    def __can_add_to_schedule(self, attraction: Attraction,
-                              current_time: datetime,
-                              day_config: DayConfig) -> bool:
-        """檢查是否可以將景點添加到當前時間"""
-        # 調整時間到當天
-        attraction_open_time = datetime.combine(day_config.date.date(),
-                                                attraction.open_time.time())
-        attraction_close_time = datetime.combine(day_config.date.date(),
-                                                 attraction.close_time.time())
-        visit_end_time = current_time + timedelta(hours=attraction.stay_time)
-
-        return (current_time >= attraction_open_time
-                and visit_end_time <= attraction_close_time
-                and visit_end_time <= day_config.end_time)
+    def __generate_day_schedule_nearest(
+            self, cluster: List[int], day: int, day_config: DayConfig,
+            used_positions: Set[int]) -> List[AttractionModify]:
+        """
+        從群中隨機的景點開始，依序排入離上一個景點最近且可行的景點；
+        群中的景點不足 min_attractions_per_day 時，從其他未使用的景點中補足
+        """
+        everywhere = range(len(self.attractions))
+        for _ in range(self.config.max_retry_per_day):
+            day_schedule = []
+            visited = set()
+            current_time = day_config.start_time
+            last = None
+
+            while (len(day_schedule) < self.config.max_attractions_per_day
+                   and current_time < day_config.end_time):
+                feasible = self.__feasibility.feasible(
+                    day, self.__feasibility.minute(day, current_time)).tolist()
+                candidates = [p for p in cluster
+                              if feasible[p] and p not in used_positions and p not in visited]
+                if not candidates and len(day_schedule) < self.config.min_attractions_per_day:
+                    candidates = [p for p in everywhere
+                                  if feasible[p] and p not in used_positions and p not in visited]
+                if not candidates:
+                    break
+
+                if last is None:
+                    position = self.rng.choice(candidates)
+                else:
+                    squared = ((self.__coordinates[candidates] -
+                                self.__coordinates[last])**2).sum(axis=1)
+                    position = candidates[int(squared.argmin())]
+                attraction = self.attractions[position]
+                end_time = current_time + timedelta(hours=attraction.stay_time)
+                day_schedule.append(
+                    AttractionModify(attr=attraction,
+                                     time_range=TimeRange(current_time, end_time)))
+                visited.add(position)
+                last = position
+                current_time = end_time + self.config.travel_time
+
+            if len(day_schedule) >= self.config.min_attractions_per_day:
+                return day_schedule
+
+        return []
+
+    def __suitable(self, attractions: List[Attraction], day: int,
+                   current_time: datetime) -> List[Attraction]:
+        """attractions 中可以在 day 的 current_time 開始（營業中且能在關門與當天結束前離開）的景點"""
+        feasible = self.__feasibility.feasible(
+            day, self.__feasibility.minute(day, current_time)).tolist()
+        return [a for a in attractions if feasible[self.__place_index[a.name]]]
 
     def __create_time_slots(
             self, day_config: DayConfig) -> List[Tuple[datetime, datetime]]:
@@ -524,20 +709,6 @@ class MultiDayScheduleGenerator:
 
         return True
 
-    def __ensure_diversity(
-        self, schedules: List[List[List[AttractionModify]]]
-    ) -> List[List[List[AttractionModify]]]:
-        """確保行程多樣性"""
-        diverse_schedules = []
-        schedules.sort(key=lambda x: self.__calculate_schedule_score(x),
-                       reverse=True)
-
-        for schedule in schedules:
-            if not self.__is_too_similar(schedule, diverse_schedules):
-                diverse_schedules.append(schedule)
-
-        return diverse_schedules
-
     def __calculate_schedule_score(
             self, schedule: List[List[AttractionModify]]) -> float:
         """計算行程的綜合得分"""
@@ -561,43 +732,21 @@ class MultiDayScheduleGenerator:
 
         return total_score / total_attractions if total_attractions > 0 else 0
 
-    def __is_too_similar(
-            self, schedule: List[List[AttractionModify]],
-            existing_schedules: List[List[List[AttractionModify]]]) -> bool:
-        """檢查行程是否與現有行程過於相似"""
-        schedule_attractions = set()
-        for day_schedule in schedule:
-            schedule_attractions.update(attr.attr.name
-                                        for attr in day_schedule)
-
-        for existing_schedule in existing_schedules:
-            existing_attractions = set()
-            for day_schedule in existing_schedule:
-                existing_attractions.update(attr.attr.name
-                                            for attr in day_schedule)
-
-            intersection = len(
-                schedule_attractions.intersection(existing_attractions))
-            union = len(schedule_attractions.union(existing_attractions))
-
-            if intersection / union > self.config.similarity_threshold:
-                return True
-
-        return False
-
 
 class MultiDayInitIndividual:
 
     def __init__(self, attractions: List[Attraction],
                  day_configs: List[DayConfig],
-                 place_additional_info: Dict[str, Dict[str, Any]]) -> None:
+                 place_additional_info: Dict[str, Dict[str, Any]],
+                 config: Optional[GeneratorConfig] = None) -> None:
         self.generator = MultiDayScheduleGenerator(
             attractions=attractions,
             day_configs=day_configs,
-            place_additional_info=place_additional_info)
+            place_additional_info=place_additional_info,
+            config=config)
 
-    def getInitIndi(self):
-        return self.generator.generate_population()
+    def getInitIndi(self, target: Optional[int] = None):
+        return self.generator.generate_population(target)
 
 
 import unittest
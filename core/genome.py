@@ -0,0 +1,103 @@
+import array
+import copy
+from datetime import datetime, time, timedelta
+from typing import Dict, List, Sequence, Tuple
+
+from core.generate_initial_trip import Attraction, AttractionModify, TimeRange
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def minutes_of_day(value) -> int:
+    """datetime / time 在當天的分鐘數"""
+    return value.hour * 60 + value.minute
+
+
+class Genome(array.array):
+    """
+    以整數編碼的行程
+
+    本身是景點索引（DistanceMatrix 的 place_index）的 array，starts 為對應景點的
+    開始時間，以距離行程第一天 00:00 的分鐘數表示。複製個體時只需複製兩個 buffer，
+    不必再 deepcopy AttractionModify 與 datetime。
+    """
+
+    def __new__(cls, indices: Sequence[int] = (), starts: Sequence[int] = ()):
+        return super().__new__(cls, 'i', indices)
+
+    def __init__(self, indices: Sequence[int] = (), starts: Sequence[int] = ()):
+        self.starts = array.array('i', starts)
+        if len(self.starts) != len(self):
+            raise ValueError("indices 與 starts 長度不一致")
+
+    def __deepcopy__(self, memo):
+        genome = self.__class__.__new__(self.__class__, self)
+        memo[id(self)] = genome
+        genome.__dict__.update(copy.deepcopy(self.__dict__, memo))
+        return genome
+
+    def __reduce_ex__(self, protocol):
+        # array.array 的預設 pickle 會以 (typecode, items) 呼叫 __new__，需改寫
+        return (self.__class__, (self.tolist(), self.starts.tolist()),
+                self.__dict__)
+
+    def day(self, position: int) -> int:
+        """第 position 個景點位於行程的第幾天（從 0 開始）"""
+        return self.starts[position] // MINUTES_PER_DAY
+
+
+class GenomeCodec:
+    """Genome 與 AttractionModify 行程之間的轉換"""
+
+    def __init__(self, attractions: List[Attraction], place_index: Dict[str, int],
+                 trip_start: datetime):
+        self.place_index = place_index
+        # 以行程第一天的 00:00 作為分鐘數的原點
+        self.origin = datetime.combine(trip_start.date(), time.min)
+
+        size = max(place_index.values(), default=-1) + 1
+        attraction_by_index: List[Attraction] = [None] * size
+        open_minutes = [0] * size
+        close_minutes = [MINUTES_PER_DAY] * size
+        stay_minutes = [0] * size
+        for attraction in attractions:
+            index = place_index[attraction.name]
+            attraction_by_index[index] = attraction
+            open_minutes[index] = minutes_of_day(attraction.open_time)
+            close_minutes[index] = minutes_of_day(attraction.close_time)
+            stay_minutes[index] = round(attraction.stay_time * 60)
+        # 建立後不再修改，多個請求可以共用同一個 codec
+        self.attractions: Tuple[Attraction, ...] = tuple(attraction_by_index)
+        self.attraction_indices: Tuple[int, ...] = tuple(
+            place_index[attraction.name] for attraction in attractions)
+        self.open_minutes: Tuple[int, ...] = tuple(open_minutes)
+        self.close_minutes: Tuple[int, ...] = tuple(close_minutes)
+        self.stay_minutes: Tuple[int, ...] = tuple(stay_minutes)
+
+    def to_minutes(self, value: datetime) -> int:
+        return int((value - self.origin).total_seconds() // 60)
+
+    def to_datetime(self, minutes: int) -> datetime:
+        return self.origin + timedelta(minutes=minutes)
+
+    def end_minutes(self, genome: Genome, position: int) -> int:
+        return genome.starts[position] + self.stay_minutes[genome[position]]
+
+    def encode(self, schedule: List[AttractionModify], genome_class=Genome) -> Genome:
+        """將 AttractionModify 行程編碼為 Genome（可指定 DEAP 的 Individual 類別）"""
+        return genome_class(
+            [self.place_index[attr_mod.attr.name] for attr_mod in schedule],
+            [self.to_minutes(attr_mod.time_range.start_time) for attr_mod in schedule])
+
+    def decode(self, genome: Genome) -> List[AttractionModify]:
+        """將 Genome 還原為 AttractionModify 行程，只在輸出時使用"""
+        schedule = []
+        for index, start in zip(genome, genome.starts):
+            attraction = self.attractions[index]
+            start_time = self.to_datetime(start)
+            schedule.append(
+                AttractionModify(attr=attraction,
+                                 time_range=TimeRange(
+                                     start_time, start_time +
+                                     timedelta(hours=attraction.stay_time))))
+        return schedule
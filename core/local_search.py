@@ -0,0 +1,162 @@
+from typing import Callable, List, Optional, Sequence
+
+from core.delta_evaluation import mark_positions
+from core.distance_matrix import DistanceMatrix
+from core.genome import Genome, GenomeCodec, MINUTES_PER_DAY
+
+# 改善量小於此值視為沒有改善，避免浮點誤差造成無限迴圈
+_EPSILON = 1e-9
+
+
+class LocalSearch:
+    """
+    以 2-opt 與 or-opt 改善每天的景點順序（memetic 演算法的區域搜尋）
+
+    只在同一天、連續的景點之間移動，且沿用當天原本的時間槽（依序把新順序的景點
+    放進原本排序後的開始時間），因此只需檢查營業時間、停留時間是否與下一個時間槽
+    重疊，以及當天的餐廳懲罰是否變差。每個移動只以受影響的幾段路程計算增益；
+    接受的移動以 mark_positions 標記，之後的評估只重新計算這些位置。
+
+    個體的最後一個景點固定不動（價格與評分只累計每段路程的起點），因此接受的移動
+    只會縮短距離而不改變其他目標。
+    """
+
+    def __init__(self, waypoint_distances: DistanceMatrix, codec: GenomeCodec,
+                 day_ends: Sequence[int], is_restaurant: Sequence[bool],
+                 restaurant_day_penalty: Callable[[List[int]], float],
+                 max_passes: int = 3, max_segment: int = 3):
+        self.distance = waypoint_distances.distance
+        self.codec = codec
+        self.day_ends = day_ends  # 每天的結束時間（當天的分鐘數）
+        self.is_restaurant = is_restaurant
+        self.restaurant_day_penalty = restaurant_day_penalty
+        self.max_passes = max_passes  # 每天最多重複掃描幾次
+        self.max_segment = max_segment  # or-opt 一次移動的最多景點數
+        self.moves = 0  # 接受的移動數
+
+    def improve(self, individual: Genome) -> bool:
+        """就地改善個體，有任何移動被接受時回傳 True"""
+        improved = False
+        for lo, hi in self.__day_blocks(individual):
+            improved |= self.__improve_block(individual, lo, hi)
+        return improved
+
+    def __day_blocks(self, individual: Genome):
+        """每天可以重新排序的連續區間 [lo, hi]，不含個體的最後一個景點"""
+        starts = individual.starts
+        last = len(individual) - 1
+        lo = 0
+        while lo < last:
+            day = starts[lo] // MINUTES_PER_DAY
+            hi = lo
+            while hi + 1 < last and starts[hi + 1] // MINUTES_PER_DAY == day:
+                hi += 1
+            if hi > lo and all(starts[p] <= starts[p + 1] for p in range(lo, hi)):
+                yield lo, hi
+            lo = hi + 1
+
+    def __leg(self, a: Optional[int], b: Optional[int]) -> float:
+        if a is None or b is None:
+            return 0.0
+        return self.distance(a, b)
+
+    def __improve_block(self, individual: Genome, lo: int, hi: int) -> bool:
+        starts = individual.starts
+        day = starts[lo] // MINUTES_PER_DAY
+        slots = [start % MINUTES_PER_DAY for start in starts[lo:hi + 1]]
+        if hi + 1 < len(individual) and starts[hi + 1] // MINUTES_PER_DAY == day:
+            bound = starts[hi + 1] % MINUTES_PER_DAY
+        elif 0 <= day < len(self.day_ends):
+            bound = self.day_ends[day]
+        else:
+            bound = MINUTES_PER_DAY
+        # 同一天但不在區間內的餐廳（個體最後一個景點）
+        outside = [starts[p] % MINUTES_PER_DAY for p in range(len(individual))
+                   if (p < lo or p > hi) and starts[p] // MINUTES_PER_DAY == day
+                   and self.is_restaurant[individual[p]]]
+
+        route = list(individual[lo:hi + 1])
+        penalty = self.__penalty(route, slots, outside)
+        # 前後加上區間外相鄰的景點，None 表示沒有
+        previous = individual[lo - 1] if lo > 0 else None
+        following = individual[hi + 1] if hi + 1 < len(individual) else None
+
+        improved = False
+        for _ in range(self.max_passes):
+            extended = [previous] + route + [following]
+            candidate = self.__first_improvement(extended, slots, bound,
+                                                 outside, penalty)
+            if candidate is None:
+                break
+            route, penalty = candidate
+            improved = True
+
+        if improved:
+            changed = [lo + offset for offset, place in enumerate(route)
+                       if individual[lo + offset] != place]
+            for offset, place in enumerate(route):
+                individual[lo + offset] = place
+            mark_positions(individual, changed)
+        return improved
+
+    def __first_improvement(self, extended, slots, bound, outside, penalty):
+        """回傳第一個可行且縮短距離的 (新順序, 餐廳懲罰)，沒有時回傳 None"""
+        leg = self.__leg
+        size = len(extended) - 2
+
+        # 2-opt：反轉 extended[i..j]
+        for i in range(1, size):
+            for j in range(i + 1, size + 1):
+                gain = (leg(extended[i - 1], extended[i]) + leg(extended[j], extended[j + 1])
+                        - leg(extended[i - 1], extended[j]) - leg(extended[i], extended[j + 1]))
+                if gain > _EPSILON:
+                    route = (extended[1:i] + extended[i:j + 1][::-1]
+                             + extended[j + 1:size + 1])
+                    accepted = self.__accept(route, slots, bound, outside, penalty)
+                    if accepted is not None:
+                        return route, accepted
+
+        # or-opt：把 extended[i..i+length-1] 移到 extended[k] 與 extended[k+1] 之間
+        for length in range(1, min(self.max_segment, size - 1) + 1):
+            for i in range(1, size - length + 2):
+                segment = extended[i:i + length]
+                before, after = extended[i - 1], extended[i + length]
+                removed = (leg(before, segment[0]) + leg(segment[-1], after)
+                           - leg(before, after))
+                for k in range(0, size + 1):
+                    if i - 1 <= k <= i + length - 1:
+                        continue
+                    left, right = extended[k], extended[k + 1]
+                    gain = removed - (leg(left, segment[0]) + leg(segment[-1], right)
+                                      - leg(left, right))
+                    if gain <= _EPSILON:
+                        continue
+                    rest = extended[1:i] + extended[i + length:size + 1]
+                    insert_at = k if k < i else k - length
+                    route = rest[:insert_at] + segment + rest[insert_at:]
+                    accepted = self.__accept(route, slots, bound, outside, penalty)
+                    if accepted is not None:
+                        return route, accepted
+        return None
+
+    def __accept(self, route, slots, bound, outside, penalty) -> Optional[float]:
+        """新順序放進原本的時間槽後可行且餐廳懲罰不變差時回傳新的懲罰"""
+        codec = self.codec
+        last = len(route) - 1
+        for position, place in enumerate(route):
+            start = slots[position]
+            end = start + codec.stay_minutes[place]
+            if start < codec.open_minutes[place] or end > codec.close_minutes[place]:
+                return None
+            if end > (slots[position + 1] if position < last else bound):
+                return None
+        new_penalty = self.__penalty(route, slots, outside)
+        if new_penalty > penalty:
+            return None
+        self.moves += 1
+        return new_penalty
+
+    def __penalty(self, route, slots, outside) -> float:
+        restaurants = [slot for place, slot in zip(route, slots)
+                       if self.is_restaurant[place]] + outside
+        return self.restaurant_day_penalty(restaurants) if restaurants else 0.0
@@ -0,0 +1,58 @@
+import multiprocessing
+from typing import Dict, List, Any
+
+from core.genome import Genome
+
+# 每個 worker process 各自持有一份問題實例，於 pool 啟動時建立
+_worker_problem = None
+
+
+def _init_worker(problem_data: Dict[str, Any]):
+    """pool 啟動時在每個 worker 中載入一次問題資料"""
+    global _worker_problem
+    # 延遲匯入以避免與 core.problems 循環匯入
+    from core.problems import OptimizationProblem
+    _worker_problem = OptimizationProblem.from_problem_data(problem_data)
+
+
+def _calculate_raw_metrics(individual) -> Dict:
+    return _worker_problem.calculate_raw_metrics(individual)
+
+
+class ParallelEvaluator:
+    """
+    使用 process pool 平行計算個體的原始評估指標
+
+    問題資料 (waypoint_distances, place_additional_info, attractionsDetail)
+    只會在 pool 啟動時傳送給每個 worker 一次，之後每次評估只傳送個體本身。
+    歸一化仍由主程序依序處理，因此結果與單核心評估相同。
+    每代都需序列化個體與結果，只有在多核心且評估成本高時才可能比單核心快；
+    單核心的機器上比逐一評估慢。
+    """
+
+    def __init__(self, problem_data: Dict[str, Any], processes: int):
+        self.problem_data = problem_data
+        self.processes = processes
+        self.pool = None
+
+    def map(self, individuals: List) -> List[Dict]:
+        """依原順序回傳每個個體的原始評估指標"""
+        if not individuals:
+            return []
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(processes=self.processes,
+                                             initializer=_init_worker,
+                                             initargs=(self.problem_data, ))
+
+        # 每個 worker 分到數個區塊，平衡 IPC 成本與負載
+        chunksize = max(1, len(individuals) // (self.processes * 4))
+        # 轉為一般 Genome，避免傳送 DEAP 動態建立的 Individual 類別與 fitness
+        return self.pool.map(_calculate_raw_metrics, [
+            Genome(individual, individual.starts) for individual in individuals
+        ], chunksize=chunksize)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
@@ -1,10 +1,11 @@
+import array
+import copy
 import random
 from deap import algorithms
 from deap import base
-from deap import creator
 from deap import tools
 
-from typing import Dict, Set, FrozenSet, List, Tuple, Any
+from typing import Dict, Set, FrozenSet, List, Tuple, Any, Optional, Union
 
 from datetime import datetime, timedelta
 from core.generate_initial_trip import AttractionModify, InitIndividual, Attraction
@@ -13,7 +14,23 @@ from dataclasses import dataclass
 
 from core.generate_initial_trip import DiverseScheduleGenerator, TimeRange
 from core.read_from_csv import time_to_datetime
-from core.generate_multiple_day_trip import DayConfig, MultiDayInitIndividual, ScheduleTransformer
+from core.generate_multiple_day_trip import DayConfig, MultiDayInitIndividual, ScheduleTransformer, \
+    GeneratorConfig
+from core.parallel import ParallelEvaluator
+from core.distance_matrix import DistanceMatrix
+from core.batch_evaluator import BatchEvaluator
+from core.fitness_cache import FitnessCache
+from core.selection import select_nsga2
+from core.seed_store import SeedStore
+from core.time_window_index import TimeWindowIndex
+from core.feasibility import FeasibilityTable
+from core.local_search import LocalSearch
+from core.exact_solver import ExactSolver
+from core.quick_planner import QuickPlanner
+from core.telemetry import OffspringCounter
+from core.delta_evaluation import (DeltaEvaluator, mark_positions, mark_inserted, mark_deleted,
+                                   mark_replaced, mark_all, segment_days)
+from core.genome import Genome, GenomeCodec, MINUTES_PER_DAY, minutes_of_day
 from collections import defaultdict
 
 # from methods.toolbox_operator import *
@@ -28,10 +45,51 @@ class EvaluationConfig:
     specific_location_bonus: float = 51111  # 特定位置獎勵
 
 
+class TripFitness(base.Fitness):
+    weights = (
+        1.0,
+        -1.0,  # distance
+        # 1.0, # specific score , disabled
+        -1.0,  # price level
+        1.0,  # rating
+        1.0,  # user rating totals
+        # -1.0,  # [新增] 時間順序懲罰 , disabled
+        -1.0  # [新增] 餐廳頻率懲罰
+        # TODO:  delete some of the weigths
+    )
+
+
+class TripIndividual(Genome):
+    """帶有 fitness 的 Genome（取代 creator.Individual），定義在模組層級因此可以 pickle"""
+
+    def __init__(self, indices=(), starts=()):
+        super().__init__(indices, starts)
+        self.fitness = TripFitness()
+
+
 class OptimizationProblem:
+    # 修復子代時，與前一個景點重疊的景點延後到前一個景點結束後的分鐘數
+    TRAVEL_BUFFER_MINUTES = 30
 
-    def __init__(self):
+    def __init__(self, processes: int = 1, batch_evaluation: bool = False,
+                 cache_size: int = 10000, delta_evaluation: bool = False,
+                 seed_store: Optional[SeedStore] = None):
         self.toolbox = base.Toolbox()
+        self.processes = processes  # 評估個體時使用的 process 數量，1 表示不平行
+        self.batch_evaluation = batch_evaluation  # 以 NumPy 一次評估整個族群
+        self.evaluator: Optional[Union[ParallelEvaluator, BatchEvaluator]] = None
+        # 相同行程（景點順序 + 開始時間）只評估一次，cache_size 為 0 時停用
+        self.fitness_cache = FitnessCache(cache_size)
+        # 逐一評估時只重新計算運算子修改過的路段與天數；需自行啟用，
+        # 只在沒有批次評估且 processes 為 1 時使用（批次評估整個族群較快）
+        self.delta_evaluation = delta_evaluation
+        self.delta_evaluator: Optional[DeltaEvaluator] = None
+        self.local_search: Optional[LocalSearch] = None
+        # 暖啟動：以先前相同候選集合與天數結構的 Pareto front 作為初始族群的一部分
+        self.seed_store = seed_store
+        self.seed_key = None
+        # 交配次數與產生新行程（與雙親都不同）的子代數
+        self.offspring_counter = OffspringCounter()
         self.parameters = {}  # TODO: this is deprecated
         self.toolbox = base.Toolbox()
         self.all_waypoints = list()
@@ -39,27 +97,16 @@ class OptimizationProblem:
         self.start = ''
         self.end = ''
 
-        self.normalizer = {
-            'distance': {
-                'min': float('inf'),
-                'max': float('-inf')
-            },
-            'price': {
-                'min': float('inf'),
-                'max': float('-inf')
-            },
-            'rating': {
-                'min': float('inf'),
-                'max': float('-inf')
-            }
-        }
+        # 每次執行各自的歸一化範圍，reset() 時重設
+        self.normalizer = self.__new_normalizer()
+        self.define_individual_and_fitness()
 
         # 新增餐廳相關設定
         self.restaurant_config = {
             'min_restaurants_per_day': 2,  # Minimum restaurants per day
             'max_restaurants_per_day': 3,  # Maximum restaurants per day
             'restaurant_penalty': 1000.0,  # Base penalty for violations
-            'restaurant_categories': {'restaurant', 'food', 'cafe'},  # Restaurant categories
+            'restaurant_categories': frozenset({'restaurant', 'food', 'cafe'}),  # Restaurant categories
             'lunch_window': {
                 'start': datetime.strptime('11:30', '%H:%M').time(),
                 'end': datetime.strptime('14:00', '%H:%M').time()
@@ -76,7 +123,7 @@ class OptimizationProblem:
               attractionsDetail, place_additional_info, daily_depart_time: str,
               daily_return_time: str, departure_datetime, return_datetime):
         # attractionsDetail include attraction.name, attraction.open_time, attraction.close_time, stay_time
-        # place_additional_info include  "price_level", "rating", "user_rating_totals", "category"
+        # place_additional_info include  "price_level", "rating", "user_rating_totals", "category", "lat", "lng"
 
         self.start = 'Maryland State House, 100 State Cir, Annapolis, MD 21401'
         self.last = 'Mount Vernon, Fairfax County, Virginia'
@@ -89,14 +136,35 @@ class OptimizationProblem:
         # print(self.daily_return_time)
 
         self.all_waypoints = list(all_waypoints_set)
-        self.waypoint_distances = waypoint_distances
+        # 統一轉為 DistanceMatrix，評估時以整數索引查詢距離
+        self.waypoint_distances = DistanceMatrix.from_dict(waypoint_distances)
+        # 設為唯讀，fork() 出的問題實例共用同一個矩陣
+        self.waypoint_distances.condensed.setflags(write=False)
+        self.place_index = self.waypoint_distances.place_index
+        self.fitness_cache.clear()
 
         # create population fucntion
         self.toolbox = base.Toolbox()
         self.attractionsDetail = attractionsDetail
         self.place_additional_info = place_additional_info
 
-        self.define_individual_and_fitness()
+        self.day_configs = DayConfig.create_day_configs(
+            departure_datetime=self.departure_datetime,
+            return_datetime=self.return_datetime,
+            daily_depart_time=self.daily_depart_time,
+            daily_return_time=self.daily_return_time)
+        # 個體以 Genome（景點索引 + 開始分鐘數）表示，只在輸出時才轉回 AttractionModify
+        self.codec = GenomeCodec(attractionsDetail, self.place_index,
+                                 self.day_configs[0].start_time)
+        self.seed_key = SeedStore.key(self.waypoint_distances.place_ids,
+                                      self.day_configs)
+        # 依營業時間查詢候選景點的索引（突變時使用）
+        self.window_index = TimeWindowIndex(self.codec)
+        # 每天各景點可行的開始時間範圍（修復個體時使用）
+        self.feasibility = FeasibilityTable.from_codec(self.codec, self.day_configs)
+        # 午餐與晚餐時段，評估每個餐廳時直接查詢
+        self.__meal_windows = self.__parse_meal_windows(self.restaurant_config)
+
         self.register_tools()
 
         # self.toolbox.register('waypoints', random.sample, self.all_waypoints,
@@ -108,45 +176,207 @@ class OptimizationProblem:
 
         # [[], [], []]
 
+    @staticmethod
+    def __new_normalizer() -> Dict[str, Dict[str, float]]:
+        return {
+            'distance': {
+                'min': float('inf'),
+                'max': float('-inf')
+            },
+            'price': {
+                'min': float('inf'),
+                'max': float('-inf')
+            },
+            'rating': {
+                'min': float('inf'),
+                'max': float('-inf')
+            }
+        }
+
+    def reset(self):
+        """重設每次執行的狀態（歸一化範圍與子代計數），讓同一個問題可以再次執行"""
+        self.normalizer = self.__new_normalizer()
+        self.offspring_counter = OffspringCounter()
+
+    def fork(self) -> 'OptimizationProblem':
+        """
+        共用 setup() 預先計算的唯讀資料（距離矩陣、codec、營業時間索引），
+        建立擁有獨立執行狀態（normalizer、fitness 快取、toolbox 與評估器）的新實例。
+        快取的問題以 fork() 分給各個請求，即可在同一個 process 中同時執行
+        """
+        problem = copy.copy(self)
+        problem.toolbox = base.Toolbox()
+        problem.fitness_cache = FitnessCache(self.fitness_cache.max_size)
+        problem.evaluator = None
+        problem.reset()
+        problem.register_tools()
+        return problem
+
     def define_individual_and_fitness(self):
-        creator.create(
-            'FitnessMulti',
-            base.Fitness,
-            weights=(
-                1.0,
-                -1.0,  # distance
-                # 1.0, # specific score , disabled
-                -1.0,  # price level
-                1.0,  # rating
-                1.0,  # user rating totals
-                # -1.0,  # [新增] 時間順序懲罰 , disabled
-                -1.0  # [新增] 餐廳頻率懲罰
-                # TODO:  delete some of the weigths
-            ))
-        creator.create('Individual', list, fitness=creator.FitnessMulti)
-
-    def register_tools(self):
+        """
+        個體與 fitness 類別為此實例的屬性，不再以 creator.create 修改 deap.creator
+        的全域命名空間，同一個 process 中可以同時執行多個問題
+        """
+        self.Fitness = TripFitness
+        self.Individual = TripIndividual
+
+    def register_tools(self, processes: Optional[int] = None):
+        if processes is not None:
+            self.processes = processes
+
         self.toolbox.register('population', self.generate_population)
         self.toolbox.register('evaluate', self.__eval_capitol_trip)
         self.toolbox.register('mutate', self.__mutation_operator)
         self.toolbox.register('select', self.__pareto_selection_operator)
         self.toolbox.register('mate', self.__crossover_operator)
+        # memetic 區域搜尋：就地改善個體每天的景點順序，有改善時回傳 True
+        self.local_search = self.create_local_search()
+        self.toolbox.register('local_search', self.local_search.improve)
+
+        self.close_evaluator()
+        self.delta_evaluator = None
+        if self.delta_evaluation and not self.batch_evaluation and self.processes <= 1:
+            self.delta_evaluator = self.create_delta_evaluator()
+        if self.batch_evaluation:
+            # 批次評估：以 NumPy 一次計算整個族群的指標
+            self.evaluator = BatchEvaluator(self.waypoint_distances,
+                                            self.place_additional_info,
+                                            self.restaurant_config)
+        elif self.processes > 1:
+            # 平行評估：問題資料在 pool 啟動時傳給 worker 一次，之後只傳送個體
+            self.evaluator = ParallelEvaluator(self.problem_data(),
+                                               self.processes)
+        if self.evaluator is not None:
+            self.toolbox.register('map', self.__evaluation_map)
+
+    def problem_data(self) -> Dict[str, Any]:
+        """評估個體所需的問題資料，用於傳送給平行評估的 worker"""
+        return {
+            'waypoint_distances': self.waypoint_distances,
+            'place_additional_info': self.place_additional_info,
+            'attractionsDetail': self.attractionsDetail,
+            'restaurant_config': self.restaurant_config,
+            'codec': self.codec
+        }
+
+    @classmethod
+    def from_problem_data(cls, problem_data: Dict[str, Any]):
+        """由 problem_data() 的結果建立只用於評估的問題實例"""
+        problem = cls()
+        problem.waypoint_distances = problem_data['waypoint_distances']
+        problem.place_index = problem.waypoint_distances.place_index
+        problem.place_additional_info = problem_data['place_additional_info']
+        problem.attractionsDetail = problem_data['attractionsDetail']
+        problem.restaurant_config = problem_data['restaurant_config']
+        problem.__meal_windows = cls.__parse_meal_windows(problem.restaurant_config)
+        problem.codec = problem_data.get('codec')
+        return problem
+
+    def create_delta_evaluator(self) -> DeltaEvaluator:
+        place_ids = self.waypoint_distances.place_ids
+        head_values = []
+        for place_id in place_ids:
+            place_info = self.place_additional_info.get(place_id, {})
+            head_values.append((place_info.get('price_level', 0),
+                                place_info.get('rating', 0),
+                                place_info.get('user_rating_totals', 0)))
+        return DeltaEvaluator(self.waypoint_distances, head_values,
+                              self.__restaurant_flags(), self.restaurant_day_penalty)
+
+    def create_local_search(self) -> LocalSearch:
+        day_ends = [minutes_of_day(day.end_time) for day in self.day_configs]
+        return LocalSearch(self.waypoint_distances, self.codec, day_ends,
+                           self.__restaurant_flags(), self.restaurant_day_penalty)
+
+    def create_exact_solver(self, max_nodes: int = 50000) -> ExactSolver:
+        return ExactSolver(self.waypoint_distances, self.codec, self.__day_windows(),
+                           self.__restaurant_flags(), self.restaurant_day_penalty,
+                           self.restaurant_meal, self.TRAVEL_BUFFER_MINUTES, max_nodes)
+
+    def create_quick_planner(self) -> QuickPlanner:
+        return QuickPlanner(self.waypoint_distances, self.codec, self.__day_windows(),
+                            self.__restaurant_flags(), self.meal_windows(),
+                            self.TRAVEL_BUFFER_MINUTES, self.create_local_search())
+
+    def __day_windows(self) -> List[Tuple[int, int]]:
+        """每天的 (開始, 結束) 時間（當天的分鐘數）"""
+        return [(minutes_of_day(day.start_time), minutes_of_day(day.end_time))
+                for day in self.day_configs]
+
+    def __restaurant_flags(self) -> List[bool]:
+        """每個景點索引是否為餐廳"""
+        categories = self.restaurant_config['restaurant_categories']
+        return [
+            bool(categories.intersection(
+                self.place_additional_info.get(place_id, {}).get('category', set())))
+            for place_id in self.waypoint_distances.place_ids
+        ]
+
+    def close_evaluator(self):
+        """釋放評估器的資源（例如平行評估使用的 process pool）"""
+        if self.evaluator is not None:
+            self.evaluator.close()
+            self.evaluator = None
+
+    def __evaluation_map(self, func, individuals):
+        """
+        取代 toolbox.map：評估個體時由評估器（process pool 或批次評估）
+        計算原始指標，再依原順序在主程序中歸一化，使結果與逐一評估一致
+        """
+        individuals = list(individuals)
+        if func is not self.toolbox.evaluate or self.evaluator is None:
+            return list(map(func, individuals))
+
+        raw_metrics = self.__cached_raw_metrics(individuals)
+        return [self.__to_fitness(metrics) for metrics in raw_metrics]
 
-    def __calculate_base_metrics(self,
-                                 individual: List[AttractionModify]) -> Dict:
+    def __cached_raw_metrics(self, individuals: List[Genome]) -> List[Dict]:
+        """
+        先查詢 fitness 快取，只評估未命中的個體；
+        同一批中重複的行程只評估一次，其餘視為命中
+        """
+        cache = self.fitness_cache
+        keys = [cache.signature(individual) for individual in individuals]
+        results: Dict = {}
+        pending: Dict = {}
+        for key, individual in zip(keys, individuals):
+            if key in results or key in pending:
+                cache.hits += 1
+                continue
+            metrics = cache.get(key)
+            if metrics is None:
+                pending[key] = individual
+            else:
+                results[key] = metrics
+
+        if pending:
+            if self.evaluator is not None:
+                computed = self.evaluator.map(list(pending.values()))
+            elif self.delta_evaluator is not None:
+                computed = [self.delta_evaluator.raw_metrics(individual)
+                            for individual in pending.values()]
+            else:
+                computed = [self.calculate_raw_metrics(individual)
+                            for individual in pending.values()]
+            for key, metrics in zip(pending, computed):
+                cache.put(key, metrics)
+                results[key] = metrics
+
+        return [results[key] for key in keys]
+
+    def __calculate_base_metrics(self, individual: Genome) -> Dict:
         """計算基本評估指標"""
         trip_length = 0.0
         price_level_sum = 0
         rating = 0.0
         user_rating_totals = 0
 
+        place_ids = self.waypoint_distances.place_ids
+        distance = self.waypoint_distances.distance
+
         for index in range(1, len(individual)):
-            waypoint1 = individual[index - 1].attr.name
-            waypoint2 = individual[index].attr.name
-            # print(f"waypoint1: {waypoint1} waypoint2: {waypoint2}")
-            # print(f"fronzenset {frozenset([waypoint1, waypoint2])}")
-            trip_length += self.waypoint_distances[frozenset(
-                [waypoint1, waypoint2])]
+            waypoint1 = place_ids[individual[index - 1]]
+            trip_length += distance(individual[index - 1], individual[index])
             price_level_sum += self.place_additional_info[waypoint1][
                 'price_level']
             rating += self.place_additional_info[waypoint1]['rating']
@@ -162,108 +392,130 @@ class OptimizationProblem:
         }
 
     # [新增] 計算時間懲罰的輔助方法
-    def __calculate_time_penalties(
-            self, individual: List[AttractionModify]) -> float:
+    def __calculate_time_penalties(self, individual: Genome) -> float:
         """計算時間相關的懲罰"""
         total_penalty = 0.0
+        codec = self.codec
 
         # 檢查相鄰景點的時間順序
         for i in range(1, len(individual)):
-            prev_attr = individual[i - 1]
-            curr_attr = individual[i]
+            prev_end = codec.end_minutes(individual, i - 1)
+            curr_start = individual.starts[i]
 
-            if prev_attr.time_range.end_time > curr_attr.time_range.start_time:
-                time_diff = (
-                    prev_attr.time_range.end_time -
-                    curr_attr.time_range.start_time).total_seconds() / 3600
+            if prev_end > curr_start:
+                time_diff = (prev_end - curr_start) / 60
                 total_penalty += time_diff * self.config.time_overlap_penalty
 
         # 檢查營業時間違規
-        for attr in individual:
+        for i, index in enumerate(individual):
+            start = individual.starts[i] % MINUTES_PER_DAY
+            end = start + codec.stay_minutes[index]
             # 提前到達
-            if attr.time_range.start_time < attr.attr.open_time:
-                time_diff = (attr.attr.open_time -
-                             attr.time_range.start_time).total_seconds() / 3600
+            if start < codec.open_minutes[index]:
+                time_diff = (codec.open_minutes[index] - start) / 60
                 total_penalty += time_diff * self.config.business_hour_penalty
 
             # 關門後離開
-            if attr.time_range.end_time > attr.attr.close_time:
-                time_diff = (attr.time_range.end_time -
-                             attr.attr.close_time).total_seconds() / 3600
+            if end > codec.close_minutes[index]:
+                time_diff = (end - codec.close_minutes[index]) / 60
                 total_penalty += time_diff * self.config.business_hour_penalty
 
         return total_penalty
 
-    def __calculate_restaurant_penalty(self, individual: List[AttractionModify]) -> float:
+    def __calculate_restaurant_penalty(self, individual: Genome) -> float:
         """Calculate penalties for restaurant frequency and timing"""
         # Group attractions by date
         daily_restaurants = defaultdict(list)
+        place_ids = self.waypoint_distances.place_ids
 
-        for attr in individual:
-            place_info = self.place_additional_info.get(attr.attr.name, {})
+        for index, start in zip(individual, individual.starts):
+            place_info = self.place_additional_info.get(place_ids[index], {})
             place_categories = place_info.get('category', set())
 
             # Check if it's a restaurant
             if self.restaurant_config['restaurant_categories'].intersection(place_categories):
-                visit_date = attr.time_range.start_time.date()
-                daily_restaurants[visit_date].append(attr)
+                visit_date = start // MINUTES_PER_DAY
+                daily_restaurants[visit_date].append(start % MINUTES_PER_DAY)
 
         total_penalty = 0.0
 
         # Evaluate each day's restaurant distribution
         for date, restaurants in daily_restaurants.items():
-            # Check frequency
-            count = len(restaurants)
-            if count < self.restaurant_config['min_restaurants_per_day']:
-                total_penalty += (self.restaurant_config['min_restaurants_per_day'] - count) * \
-                               self.restaurant_config['restaurant_penalty']
-            elif count > self.restaurant_config['max_restaurants_per_day']:
-                total_penalty += (count - self.restaurant_config['max_restaurants_per_day']) * \
-                               self.restaurant_config['restaurant_penalty']
-
-            # Check timing
-            lunch_found = dinner_found = False
-            bad_timing_count = 0
-
-            for rest in restaurants:
-                visit_time = rest.time_range.start_time.time()
-
-                # Check if within lunch window
-                if (self.restaurant_config['lunch_window']['start'] <= visit_time <=
-                    self.restaurant_config['lunch_window']['end']):
-                    lunch_found = True
-                # Check if within dinner window
-                elif (self.restaurant_config['dinner_window']['start'] <= visit_time <=
-                      self.restaurant_config['dinner_window']['end']):
-                    dinner_found = True
-                else:
-                    bad_timing_count += 1
-
-            # Add penalties for poor timing
-            if not lunch_found and count > 0:
-                total_penalty += self.restaurant_config['timing_penalty']
-            if not dinner_found and count > 1:
-                total_penalty += self.restaurant_config['timing_penalty']
-            total_penalty += bad_timing_count * self.restaurant_config['timing_penalty']
+            total_penalty += self.restaurant_day_penalty(restaurants)
 
         return total_penalty
 
-    def generate_population(self):
-        day_configs = DayConfig.create_day_configs(
-            departure_datetime=self.departure_datetime,
-            return_datetime=self.return_datetime,
-            daily_depart_time=self.daily_depart_time,
-            daily_return_time=self.daily_return_time)
+    def restaurant_day_penalty(self, restaurants: List[int]) -> float:
+        """Penalty for one day's restaurant visits (start minutes of day)"""
+        total_penalty = 0.0
+
+        # Check frequency
+        count = len(restaurants)
+        if count < self.restaurant_config['min_restaurants_per_day']:
+            total_penalty += (self.restaurant_config['min_restaurants_per_day'] - count) * \
+                           self.restaurant_config['restaurant_penalty']
+        elif count > self.restaurant_config['max_restaurants_per_day']:
+            total_penalty += (count - self.restaurant_config['max_restaurants_per_day']) * \
+                           self.restaurant_config['restaurant_penalty']
+
+        # Check timing
+        lunch_found = dinner_found = False
+        bad_timing_count = 0
+
+        for visit_time in restaurants:
+            meal = self.restaurant_meal(visit_time)
+            if meal == 'lunch':
+                lunch_found = True
+            elif meal == 'dinner':
+                dinner_found = True
+            else:
+                bad_timing_count += 1
+
+        # Add penalties for poor timing
+        if not lunch_found and count > 0:
+            total_penalty += self.restaurant_config['timing_penalty']
+        if not dinner_found and count > 1:
+            total_penalty += self.restaurant_config['timing_penalty']
+        total_penalty += bad_timing_count * self.restaurant_config['timing_penalty']
+
+        return total_penalty
+
+    def meal_windows(self) -> Dict[str, Tuple[int, int]]:
+        """午餐與晚餐時段的 (開始, 結束)（當天的分鐘數），於 setup() 時計算"""
+        return dict(self.__meal_windows)
 
+    @staticmethod
+    def __parse_meal_windows(restaurant_config) -> Dict[str, Tuple[int, int]]:
+        return {
+            meal: (minutes_of_day(restaurant_config[f'{meal}_window']['start']),
+                   minutes_of_day(restaurant_config[f'{meal}_window']['end']))
+            for meal in ('lunch', 'dinner')
+        }
+
+    def restaurant_meal(self, visit_time: int) -> Optional[str]:
+        """餐廳開始時間（當天分鐘數）落在午餐或晚餐時段時回傳 'lunch' 或 'dinner'"""
+        for meal, (start, end) in self.__meal_windows.items():
+            if start <= visit_time <= end:
+                return meal
+        return None
+
+    def generate_population(self, size: Optional[int] = None,
+                            time_budget: Optional[float] = None):
+        """
+        產生 size 個初始個體（None 表示由生成器決定數量）；生成器在取得足夠的行程
+        或用完 time_budget 秒時停止，行程不足 size 個時重複已有的行程補足
+        """
+        # processes > 1 時初始行程的各策略也以 process pool 平行產生
         generator = MultiDayInitIndividual(
             attractions=self.attractionsDetail,
-            day_configs=day_configs,
-            place_additional_info=self.place_additional_info)
+            day_configs=self.day_configs,
+            place_additional_info=self.place_additional_info,
+            config=GeneratorConfig(workers=self.processes, time_budget=time_budget))
         # attractionsDetail include attraction.name, attraction.open_time, attraction.close_time
-        # place_additional_info include  "price_level", "rating", "user_rating_totals", "category"
+        # place_additional_info include  "price_level", "rating", "user_rating_totals", "category", "lat", "lng"
 
         # 生成初始行程
-        multi_day_schedules = generator.getInitIndi()
+        multi_day_schedules = generator.getInitIndi(size)
         transformer = ScheduleTransformer()
         flattened_schedules = transformer.flatten_schedules(
             multi_day_schedules)
@@ -287,14 +539,44 @@ class OptimizationProblem:
         #     'the end of schedules generated by generate_inital_trip in problem.py.generate_population'
         # )
 
-        # 轉換為DEAP個體
+        # 轉換為DEAP個體（編碼為 Genome）
         population = []
         for schedule in flattened_schedules:
-            individual = creator.Individual(schedule)
+            individual = self.codec.encode(schedule, self.Individual)
             population.append(individual)
 
+        # 暖啟動種子最多取代一半的初始族群
+        seeds = self.load_seeds()[:len(population) // 2]
+        if seeds:
+            population = seeds + population[:len(population) - len(seeds)]
+
+        if size and population:
+            population.extend(self.toolbox.clone(population[i % len(population)])
+                              for i in range(size - len(population)))
         return population
 
+    def load_seeds(self) -> List[Genome]:
+        """讀取暖啟動種子；開始時間以第一天 00:00 為原點，因此直接對齊新的日期"""
+        if self.seed_store is None:
+            return []
+        seeds = []
+        for schedule in self.seed_store.load(self.seed_key):
+            individual = SeedStore.to_genome(schedule, self.place_index,
+                                             self.Individual)
+            if individual is not None and not self.__has_duplicates(individual):
+                seeds.append(individual)
+        return seeds
+
+    def save_seeds(self, individuals):
+        """保存最終的 Pareto front 作為之後相同問題的暖啟動種子"""
+        if self.seed_store is None or self.seed_key is None:
+            return
+        place_ids = self.waypoint_distances.place_ids
+        self.seed_store.save(self.seed_key, [
+            SeedStore.to_schedule(individual, place_ids)
+            for individual in individuals if len(individual) > 0
+        ])
+
     # TODO: deprecated
     def generate_population2(self):
         startTime = datetime.strptime("08:00", "%H:%M")
@@ -310,9 +592,9 @@ class OptimizationProblem:
 
         population = []
         for schedule in init_individual.getInitIndi():
-            individual = creator.Individual(schedule)
+            individual = self.codec.encode(schedule, self.Individual)
             population.append(individual)
-        return population  # poplation is Deap(Individual(AttractionModify)
+        return population  # poplation is Deap(Individual(Genome)
 
         # return [
         #     creator.Individual(attr) for attr in schedule for schedule in indi
@@ -361,6 +643,10 @@ class OptimizationProblem:
         # Adding the starting point to the end of the trip forces it to be a round-trip
         # individual += [individual[0]]
 
+        return self.__to_fitness(self.__cached_raw_metrics([individual])[0])
+
+    def calculate_raw_metrics(self, individual: Genome) -> Dict:
+        """計算尚未歸一化的評估指標，不會修改 normalizer，可在 worker 中執行"""
         # 1. 計算基本指標
         base_metrics = self.__calculate_base_metrics(individual)
 
@@ -368,8 +654,13 @@ class OptimizationProblem:
         # time_penalty = self.__calculate_time_penalties(individual)
 
         # 3. [新增] 計算餐廳頻率懲罰
-        restaurant_penalty = self.__calculate_restaurant_penalty(individual)
+        base_metrics['restaurant_penalty'] = self.__calculate_restaurant_penalty(individual)
+        base_metrics['place_count'] = len(set(individual))
 
+        return base_metrics
+
+    def __to_fitness(self, base_metrics: Dict) -> Tuple:
+        """更新 normalizer 並將原始指標轉換為 fitness"""
         # 更新最大最小值
         self.__update_normalizer(base_metrics)
         # 歸一化處理
@@ -394,14 +685,14 @@ class OptimizationProblem:
 
         # 4. 返回所有評估指標
         return (
-            len(set(attr.attr.name for attr in individual)),  # 不同景點數量
+            base_metrics['place_count'],  # 不同景點數量
             normalized_metrics['distance'] * WEIGHTS['distance'],  # 歸一化的距離
             # specific_score,  # 特定位置獎勵 disabled
             normalized_metrics['price'] * WEIGHTS['price'],  # 歸一化的價格
             normalized_metrics['rating'] * WEIGHTS['rating'],  # 歸一化的評分
             base_metrics['user_rating_totals'],  # 用戶評價總數
             # -time_penalty,  # 時間順序懲罰 disabled
-            -restaurant_penalty  # [新增] 餐廳頻率懲罰
+            -base_metrics['restaurant_penalty']  # [新增] 餐廳頻率懲罰
         )
 
     def __normalize_metrics(self, metrics: Dict) -> Dict:
@@ -463,8 +754,11 @@ class OptimizationProblem:
 
             The genetic algorithm will favor road trips that have shorter
             total distances traveled and more waypoints visited.
+
+            以 NumPy 非支配排序選出 k 個不同的行程（相同簽章的個體只保留一個，
+            不足 k 個時才以重複的個體補足）
         """
-        return tools.selNSGA2(individuals, int(k / 5.)) * 5
+        return select_nsga2(individuals, k, key=FitnessCache.signature)
 
     def __mutation_operator(self, individual):
         """
@@ -475,6 +769,10 @@ class OptimizationProblem:
                 - Point: Replaces one waypoint with another different one
                 - Swap: Swaps the places of two waypoints in the road trip
         """
+        # 修復後所有景點都無法排入時個體可能為空，沒有可以修改的景點
+        if not individual:
+            return individual,
+
         possible_mutations = ['point']
 
         if len(individual) < len(self.attractionsDetail):
@@ -486,16 +784,18 @@ class OptimizationProblem:
             possible_mutations.append('delete')
 
         mutation_type = random.sample(possible_mutations, 1)[0]
+        # 已使用景點的 bitset 每個個體只建立一次，查詢候選景點時直接使用
+        visited = self.window_index.visited(individual)
 
         # Insert mutation
         if mutation_type == 'insert':
-            self.__insert_mutation_operator(individual)
+            self.__insert_mutation_operator(individual, visited)
         # Delete mutation
         elif mutation_type == 'delete':
             self.__delete_mutation_operator(individual)
         # Point mutation
         elif mutation_type == 'point':
-            self.__point_mutation_operator(individual)
+            self.__point_mutation_operator(individual, visited)
         # Swap mutation
         elif mutation_type == 'swap':
             self.__swap_mutation_operator(individual)
@@ -507,70 +807,73 @@ class OptimizationProblem:
 
         return individual,
 
-    def __insert_mutation_operator(self, individual):
-        waypoint_to_add = individual[0]
-        while waypoint_to_add in individual:
-            waypoint_to_add = random.sample(self.attractionsDetail, 1)[0]
+    def __insert_mutation_operator(self, individual, visited: Optional[int] = None):
+        if visited is None:
+            visited = self.window_index.visited(individual)
+        waypoint_to_add = self.window_index.choice(self.window_index.unused(visited))
+        if waypoint_to_add is None:
+            return
         # print('\ntype of waypoint to add')
         # print(type(waypoint_to_add))
         index_to_insert = random.randint(0, len(individual) - 1)
+        # 插入在同一天前一個景點結束後 TRAVEL_BUFFER_MINUTES（當天第一個景點則沿用其開始時間），
+        # 不早於開門時間；之後與它重疊的景點由 __retime_conflicting_days 延後
+        day = individual.starts[index_to_insert] // MINUTES_PER_DAY
+        start = individual.starts[index_to_insert]
+        if index_to_insert > 0 and individual.day(index_to_insert - 1) == day:
+            previous = individual[index_to_insert - 1]
+            start = (individual.starts[index_to_insert - 1]
+                     + self.codec.stay_minutes[previous] + self.TRAVEL_BUFFER_MINUTES)
+        start = max(start, day * MINUTES_PER_DAY + self.codec.open_minutes[waypoint_to_add])
+        # 超過當天的開始時間留在當天的最後一分鐘，由重新排定時間時移除
+        start = min(start, (day + 1) * MINUTES_PER_DAY - 1)
         individual.insert(index_to_insert, waypoint_to_add)
+        individual.starts.insert(index_to_insert, start)
+        mark_inserted(individual, index_to_insert)
+        self.__retime_conflicting_days(individual)
 
     def __delete_mutation_operator(self, individual):
         index_to_delete = random.randint(0, len(individual) - 1)
+        deleted_day = individual.starts[index_to_delete] // MINUTES_PER_DAY
         del individual[index_to_delete]
+        del individual.starts[index_to_delete]
+        mark_deleted(individual, index_to_delete, deleted_day)
 
-    def __point_mutation_operator(self, individual):
+    def __point_mutation_operator(self, individual, visited: int):
+        codec = self.codec
         index_to_replace = random.randint(0, len(individual) - 1)
-        replaced_attr_mod = individual[index_to_replace]
-
-        suitable_attractions = [
-            attr for attr in self.attractionsDetail
-            if attr not in [attr_mod.attr for attr_mod in individual]
-            and attr.open_time <= replaced_attr_mod.time_range.start_time
-            and attr.close_time >= replaced_attr_mod.time_range.end_time
-            # TODO:  replaced_attr_mod.time_range.start_time + timedelta(hours=attr.stay_time)).time() maybe need to change to replaced_attr_mod.time_range.end_time
-        ]
-
-        if suitable_attractions:
-            waypoint_to_add = random.choice(suitable_attractions)
+        replaced_index = individual[index_to_replace]
+        replaced_start = individual.starts[index_to_replace] % MINUTES_PER_DAY
+        replaced_end = replaced_start + codec.stay_minutes[replaced_index]
 
-            new_attr_mod = AttractionModify(
-                attr=waypoint_to_add,
-                time_range=TimeRange(
-                    start_time=replaced_attr_mod.time_range.start_time,
-                    end_time=replaced_attr_mod.time_range.end_time))
+        # 新景點沿用被替換景點的時段，停留時間不超過原景點，因此之後的景點不需重新排時間
+        suitable_attractions = self.window_index.query(
+            replaced_start, replaced_end,
+            max_stay=codec.stay_minutes[replaced_index],
+            exclude=visited)
 
-            individual[index_to_replace] = new_attr_mod
-
-            # 調整替換位置之後的所有景點的時間
-            for i in range(index_to_replace + 1, len(individual)):
-                prev_end_time = individual[i - 1].time_range.end_time
-                individual[i].time_range.start_time = prev_end_time
-                individual[i].time_range.end_time = prev_end_time + timedelta(
-                    hours=individual[i].attr.stay_time)
+        if suitable_attractions:
+            individual[index_to_replace] = self.window_index.choice(
+                suitable_attractions)
+            mark_positions(individual, (index_to_replace, ))
 
     def __swap_mutation_operator(self, individual):
         index1 = random.randint(0, len(individual) - 1)
         index2 = index1
         while index2 == index1:
             index2 = random.randint(0, len(individual) - 1)
+        # 只交換景點，時間槽維持原本的順序
         individual[index1], individual[index2] = individual[
             index2], individual[index1]
+        mark_positions(individual, (index1, index2))
 
     def __has_duplicates(self, individual):
         """檢查行程中是否有重複的景點"""
-        seen = set()  # 用來記錄已經看過的景點
-        for attr_mod in individual:
-            place_id = attr_mod.attr.name  # 獲取景點的ID
-            if place_id in seen:  # 如果這個ID已經在seen集合中
-                return True  # 表示發現重複，返回True
-            seen.add(place_id)  # 將這個ID加入seen集合
-        return False  # 沒有發現重複，返回False
+        return len(set(individual)) != len(individual)
 
     def __crossover_operator(self, ind1, ind2):
         """Main crossover operator that randomly selects and applies different crossover strategies"""
-        possible_crossovers = ['one_point', 'two_point', 'uniform', 'pmx']
+        possible_crossovers = ['one_point', 'two_point', 'uniform', 'day']
         crossover_type = random.choice(possible_crossovers)
 
         # 使用toolbox.clone來正確複製Individual
@@ -586,19 +889,24 @@ class OptimizationProblem:
         elif crossover_type == 'uniform':
             offspring1, offspring2 = self.__uniform_crossover(
                 offspring1, offspring2)
+        elif crossover_type == 'day':
+            offspring1, offspring2 = self.__day_crossover(
+                offspring1, offspring2)
+        # PMX 仍停用，day crossover 加上修復已涵蓋其用途
         # elif crossover_type == 'pmx':
         #     offspring1, offspring2 = self.__partially_mapped_crossover(
         #         offspring1, offspring2)
 
-        # Update time ranges for both offspring
-        # FIXME: need to fix
-        # self.__update_schedule_times(offspring1)
-        # self.__update_schedule_times(offspring2)
+        # 修復：重複的景點換成可行且未使用的景點，並重新安排有時間衝突的天數，
+        # 不再因為重複景點而丟棄子代
+        self.__repair(offspring1)
+        self.__repair(offspring2)
 
-        # 檢查是否有重複景點
-        if self.__has_duplicates(offspring1) or self.__has_duplicates(
-                offspring2):
-            return ind1, ind2  # 如果有重複，返回原始個體
+        parents = {FitnessCache.signature(ind1), FitnessCache.signature(ind2)}
+        self.offspring_counter.matings += 2
+        self.offspring_counter.useful += sum(
+            FitnessCache.signature(offspring) not in parents
+            for offspring in (offspring1, offspring2))
 
         # 將fitness設為無效
         del offspring1.fitness.values
@@ -606,11 +914,155 @@ class OptimizationProblem:
 
         return offspring1, offspring2
 
+    def __day_crossover(self, ind1, ind2):
+        """交換兩個個體中同一天的整天行程"""
+        common_days = sorted(segment_days(ind1, 0) & segment_days(ind2, 0))
+        if not common_days:
+            return ind1, ind2
+        day = random.choice(common_days)
+        visits1 = self.__day_visits(ind1, day)
+        visits2 = self.__day_visits(ind2, day)
+        self.__replace_day(ind1, day, visits2)
+        self.__replace_day(ind2, day, visits1)
+        return ind1, ind2
+
+    @staticmethod
+    def __day_visits(individual, day) -> List[Tuple[int, int]]:
+        return [(index, start) for index, start in zip(individual, individual.starts)
+                if start // MINUTES_PER_DAY == day]
+
+    @staticmethod
+    def __replace_day(individual, day, visits):
+        """以 visits 取代個體在 day 的行程，放在原本該天第一個景點的位置"""
+        positions = [position for position, start in enumerate(individual.starts)
+                     if start // MINUTES_PER_DAY == day]
+        first = positions[0]
+        removed = set(positions)
+        tail = visits + [
+            (individual[position], individual.starts[position])
+            for position in range(first, len(individual)) if position not in removed
+        ]
+        del individual[first:]
+        del individual.starts[first:]
+        individual.extend(index for index, _ in tail)
+        individual.starts.extend(start for _, start in tail)
+        mark_replaced(individual, first, None, (day, ))
+
+    def __repair(self, individual):
+        """
+        重複的景點換成同一時段營業、停留時間不超過原景點且未使用的景點，
+        找不到時刪除該位置，之後重新安排有時間衝突的天數，並依開始時間排序
+        """
+        codec = self.codec
+        window_index = self.window_index
+        # 已使用景點的 bitset 只建立一次，換上新景點時直接加入，每次查詢都使用同一個 bitset
+        visited = window_index.visited(individual)
+        seen = set()
+        position = 0
+        while position < len(individual):
+            place = individual[position]
+            if place not in seen:
+                seen.add(place)
+                position += 1
+                continue
+
+            start = individual.starts[position] % MINUTES_PER_DAY
+            stay = codec.stay_minutes[place]
+            replacement = window_index.choice(
+                window_index.query(start, start + stay, max_stay=stay,
+                                   exclude=visited))
+            if replacement is None:
+                day = individual.starts[position] // MINUTES_PER_DAY
+                del individual[position]
+                del individual.starts[position]
+                mark_deleted(individual, position, day)
+                continue
+
+            individual[position] = replacement
+            visited |= 1 << replacement
+            seen.add(replacement)
+            mark_positions(individual, (position, ))
+            position += 1
+
+        self.__retime_conflicting_days(individual)
+        self.__sort_by_start(individual)
+
+    @staticmethod
+    def __sort_by_start(individual):
+        """
+        依開始時間排序：one point 與 uniform crossover 可能把後面幾天的景點換到前面，
+        距離計算與輸出的行程都依景點順序，因此必須與時間順序一致
+        """
+        starts = individual.starts
+        if all(starts[i] <= starts[i + 1] for i in range(len(starts) - 1)):
+            return
+        visits = sorted(zip(individual, starts), key=lambda visit: visit[1])
+        individual[:] = array.array('i', (index for index, _ in visits))
+        individual.starts[:] = array.array('i', (start for _, start in visits))
+        mark_all(individual)
+
+    def __retime_conflicting_days(self, individual):
+        """
+        依景點順序重新排定有時間衝突（與前一個景點重疊或在營業時間外）的天數：
+        重疊時延後到前一個景點結束後 TRAVEL_BUFFER_MINUTES，且不早於開門時間；
+        之後仍超過關門或當天結束時間的景點會被移除，不會留下未重新排定時間的景點；
+        沒有衝突的天數不變
+        """
+        codec = self.codec
+        positions_by_day = defaultdict(list)
+        for position, start in enumerate(individual.starts):
+            positions_by_day[start // MINUTES_PER_DAY].append(position)
+
+        to_remove = []
+        for day, positions in positions_by_day.items():
+            latest_starts = self.feasibility.latest_starts(day)
+            retimed = []
+            infeasible = []
+            previous_end = None
+            for position in positions:
+                place = individual[position]
+                start = individual.starts[position] % MINUTES_PER_DAY
+                if previous_end is not None and start < previous_end:
+                    start = previous_end + self.TRAVEL_BUFFER_MINUTES
+                start = max(start, codec.open_minutes[place])
+                if start > latest_starts[place]:
+                    infeasible.append(position)
+                    continue
+                retimed.append((position, day * MINUTES_PER_DAY + start))
+                previous_end = start + codec.stay_minutes[place]
+
+            changed = [position for position, start in retimed
+                       if individual.starts[position] != start]
+            if not changed and not infeasible:
+                continue
+            for position, start in retimed:
+                individual.starts[position] = start
+            mark_positions(individual, changed)
+            to_remove.extend(infeasible)
+
+        for position in sorted(to_remove, reverse=True):
+            day = individual.starts[position] // MINUTES_PER_DAY
+            del individual[position]
+            del individual.starts[position]
+            mark_deleted(individual, position, day)
+
+    @staticmethod
+    def __swap_segment(ind1, ind2, point1, point2=None):
+        """交換兩個個體在 [point1, point2) 區間的景點與開始時間"""
+        days1 = segment_days(ind1, point1, point2)
+        days2 = segment_days(ind2, point1, point2)
+        ind1[point1:point2], ind2[point1:point2] = ind2[
+            point1:point2], ind1[point1:point2]
+        ind1.starts[point1:point2], ind2.starts[point1:point2] = ind2.starts[
+            point1:point2], ind1.starts[point1:point2]
+        mark_replaced(ind1, point1, point2, days1)
+        mark_replaced(ind2, point1, point2, days2)
+
     def __one_point_crossover(self, ind1, ind2):
         """Single point crossover for schedules"""
         if len(ind1) > 1 and len(ind2) > 1:
             point = random.randint(1, min(len(ind1), len(ind2)) - 1)
-            ind1[point:], ind2[point:] = ind2[point:], ind1[point:]
+            self.__swap_segment(ind1, ind2, point)
         return ind1, ind2
 
     def __two_point_crossover(self, ind1, ind2):
@@ -619,8 +1071,7 @@ class OptimizationProblem:
             size = min(len(ind1), len(ind2))
             point1 = random.randint(1, size - 2)
             point2 = random.randint(point1 + 1, size - 1)
-            ind1[point1:point2], ind2[point1:point2] = ind2[
-                point1:point2], ind1[point1:point2]
+            self.__swap_segment(ind1, ind2, point1, point2)
         return ind1, ind2
 
     def __uniform_crossover(self, ind1, ind2):
@@ -628,7 +1079,7 @@ class OptimizationProblem:
         size = min(len(ind1), len(ind2))
         for i in range(size):
             if random.random() < 0.5:  # 50% chance to swap each attraction
-                ind1[i], ind2[i] = ind2[i], ind1[i]
+                self.__swap_segment(ind1, ind2, i, i + 1)
         return ind1, ind2
 
     def __partially_mapped_crossover(self, ind1, ind2):
@@ -644,8 +1095,8 @@ class OptimizationProblem:
         # Create mapping between segments
         mapping = {}
         for i in range(point1, point2):
-            mapping[ind1[i].attr.name] = ind2[i].attr.name
-            mapping[ind2[i].attr.name] = ind1[i].attr.name
+            mapping[ind1[i]] = ind2[i]
+            mapping[ind2[i]] = ind1[i]
 
         # Create offspring using the mapping
         offspring1 = self.__apply_pmx_mapping(ind1, ind2, point1, point2,
@@ -657,22 +1108,25 @@ class OptimizationProblem:
 
     def __apply_pmx_mapping(self, parent1, parent2, point1, point2, mapping):
         """Helper function for PMX crossover"""
-        offspring = parent1.copy()
+        offspring = self.toolbox.clone(parent1)
+        mark_all(offspring)
 
         # Copy the mapping segment from parent2
         offspring[point1:point2] = parent2[point1:point2]
+        offspring.starts[point1:point2] = parent2.starts[point1:point2]
 
         # Fix any conflicts using the mapping
         for i in range(len(parent1)):
             if i < point1 or i >= point2:
-                current_attr = offspring[i].attr.name
+                current_attr = offspring[i]
                 while current_attr in mapping and mapping[
-                        current_attr] != offspring[i].attr.name:
+                        current_attr] != offspring[i]:
                     current_attr = mapping[current_attr]
-                # Find the attraction object with the mapped name
-                for attr in parent2:
-                    if attr.attr.name == current_attr:
+                # Find the attraction with the mapped index
+                for position, attr in enumerate(parent2):
+                    if attr == current_attr:
                         offspring[i] = attr
+                        offspring.starts[i] = parent2.starts[position]
                         break
 
         return offspring
@@ -682,11 +1136,10 @@ class OptimizationProblem:
         if not schedule:
             return
 
-        current_time = schedule[0].time_range.start_time
-        for attr_mod in schedule:
+        mark_all(schedule)
+        current_time = schedule.starts[0]
+        for i in range(len(schedule)):
             # Update start and end times
-            attr_mod.time_range.start_time = current_time
-            attr_mod.time_range.end_time = current_time + timedelta(
-                hours=attr_mod.attr.stay_time)
+            schedule.starts[i] = current_time
             # Add travel time buffer
-            current_time = attr_mod.time_range.end_time + timedelta(minutes=30)
+            current_time = self.codec.end_minutes(schedule, i) + 30
@@ -0,0 +1,124 @@
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from core.distance_matrix import DistanceMatrix
+from core.genome import Genome, GenomeCodec, MINUTES_PER_DAY
+from core.local_search import LocalSearch
+
+
+class QuickPlanner:
+    """
+    不經演化的快速行程：regret-2 插入後執行一次區域搜尋
+
+    每次從尚未排入的景點中，選出「最佳與次佳插入位置的距離增量差」（regret）最大者，
+    插入到距離增量最小的位置；只有一個可行位置的景點 regret 視為無限大，優先插入。
+    餐廳優先於其他景點，且只能排在當天尚未使用的午餐或晚餐時段（必要時等到時段開始）。
+    每天的排程方式與 ExactSolver 相同：開始時間為 max(開門時間, 前一個景點結束 + travel_buffer)，
+    必須在關門與當天結束時間前離開。插入後只重新計算該天的插入位置。
+    """
+
+    def __init__(self, waypoint_distances: DistanceMatrix, codec: GenomeCodec,
+                 day_windows: Sequence[Tuple[int, int]], is_restaurant: Sequence[bool],
+                 meal_windows: Dict[str, Tuple[int, int]], travel_buffer: int,
+                 local_search: Optional[LocalSearch] = None):
+        self.distance = waypoint_distances.distance
+        self.codec = codec
+        self.day_windows = list(day_windows)  # 每天的 (開始, 結束) 分鐘數
+        self.is_restaurant = is_restaurant
+        # 依開始時間排序的 (用餐時段, 開始, 結束)
+        self.meal_windows = sorted(((meal, start, end) for meal, (start, end) in meal_windows.items()),
+                                   key=lambda window: window[1])
+        self.travel_buffer = travel_buffer
+        self.local_search = local_search
+
+    def plan(self, genome_class=Genome) -> Optional[Genome]:
+        """回傳行程，沒有任何景點可以排入時回傳 None"""
+        routes: List[List[int]] = [[] for _ in self.day_windows]
+        pending = set(self.codec.attraction_indices)
+        options = {place: [self.__options(place, day, routes[day])
+                           for day in range(len(routes))]
+                   for place in pending}
+
+        while pending:
+            chosen, chosen_key = None, None
+            for place in pending:
+                candidates = sorted(option for day_options in options[place]
+                                    for option in day_options)
+                if not candidates:
+                    continue
+                regret = (candidates[1][0] - candidates[0][0]
+                          if len(candidates) > 1 else math.inf)
+                key = (self.is_restaurant[place], regret, -candidates[0][0], -place)
+                if chosen_key is None or key > chosen_key:
+                    chosen, chosen_key = (place, candidates[0]), key
+            if chosen is None:
+                break
+
+            place, (_, day, position) = chosen
+            routes[day].insert(position, place)
+            pending.remove(place)
+            for other in pending:
+                options[other][day] = self.__options(other, day, routes[day])
+
+        individual = self.__to_genome(routes, genome_class)
+        if individual is not None and self.local_search is not None:
+            self.local_search.improve(individual)
+        return individual
+
+    def __options(self, place: int, day: int, route: List[int]) -> List[Tuple[float, int, int]]:
+        """place 插入 day 的最佳兩個可行位置 (距離增量, day, 位置)"""
+        options = []
+        for position in range(len(route) + 1):
+            if self.__schedule(day, route[:position] + [place] + route[position:]) is None:
+                continue
+            before = route[position - 1] if position > 0 else None
+            after = route[position] if position < len(route) else None
+            cost = (self.__leg(before, place) + self.__leg(place, after)
+                    - self.__leg(before, after))
+            options.append((cost, day, position))
+        options.sort()
+        return options[:2]
+
+    def __leg(self, a: Optional[int], b: Optional[int]) -> float:
+        if a is None or b is None:
+            return 0.0
+        return self.distance(a, b)
+
+    def __schedule(self, day: int, route: List[int]) -> Optional[List[int]]:
+        """route 在 day 中每個景點的開始時間（當天的分鐘數），不可行時回傳 None"""
+        codec = self.codec
+        ready, day_end = self.day_windows[day]
+        used_meals = set()
+        starts = []
+        for place in route:
+            start = max(codec.open_minutes[place], ready)
+            if self.is_restaurant[place]:
+                meal = self.__meal_start(start, used_meals)
+                if meal is None:
+                    return None
+                used_meals.add(meal[0])
+                start = meal[1]
+            end = start + codec.stay_minutes[place]
+            if end > codec.close_minutes[place] or end > day_end:
+                return None
+            starts.append(start)
+            ready = end + self.travel_buffer
+        return starts
+
+    def __meal_start(self, ready: int, used_meals) -> Optional[Tuple[str, int]]:
+        """ready 之後第一個尚未使用的用餐時段與開始時間"""
+        for meal, start, end in self.meal_windows:
+            if meal not in used_meals and max(ready, start) <= end:
+                return meal, max(ready, start)
+        return None
+
+    def __to_genome(self, routes: List[List[int]], genome_class) -> Optional[Genome]:
+        indices, starts = [], []
+        for day, route in enumerate(routes):
+            if not route:
+                continue
+            indices.extend(route)
+            starts.extend(day * MINUTES_PER_DAY + start for start in self.__schedule(day, route))
+        if not indices:
+            return None
+        return genome_class(indices, starts)
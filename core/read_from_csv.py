@@ -5,6 +5,7 @@ from geopy.distance import geodesic
 from itertools import combinations
 from typing import Dict, Set, FrozenSet, List, Tuple, Any
 from core.generate_initial_trip import Attraction
+from core.distance_matrix import DistanceMatrix
 
 from datetime import datetime, timedelta
 from abc import ABC, abstractmethod
@@ -42,23 +43,27 @@ class BaseWayPointManager(ABC):
 class DistanceCalculator():
 
     def __init__(self, places: list[Place]):
-        self.waypoint_distances: Dict[FrozenSet[str], float] = {}
-        self.waypoint_durations: Dict[FrozenSet[str], float] = {}
+        # DistanceMatrix 同時提供整數索引查詢與舊的 frozenset dict 介面
+        self.waypoint_distances: DistanceMatrix = None
+        self.waypoint_durations: DistanceMatrix = None
         self.all_waypoints_set: Set[
             list[str]] = set()  # Fix: not sure about the type
         self.places: list[Place] = places
 
     def __calculateDistance(self, fixed_speed: int = 60):
-        for (place1, place2) in combinations(self.places, 2):
-            distance = geodesic((place1.lat, place1.lng),
-                                (place2.lat, place2.lng)).kilometers
-            duration = distance / fixed_speed
-
-            place_ids = frozenset([place1.place_id, place2.place_id])
-            self.waypoint_distances[place_ids] = distance
-            self.waypoint_durations[place_ids] = duration
+        # combinations 的順序即為 condensed 上三角的排列順序
+        distances = np.zeros(len(self.places) * (len(self.places) - 1) // 2,
+                             dtype=np.float32)
+        for position, (place1, place2) in enumerate(
+                combinations(self.places, 2)):
+            distances[position] = geodesic(
+                (place1.lat, place1.lng), (place2.lat, place2.lng)).kilometers
             self.all_waypoints_set.update([place1.place_id, place2.place_id])
 
+        self.waypoint_distances = DistanceMatrix(
+            [place.place_id for place in self.places], distances)
+        self.waypoint_durations = self.waypoint_distances.scaled(1 / fixed_speed)
+
     def run(self):
         self.__calculateDistance()
         return self.waypoint_distances, self.waypoint_durations, self.all_waypoints_set
@@ -114,7 +119,9 @@ class WaypointManager(BaseWayPointManager):
                 "price_level": place.price_level,
                 "rating": place.rating,
                 "user_rating_totals": place.user_rating_totals,
-                "category": place.category
+                "category": place.category,
+                "lat": place.lat,
+                "lng": place.lng
             }
             for place in self.places
         }
@@ -219,7 +226,9 @@ class DictReader(BaseWayPointManager):
                 "price_level": place.price_level,
                 "rating": place.rating,
                 "user_rating_totals": place.user_rating_totals,
-                "category": place.category
+                "category": place.category,
+                "lat": place.lat,
+                "lng": place.lng
             }
             for place in self.places
         }
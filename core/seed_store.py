@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from core.genome import Genome, minutes_of_day
+
+# 一個種子行程：[(place_id, 距離第一天 00:00 的分鐘數), ...]
+SeedSchedule = List[Tuple[str, int]]
+
+
+class SeedStore:
+    """
+    暖啟動的種子行程，保存在 directory 下的 JSON 檔案
+
+    key 由候選景點集合的指紋與行程的天數結構（每天的星期與開始/結束時間）組成。
+    行程以相對於第一天 00:00 的分鐘數保存，因此載入時會自動對齊新的日期。
+    檔案超過 max_files 個時，刪除最久沒有讀寫（修改時間最早）的檔案。
+    """
+
+    def __init__(self, directory: str, max_seeds: int = 50, max_files: int = 500):
+        self.directory = directory
+        self.max_seeds = max_seeds
+        self.max_files = max_files
+
+    @staticmethod
+    def key(place_ids: Iterable[str], day_configs: Sequence) -> str:
+        """候選景點集合 + 天數結構的指紋"""
+        day_structure = [
+            (day.start_time.weekday(), minutes_of_day(day.start_time),
+             minutes_of_day(day.end_time)) for day in day_configs
+        ]
+        payload = json.dumps([sorted(place_ids), day_structure])
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def load(self, key: str) -> List[SeedSchedule]:
+        path = self.__path(key)
+        if not os.path.exists(path):
+            return []
+        try:
+            with open(path, encoding='utf-8') as file:
+                schedules = [[(place_id, start) for place_id, start in schedule]
+                             for schedule in json.load(file)['schedules']]
+            # 更新修改時間，清理時保留最近使用的檔案
+            os.utime(path)
+            return schedules
+        except (OSError, ValueError, KeyError, TypeError):
+            # 損壞的檔案視為沒有種子
+            return []
+
+    def save(self, key: str, schedules: List[SeedSchedule]):
+        """以新的種子取代舊的，寫入暫存檔後再替換以免讀到寫到一半的檔案"""
+        os.makedirs(self.directory, exist_ok=True)
+        schedules = self.__spread(schedules, self.max_seeds)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                json.dump({'schedules': schedules}, file)
+            os.replace(temp_path, self.__path(key))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self.__prune()
+
+    def __prune(self):
+        """只保留修改時間最新的 max_files 個種子檔案"""
+        paths = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                path = os.path.join(self.directory, name)
+                try:
+                    paths.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+        paths.sort(reverse=True)
+        for _, path in paths[self.max_files:]:
+            try:
+                os.remove(path)
+            except OSError:
+                # 其他請求可能同時清理
+                pass
+
+    @staticmethod
+    def to_schedule(genome: Genome, place_ids: Sequence[str]) -> SeedSchedule:
+        return [(place_ids[index], start)
+                for index, start in zip(genome, genome.starts)]
+
+    @staticmethod
+    def to_genome(schedule: SeedSchedule, place_index, genome_class=Genome) -> Optional[Genome]:
+        """還原為 Genome；含有不在候選集合中的景點時回傳 None"""
+        if any(place_id not in place_index for place_id, _ in schedule):
+            return None
+        return genome_class([place_index[place_id] for place_id, _ in schedule],
+                            [start for _, start in schedule])
+
+    @staticmethod
+    def __spread(schedules: List, count: int) -> List:
+        """從前沿中平均挑選 count 個，保留多樣性"""
+        if len(schedules) <= count:
+            return list(schedules)
+        step = len(schedules) / count
+        return [schedules[int(i * step)] for i in range(count)]
+
+    def __path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
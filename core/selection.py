@@ -0,0 +1,123 @@
+import numpy as np
+from typing import Callable, Hashable, List, Optional
+
+# 支配比較時單一區塊的最大元素數，避免大族群時一次建立過大的陣列
+_BLOCK_ELEMENTS = 1 << 22
+# Kung 演算法遞迴到這個大小以下時直接兩兩比較
+_BRUTE_FORCE_SIZE = 64
+
+
+def fitness_matrix(individuals: List) -> np.ndarray:
+    """以 DEAP 的加權 fitness (wvalues) 建立 (個體數, 目標數) 矩陣，值越大越好"""
+    return np.array([individual.fitness.wvalues for individual in individuals],
+                    dtype=np.float64)
+
+
+def dominated_by_any(points: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """points 中的每個點是否被 others 中任一點支配"""
+    dominated = np.zeros(len(points), dtype=bool)
+    if len(points) == 0 or len(others) == 0:
+        return dominated
+
+    block = max(1, _BLOCK_ELEMENTS // (len(others) * points.shape[1]))
+    for start in range(0, len(points), block):
+        chunk = points[start:start + block, None, :]
+        not_worse = (others[None, :, :] >= chunk).all(axis=2)
+        better = (others[None, :, :] > chunk).any(axis=2)
+        dominated[start:start + block] = (not_worse & better).any(axis=1)
+    return dominated
+
+
+def _kung(values: np.ndarray, order: np.ndarray) -> np.ndarray:
+    """
+    Kung 演算法：order 已依目標值做字典序遞減排序，
+    因此後半段的點不可能支配前半段的點，只需檢查後半段是否被前半段的非支配點支配
+    """
+    if len(order) <= _BRUTE_FORCE_SIZE:
+        return order[~dominated_by_any(values[order], values[order])]
+
+    half = len(order) // 2
+    top = _kung(values, order[:half])
+    bottom = _kung(values, order[half:])
+    return np.concatenate(
+        [top, bottom[~dominated_by_any(values[bottom], values[top])]])
+
+
+def non_dominated_fronts(values: np.ndarray,
+                         k: Optional[int] = None) -> List[np.ndarray]:
+    """
+    非支配排序，回傳依序排列的各層前沿（列索引）
+
+    k 不為 None 時，只排序到累計至少 k 個點為止。
+    """
+    remaining = np.lexsort(-values.T[::-1])  # 字典序遞減
+    limit = len(values) if k is None else min(k, len(values))
+    fronts = []
+    ranked = 0
+    while ranked < limit:
+        front = _kung(values, remaining)
+        fronts.append(front)
+        ranked += len(front)
+        remaining = remaining[~np.isin(remaining, front)]
+    return fronts
+
+
+def crowding_distance(values: np.ndarray) -> np.ndarray:
+    """同一層前沿中每個點的擁擠距離（與 DEAP 的 assignCrowdingDist 相同）"""
+    size, objectives = values.shape
+    distance = np.zeros(size, dtype=np.float64)
+    if size <= 2:
+        distance[:] = np.inf
+        return distance
+
+    for objective in range(objectives):
+        order = np.argsort(values[:, objective], kind='stable')
+        column = values[order, objective]
+        distance[order[0]] = distance[order[-1]] = np.inf
+        span = column[-1] - column[0]
+        if span == 0:
+            continue
+        distance[order[1:-1]] += (column[2:] - column[:-2]) / span
+    return distance
+
+
+def _select_nsga2(individuals: List, k: int) -> List:
+    if k <= 0 or not individuals:
+        return []
+    values = fitness_matrix(individuals)
+    fronts = non_dominated_fronts(values, k)
+
+    chosen = [index for front in fronts[:-1] for index in front]
+    last = fronts[-1]
+    if len(chosen) + len(last) > k:
+        # 最後一層依擁擠距離由大到小挑選
+        distance = crowding_distance(values[last])
+        last = last[np.argsort(-distance, kind='stable')]
+    chosen.extend(last[:k - len(chosen)])
+    return [individuals[index] for index in chosen]
+
+
+def select_nsga2(individuals: List, k: int,
+                 key: Optional[Callable[[object], Hashable]] = None) -> List:
+    """
+    NSGA-II 選擇：非支配排序 + 擁擠距離，可直接註冊為 toolbox.select
+
+    key 用於判斷重複的個體（例如行程簽章）；會優先選出 k 個不同的個體，
+    只有在不同的個體不足 k 個時才以重複的個體補足。
+    """
+    if key is None:
+        return _select_nsga2(individuals, k)
+
+    distinct, duplicates, seen = [], [], set()
+    for individual in individuals:
+        signature = key(individual)
+        if signature in seen:
+            duplicates.append(individual)
+        else:
+            seen.add(signature)
+            distinct.append(individual)
+
+    chosen = _select_nsga2(distinct, k)
+    if len(chosen) < k:
+        chosen.extend(_select_nsga2(duplicates, k - len(chosen)))
+    return chosen
@@ -0,0 +1,126 @@
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class GenerationRecord:
+    """單一代的統計資料，只包含數值，不保留個體"""
+    generation: int
+    elapsed: float  # 從 run() 開始經過的秒數
+    evaluations: int  # 這一代評估的個體數
+    front_size: int
+    objective_min: Tuple[float, ...]
+    objective_max: Tuple[float, ...]
+    cache_hits: int  # 這一代的 fitness 快取命中數
+    cache_misses: int
+    timings: Dict[str, float] = field(default_factory=dict)  # 各運算子在這一代花費的秒數
+    useful_offspring_rate: Optional[float] = None  # 交配產生新行程的子代比例，這一代沒有交配時為 None
+
+
+@dataclass
+class OffspringCounter:
+    """交配產生的子代數與其中與雙親都不同的子代數"""
+    matings: int = 0
+    useful: int = 0
+
+
+class Telemetry:
+    """
+    每代的輕量統計
+
+    取代在 Statistics 中 deepcopy 整個 hall of fame 的做法：每代只記錄
+    前沿大小、各目標的最小/最大值、評估數、快取命中數與各運算子耗時。
+    sample_every 控制每幾代記錄一次（第 0 代與最後一代一定記錄），
+    records 最多保留 max_records 筆，因此記憶體不會隨代數增加。
+    """
+
+    def __init__(self, sample_every: int = 1, max_records: int = 1000,
+                 log_level: int = logging.DEBUG):
+        self.sample_every = max(1, sample_every)
+        self.records: deque = deque(maxlen=max_records)
+        self.log_level = log_level
+        self.started = time.perf_counter()
+        self.timings: Dict[str, float] = {}
+        self.__cache_counts = (0, 0)
+        self.__offspring_counts = (0, 0)
+
+    def start(self, cache=None, started: Optional[float] = None, offspring=None):
+        """run() 開始時呼叫，重設所有紀錄；started 為 time.perf_counter() 的起始時間"""
+        self.records.clear()
+        self.timings = {}
+        self.started = time.perf_counter() if started is None else started
+        self.__cache_counts = self.__read_cache(cache)
+        self.__offspring_counts = self.__read_offspring(offspring)
+
+    @contextmanager
+    def timer(self, name: str):
+        """累計運算子在目前這一代的耗時"""
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + (
+                time.perf_counter() - begin)
+
+    def record(self, generation: int, population, hof, evaluations: int,
+               cache=None, offspring=None, force: bool = False) -> Optional[GenerationRecord]:
+        """結束一代：依取樣設定（force 時一定記錄）記錄統計並重設計時"""
+        hits, misses = self.__read_cache(cache)
+        previous_hits, previous_misses = self.__cache_counts
+        self.__cache_counts = (hits, misses)
+        matings, useful = self.__read_offspring(offspring)
+        previous_matings, previous_useful = self.__offspring_counts
+        self.__offspring_counts = (matings, useful)
+        timings, self.timings = self.timings, {}
+
+        if not force and generation % self.sample_every != 0:
+            return None
+
+        values = np.array([ind.fitness.values for ind in population],
+                          dtype=np.float64)
+        entry = GenerationRecord(
+            generation=generation,
+            elapsed=time.perf_counter() - self.started,
+            evaluations=evaluations,
+            front_size=len(hof),
+            objective_min=tuple(values.min(axis=0).tolist()) if len(values) else (),
+            objective_max=tuple(values.max(axis=0).tolist()) if len(values) else (),
+            cache_hits=hits - previous_hits,
+            cache_misses=misses - previous_misses,
+            timings=timings,
+            useful_offspring_rate=((useful - previous_useful) / (matings - previous_matings)
+                                   if matings > previous_matings else None))
+        self.records.append(entry)
+        logger.log(self.log_level,
+                   "gen %d: front=%d evals=%d cache_hits=%d elapsed=%.2fs",
+                   entry.generation, entry.front_size, entry.evaluations,
+                   entry.cache_hits, entry.elapsed)
+        return entry
+
+    def to_list(self) -> List[Dict]:
+        """以 dict 回傳所有紀錄，方便序列化給呼叫端"""
+        return [asdict(entry) for entry in self.records]
+
+    @property
+    def latest(self) -> Optional[GenerationRecord]:
+        return self.records[-1] if self.records else None
+
+    @staticmethod
+    def __read_offspring(offspring) -> Tuple[int, int]:
+        if offspring is None:
+            return 0, 0
+        return offspring.matings, offspring.useful
+
+    @staticmethod
+    def __read_cache(cache) -> Tuple[int, int]:
+        if cache is None:
+            return 0, 0
+        return cache.hits, cache.misses
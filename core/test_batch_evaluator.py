@@ -0,0 +1,78 @@
+import random
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+from core.batch_evaluator import BatchEvaluator
+from core.distance_matrix import DistanceMatrix
+from core.generate_initial_trip import Attraction
+from core.genome import Genome
+from core.problems import OptimizationProblem
+
+
+class TestBatchEvaluator(unittest.TestCase):
+    def setUp(self):
+        """Create random places and a population spanning several days"""
+        rng = random.Random(7)
+        categories = [['restaurant', 'food'], ['museum'], ['park'], ['cafe']]
+
+        self.attractions = [
+            Attraction(f"place_{i}", datetime.strptime("08:00", "%H:%M"),
+                       datetime.strptime("22:00", "%H:%M"), 1.5)
+            for i in range(30)
+        ]
+        place_ids = [attraction.name for attraction in self.attractions]
+        size = len(place_ids)
+        waypoint_distances = DistanceMatrix(
+            place_ids, np.array([rng.uniform(0.5, 20.0)
+                                 for _ in range(size * (size - 1) // 2)]))
+        place_additional_info = {
+            place_id: {
+                'price_level': rng.randint(0, 4),
+                'rating': round(rng.uniform(3.0, 5.0), 1),
+                'user_rating_totals': rng.randint(10, 5000),
+                'category': rng.choice(categories)
+            }
+            for place_id in place_ids
+        }
+
+        self.problem = OptimizationProblem.from_problem_data({
+            'waypoint_distances': waypoint_distances,
+            'place_additional_info': place_additional_info,
+            'attractionsDetail': self.attractions,
+            'restaurant_config': OptimizationProblem().restaurant_config
+        })
+        self.evaluator = BatchEvaluator(waypoint_distances,
+                                        place_additional_info,
+                                        self.problem.restaurant_config)
+
+        # 開始時間以距離第一天 00:00 的分鐘數表示，跨越數天
+        self.population = []
+        for _ in range(50):
+            start = 9 * 60
+            indices, starts = [], []
+            for index in rng.sample(range(size), rng.randint(2, 15)):
+                indices.append(index)
+                starts.append(start)
+                start += rng.choice([30, 120, 240, 600])
+            self.population.append(Genome(indices, starts))
+
+    def test_matches_per_individual_evaluation(self):
+        """Batch metrics equal the metrics computed one individual at a time"""
+        batch_metrics = self.evaluator.map(self.population)
+        self.assertEqual(len(batch_metrics), len(self.population))
+
+        for individual, metrics in zip(self.population, batch_metrics):
+            expected = self.problem.calculate_raw_metrics(individual)
+            self.assertEqual(set(metrics), set(expected))
+            for key, value in expected.items():
+                self.assertAlmostEqual(metrics[key], value, places=4,
+                                       msg=f"metric {key} differs")
+
+    def test_empty_population(self):
+        self.assertEqual(self.evaluator.map([]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import random
+import unittest
+from unittest import mock
+
+from core.genome import MINUTES_PER_DAY
+from core.problems import OptimizationProblem
+from core.testing import make_places, read_places, setup_problem
+from core.time_window_index import TimeWindowIndex
+
+
+class TestCrossoverRepair(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(2)
+        self.problem = setup_problem(OptimizationProblem(), read_places(make_places(40, rng)))
+        self.rng = rng
+
+    def random_parent(self):
+        """三天、每天 4 個景點，每個景點間隔兩小時"""
+        indices = self.rng.sample(self.problem.codec.attraction_indices, 12)
+        starts = [day * MINUTES_PER_DAY + (9 + 2 * slot) * 60
+                  for day in range(3) for slot in range(4)]
+        return self.problem.Individual(indices, starts)
+
+    def assert_valid(self, individual):
+        codec = self.problem.codec
+        self.assertEqual(len(set(individual)), len(individual))
+        ends = {}
+        for index, start in zip(individual, individual.starts):
+            day, minute = divmod(start, MINUTES_PER_DAY)
+            self.assertGreaterEqual(minute, codec.open_minutes[index])
+            self.assertLessEqual(minute + codec.stay_minutes[index],
+                                 codec.close_minutes[index])
+            # 同一天內依順序不重疊
+            self.assertGreaterEqual(start, ends.get(day, start))
+            ends[day] = start + codec.stay_minutes[index]
+
+    def test_every_mating_yields_valid_children(self):
+        random.seed(4)
+        for _ in range(200):
+            parent1, parent2 = self.random_parent(), self.random_parent()
+            # 讓雙親共用部分景點，交配後容易產生重複
+            parent2[:6] = parent1[6:]
+            child1, child2 = self.problem.toolbox.mate(parent1, parent2)
+            self.assertFalse(child1.fitness.valid)
+            self.assert_valid(child1)
+            self.assert_valid(child2)
+
+        counter = self.problem.offspring_counter
+        self.assertEqual(counter.matings, 400)
+        self.assertGreater(counter.useful / counter.matings, 0.5)
+
+    def random_sparse_parent(self):
+        """隨機天數與景點數的個體，不同個體同一位置的景點可能在不同天"""
+        count = self.rng.randint(2, 8)
+        indices = self.rng.sample(self.problem.codec.attraction_indices, count)
+        slots = sorted(self.rng.sample([(day, slot) for day in range(3) for slot in range(6)], count))
+        starts = [day * MINUTES_PER_DAY + 9 * 60 + slot * 120 for day, slot in slots]
+        return self.problem.Individual(indices, starts)
+
+    def test_every_crossover_type_yields_chronological_children(self):
+        random.seed(6)
+        for crossover in ('one_point', 'two_point', 'uniform', 'day'):
+            operator = getattr(self.problem, f'_OptimizationProblem__{crossover}_crossover')
+            repair = self.problem._OptimizationProblem__repair
+            for _ in range(300):
+                children = operator(self.random_sparse_parent(), self.random_sparse_parent())
+                for child in children:
+                    repair(child)
+                    self.assert_valid(child)
+                    self.assertEqual(list(child.starts), sorted(child.starts), crossover)
+
+    def test_visited_mask_built_once_per_child(self):
+        random.seed(7)
+        window_index = self.problem.window_index
+        with mock.patch.object(window_index, 'visited', wraps=TimeWindowIndex.visited) as visited, \
+                mock.patch.object(window_index, 'query', wraps=window_index.query) as query:
+            for _ in range(50):
+                parent1, parent2 = self.random_parent(), self.random_parent()
+                parent2[:6] = parent1[6:]  # 重複景點需要查詢替代景點
+                self.problem.toolbox.mate(parent1, parent2)
+            self.assertEqual(visited.call_count, 100)
+            self.assertGreater(query.call_count, 100)
+
+            visited.reset_mock()
+            for _ in range(50):
+                self.problem.toolbox.mutate(self.random_parent())
+            self.assertEqual(visited.call_count, 50)
+
+    def test_repair_retimes_short_individuals(self):
+        repair = self.problem._OptimizationProblem__repair
+        first, second = self.problem.codec.attraction_indices[:2]
+
+        # 兩個景點重疊：第二個延後，不會因為只有兩個景點而略過
+        overlapping = self.problem.Individual([first, second], [9 * 60, 9 * 60 + 30])
+        repair(overlapping)
+        self.assert_valid(overlapping)
+        self.assertEqual(list(overlapping.starts), [9 * 60, 11 * 60])
+
+        # 第二個景點超過當天結束時間（21:00），移除而不是保留在營業時間外
+        late = self.problem.Individual([first, second], [9 * 60, 20 * 60 + 30])
+        repair(late)
+        self.assert_valid(late)
+        self.assertEqual(list(late), [first])
+
+        single = self.problem.Individual([first], [20 * 60])
+        repair(single)
+        self.assertEqual(len(single), 0)
+        self.assertEqual(self.problem.toolbox.mutate(single), (single, ))
+
+    def test_insert_mutation_keeps_start_order(self):
+        random.seed(5)
+        insert = self.problem._OptimizationProblem__insert_mutation_operator
+        for _ in range(100):
+            individual = self.random_parent()
+            insert(individual)
+            self.assert_valid(individual)
+            self.assertEqual(list(individual.starts), sorted(individual.starts))
+            self.assertEqual(len(set(individual.starts)), len(individual.starts))
+
+
+if __name__ == '__main__':
+    unittest.main()
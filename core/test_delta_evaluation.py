@@ -0,0 +1,125 @@
+import random
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+from core.delta_evaluation import (mark_deleted, mark_inserted, mark_positions, mark_replaced,
+                                   segment_days)
+from core.distance_matrix import DistanceMatrix
+from core.generate_initial_trip import Attraction
+from core.genome import Genome, MINUTES_PER_DAY
+from core.problems import OptimizationProblem
+from core.testing import make_places, read_places, setup_problem
+
+
+class TestDeltaEvaluation(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(11)
+        categories = [['restaurant', 'food'], ['museum'], ['park'], ['cafe']]
+        place_ids = [f"place_{i}" for i in range(30)]
+        self.size = len(place_ids)
+        waypoint_distances = DistanceMatrix(
+            place_ids, np.array([self.rng.uniform(0.5, 20.0)
+                                 for _ in range(self.size * (self.size - 1) // 2)]))
+        place_additional_info = {
+            place_id: {
+                'price_level': self.rng.randint(0, 4),
+                'rating': round(self.rng.uniform(3.0, 5.0), 1),
+                'user_rating_totals': self.rng.randint(10, 5000),
+                'category': self.rng.choice(categories)
+            }
+            for place_id in place_ids
+        }
+        attractions = [
+            Attraction(place_id, datetime.strptime("08:00", "%H:%M"),
+                       datetime.strptime("22:00", "%H:%M"), 1.5)
+            for place_id in place_ids
+        ]
+        self.problem = OptimizationProblem.from_problem_data({
+            'waypoint_distances': waypoint_distances,
+            'place_additional_info': place_additional_info,
+            'attractionsDetail': attractions,
+            'restaurant_config': OptimizationProblem().restaurant_config
+        })
+        self.evaluator = self.problem.create_delta_evaluator()
+
+    def random_genome(self):
+        indices = self.rng.sample(range(self.size), self.rng.randint(4, 20))
+        starts = sorted(self.rng.randrange(9 * 60, 4 * MINUTES_PER_DAY)
+                        for _ in indices)
+        return Genome(indices, starts)
+
+    def assert_matches_full_evaluation(self, individual):
+        metrics = self.evaluator.raw_metrics(individual)
+        expected = self.problem.calculate_raw_metrics(individual)
+        for key, value in expected.items():
+            self.assertAlmostEqual(metrics[key], value, places=6,
+                                   msg=f"metric {key} differs")
+
+    def test_random_edits_match_full_evaluation(self):
+        for _ in range(20):
+            individual = self.random_genome()
+            other = self.random_genome()
+            self.assert_matches_full_evaluation(individual)
+            self.assert_matches_full_evaluation(other)
+
+            for _ in range(30):
+                edit = self.rng.choice(['point', 'swap', 'insert', 'delete', 'tail'])
+                if edit == 'point':
+                    position = self.rng.randrange(len(individual))
+                    individual[position] = self.rng.randrange(self.size)
+                    mark_positions(individual, (position, ))
+                elif edit == 'swap':
+                    i, j = self.rng.sample(range(len(individual)), 2)
+                    individual[i], individual[j] = individual[j], individual[i]
+                    mark_positions(individual, (i, j))
+                elif edit == 'insert':
+                    position = self.rng.randrange(len(individual) + 1)
+                    individual.insert(position, self.rng.randrange(self.size))
+                    individual.starts.insert(
+                        position, self.rng.randrange(4 * MINUTES_PER_DAY))
+                    mark_inserted(individual, position)
+                elif edit == 'delete' and len(individual) > 2:
+                    position = self.rng.randrange(len(individual))
+                    day = individual.starts[position] // MINUTES_PER_DAY
+                    del individual[position]
+                    del individual.starts[position]
+                    mark_deleted(individual, position, day)
+                elif edit == 'tail':
+                    point = self.rng.randint(1, min(len(individual), len(other)) - 1)
+                    days1 = segment_days(individual, point)
+                    days2 = segment_days(other, point)
+                    individual[point:], other[point:] = other[point:], individual[point:]
+                    individual.starts[point:], other.starts[point:] = \
+                        other.starts[point:], individual.starts[point:]
+                    mark_replaced(individual, point, None, days1)
+                    mark_replaced(other, point, None, days2)
+                    self.assert_matches_full_evaluation(other)
+                self.assert_matches_full_evaluation(individual)
+
+        self.assertGreater(self.evaluator.delta_evaluations,
+                           self.evaluator.full_evaluations)
+
+
+class TestDeltaEvaluationOptIn(unittest.TestCase):
+    def test_delta_evaluator_is_only_used_when_requested_without_batch(self):
+        rng = random.Random(12)
+        setup_args = read_places(make_places(20, rng))
+
+        def evaluators(**options):
+            problem = setup_problem(OptimizationProblem(**options), setup_args,
+                                    "2024-11-20T18:00")
+            return problem.delta_evaluator, problem.evaluator
+
+        self.assertEqual(evaluators(), (None, None))
+        delta, evaluator = evaluators(delta_evaluation=True)
+        self.assertIsNotNone(delta)
+        self.assertIsNone(evaluator)
+        delta, evaluator = evaluators(delta_evaluation=True, batch_evaluation=True)
+        self.assertIsNone(delta)
+        self.assertIsNotNone(evaluator)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from itertools import combinations
+
+import numpy as np
+
+from core.distance_matrix import DistanceMatrix
+
+
+class TestDistanceMatrix(unittest.TestCase):
+    def setUp(self):
+        """Build a small matrix and the equivalent frozenset dict"""
+        self.place_ids = ['place_a', 'place_b', 'place_c', 'place_d']
+        self.waypoint_distances = {
+            frozenset(pair): float(index + 1)
+            for index, pair in enumerate(combinations(self.place_ids, 2))
+        }
+        self.matrix = DistanceMatrix(
+            self.place_ids,
+            np.arange(1, len(self.waypoint_distances) + 1))
+
+    def test_index_lookup_matches_dict(self):
+        """Integer index lookups return the same values as the dict"""
+        for pair, distance in self.waypoint_distances.items():
+            place1, place2 = tuple(pair)
+            i, j = self.matrix.index(place1), self.matrix.index(place2)
+            self.assertAlmostEqual(self.matrix.distance(i, j), distance)
+            self.assertAlmostEqual(self.matrix.distance(j, i), distance)
+
+    def test_same_place_distance_is_zero(self):
+        self.assertEqual(self.matrix.distance(2, 2), 0.0)
+
+    def test_mapping_compatibility(self):
+        """The matrix can still be used like the old frozenset dict"""
+        self.assertEqual(len(self.matrix), len(self.waypoint_distances))
+        self.assertEqual(set(self.matrix), set(self.waypoint_distances))
+        for pair, distance in self.waypoint_distances.items():
+            self.assertIn(pair, self.matrix)
+            self.assertAlmostEqual(self.matrix[pair], distance)
+        self.assertNotIn(frozenset(['place_a', 'unknown']), self.matrix)
+
+    def test_from_dict_round_trip(self):
+        matrix = DistanceMatrix.from_dict(self.waypoint_distances)
+        for pair, distance in self.waypoint_distances.items():
+            self.assertAlmostEqual(matrix[pair], distance)
+        self.assertIs(DistanceMatrix.from_dict(matrix), matrix)
+
+    def test_vectorized_distances(self):
+        from_indices = np.array([0, 1, 3, 2])
+        to_indices = np.array([1, 3, 0, 2])
+        expected = [
+            self.matrix.distance(i, j)
+            for i, j in zip(from_indices, to_indices)
+        ]
+        np.testing.assert_allclose(
+            self.matrix.distances(from_indices, to_indices), expected)
+
+    def test_square_matrix_is_symmetric(self):
+        square = self.matrix.to_square()
+        np.testing.assert_array_equal(square, square.T)
+        self.assertEqual(square[0, 1], self.matrix.distance(0, 1))
+
+    def test_invalid_condensed_length(self):
+        with self.assertRaises(ValueError):
+            DistanceMatrix(self.place_ids, np.zeros(3))
+
+
+if __name__ == '__main__':
+    unittest.main()
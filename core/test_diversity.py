@@ -0,0 +1,51 @@
+import random
+import unittest
+
+from core.diversity import DiversityFilter
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+
+class TestDiversityFilter(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(8)
+
+    def random_set(self):
+        return frozenset(self.rng.sample(range(200), 20))
+
+    def test_exact_mode_matches_pairwise_jaccard(self):
+        sets = [self.random_set() for _ in range(50)]
+        sets += [frozenset(list(s)[:-2]) for s in sets[:10]]
+        diversity = DiversityFilter(threshold=0.3)
+        expected = []
+        for elements in sets:
+            if all(jaccard(elements, kept) <= 0.3 for kept in expected):
+                expected.append(elements)
+            diversity.add(elements, elements)
+        self.assertEqual(diversity.items, expected)
+
+    def test_lsh_mode_rejects_near_duplicates(self):
+        diversity = DiversityFilter(threshold=0.8, exact_limit=0)
+        originals = [self.random_set() for _ in range(300)]
+        for elements in originals:
+            diversity.add(elements)
+        kept = len(diversity)
+        for elements in originals:
+            # 換掉一個景點，相似度 19 / 21
+            replaced = set(elements)
+            replaced.remove(min(replaced))
+            replaced.add(200 + len(replaced))
+            self.assertFalse(diversity.add(replaced))
+        self.assertEqual(len(diversity), kept)
+
+    def test_threshold_one_only_removes_duplicates(self):
+        diversity = DiversityFilter(threshold=1.0)
+        self.assertTrue(diversity.add([1, 2, 3]))
+        self.assertTrue(diversity.add([1, 2]))
+        self.assertFalse(diversity.add([3, 2, 1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
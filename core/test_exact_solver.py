@@ -0,0 +1,83 @@
+import random
+import unittest
+
+from core.genome import MINUTES_PER_DAY, minutes_of_day
+from core.problems import OptimizationProblem
+from core.testing import make_places, read_places, setup_problem
+
+
+def make_problem(count, return_datetime, seed):
+    rng = random.Random(seed)
+    places = make_places(count, rng)
+    for place in places:
+        # 不同的營業時間，讓時間窗影響可行的順序
+        open_hour = rng.choice([8, 10, 12, 17])
+        place['opening_hour'] = {'1': [f'{open_hour:02d}:00',
+                                       f'{min(open_hour + rng.choice([3, 5, 12]), 23):02d}:00']}
+    return setup_problem(OptimizationProblem(), read_places(places), return_datetime)
+
+
+def brute_force(problem):
+    """列舉每天所有可行的景點順序，回傳最佳的 (-景點數, 餐廳懲罰, 距離)"""
+    codec = problem.codec
+    buffer = problem.TRAVEL_BUFFER_MINUTES
+    windows = [(minutes_of_day(day.start_time), minutes_of_day(day.end_time))
+               for day in problem.day_configs]
+    categories = problem.restaurant_config['restaurant_categories']
+    restaurant = {index for index, attraction in zip(codec.attraction_indices, codec.attractions)
+                  if categories.intersection(problem.place_additional_info[attraction.name]['category'])}
+    best = []
+
+    def search(day, time, last, visited, distance, penalty, restaurants):
+        day_penalty = problem.restaurant_day_penalty(restaurants) if restaurants else 0.0
+        best.append((-len(visited), penalty + day_penalty, round(distance, 9)))
+        for index in codec.attraction_indices:
+            if index in visited:
+                continue
+            start = max(codec.open_minutes[index], time)
+            end = start + codec.stay_minutes[index]
+            if end > codec.close_minutes[index] or end > windows[day][1]:
+                continue
+            search(day, end + buffer, index, visited | {index},
+                   distance + (problem.waypoint_distances.distance(last, index)
+                               if last is not None else 0.0),
+                   penalty, restaurants + [start] if index in restaurant else restaurants)
+        if day + 1 < len(windows):
+            search(day + 1, windows[day + 1][0], last, visited, distance,
+                   penalty + day_penalty, [])
+
+    search(0, windows[0][0], None, frozenset(), 0.0, 0.0, [])
+    return min(best)
+
+
+class TestExactSolver(unittest.TestCase):
+    def assert_optimal(self, problem):
+        solver = problem.create_exact_solver()
+        individual = solver.solve(problem.Individual)
+        self.assertTrue(solver.optimal)
+
+        codec = problem.codec
+        metrics = problem.calculate_raw_metrics(individual)
+        expected = brute_force(problem)
+        self.assertEqual(-metrics['place_count'], expected[0])
+        self.assertAlmostEqual(metrics['restaurant_penalty'], expected[1])
+        self.assertAlmostEqual(metrics['trip_length'], expected[2], places=6)
+
+        for index, start in zip(individual, individual.starts):
+            day_config = problem.day_configs[start // MINUTES_PER_DAY]
+            minute = start % MINUTES_PER_DAY
+            self.assertGreaterEqual(minute, codec.open_minutes[index])
+            self.assertLessEqual(minute + codec.stay_minutes[index],
+                                 min(codec.close_minutes[index],
+                                     minutes_of_day(day_config.end_time)))
+
+    def test_single_day_matches_brute_force(self):
+        for seed in range(3):
+            self.assert_optimal(make_problem(7, "2024-11-19T21:00", seed))
+
+    def test_multiple_days_match_brute_force(self):
+        self.assert_optimal(make_problem(5, "2024-11-20T21:00", 7))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import random
+import unittest
+from datetime import datetime, timedelta
+
+from core.feasibility import FeasibilityTable
+from core.generate_initial_trip import Attraction
+from core.generate_multiple_day_trip import DayConfig
+
+
+class TestFeasibilityTable(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(9)
+        self.attractions = []
+        for i in range(60):
+            open_hour = rng.randint(6, 12)
+            close_hour = rng.randint(open_hour + 1, 23)
+            self.attractions.append(
+                Attraction(f"place_{i}",
+                           datetime.strptime(f"{open_hour:02d}:{rng.choice([0, 30])}", "%H:%M"),
+                           datetime.strptime(f"{close_hour:02d}:00", "%H:%M"),
+                           rng.choice([0.5, 1.0, 1.5, 2.0])))
+        self.day_configs = DayConfig.create_day_configs(
+            "2024-11-19T10:30", "2024-11-21T17:00", "09:00", "21:00")
+        self.table = FeasibilityTable.from_attractions(self.attractions, self.day_configs)
+
+    def test_matches_datetime_check(self):
+        for day, day_config in enumerate(self.day_configs):
+            current_time = day_config.start_time
+            while current_time <= day_config.end_time:
+                feasible = self.table.feasible(day, self.table.minute(day, current_time))
+                for position, attraction in enumerate(self.attractions):
+                    open_time = datetime.combine(day_config.date.date(), attraction.open_time.time())
+                    close_time = datetime.combine(day_config.date.date(), attraction.close_time.time())
+                    end_time = current_time + timedelta(hours=attraction.stay_time)
+                    expected = (current_time >= open_time and end_time <= close_time
+                                and end_time <= day_config.end_time)
+                    self.assertEqual(bool(feasible[position]), expected)
+                    self.assertEqual(
+                        self.table.can_start(day, position, self.table.minute(day, current_time)),
+                        expected)
+                current_time += timedelta(minutes=15)
+
+    def test_first_day_starts_at_departure(self):
+        # 第一天 10:30 出發，10:00 開門的景點不能在 10:00 開始
+        self.assertTrue((self.table.earliest[0] >= 10 * 60 + 30).all())
+        self.assertFalse(self.table.feasible(0, 10 * 60).any())
+
+    def test_table_is_read_only(self):
+        with self.assertRaises(ValueError):
+            self.table.latest[0, 0] = 0
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+
+from core.fitness_cache import FitnessCache
+from core.genome import Genome
+
+
+class TestFitnessCache(unittest.TestCase):
+    def test_signature_includes_start_times(self):
+        same = FitnessCache.signature(Genome([1, 2], [540, 660]))
+        self.assertEqual(same, FitnessCache.signature(Genome([1, 2], [540, 660])))
+        self.assertNotEqual(same, FitnessCache.signature(Genome([1, 2], [540, 700])))
+        self.assertNotEqual(same, FitnessCache.signature(Genome([2, 1], [540, 660])))
+
+    def test_hits_and_misses(self):
+        cache = FitnessCache(max_size=4)
+        key = FitnessCache.signature(Genome([1, 2], [540, 660]))
+        self.assertIsNone(cache.get(key))
+        cache.put(key, {'trip_length': 1.0})
+        self.assertEqual(cache.get(key), {'trip_length': 1.0})
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.hit_rate, 0.5)
+
+    def test_least_recently_used_is_evicted(self):
+        cache = FitnessCache(max_size=2)
+        cache.put('a', {})
+        cache.put('b', {})
+        cache.get('a')
+        cache.put('c', {})
+        self.assertEqual(len(cache), 2)
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+
+    def test_zero_size_disables_cache(self):
+        cache = FitnessCache(max_size=0)
+        cache.put('a', {})
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import copy
+import pickle
+import unittest
+from datetime import datetime
+
+from core.generate_initial_trip import Attraction, AttractionModify, TimeRange
+from core.genome import Genome, GenomeCodec, MINUTES_PER_DAY
+
+
+class TestGenome(unittest.TestCase):
+    def setUp(self):
+        self.attractions = [
+            Attraction(f"place_{i}", datetime.strptime("08:00", "%H:%M"),
+                       datetime.strptime("20:00", "%H:%M"), 1.5)
+            for i in range(5)
+        ]
+        place_index = {
+            attraction.name: index
+            for index, attraction in enumerate(self.attractions)
+        }
+        self.codec = GenomeCodec(self.attractions, place_index,
+                                 datetime(2024, 3, 20, 9, 0))
+
+    def test_encode_decode_round_trip(self):
+        schedule = [
+            AttractionModify(self.attractions[3],
+                             TimeRange(datetime(2024, 3, 20, 9, 0),
+                                       datetime(2024, 3, 20, 10, 30))),
+            AttractionModify(self.attractions[1],
+                             TimeRange(datetime(2024, 3, 21, 13, 15),
+                                       datetime(2024, 3, 21, 14, 45))),
+        ]
+        genome = self.codec.encode(schedule)
+
+        self.assertEqual(list(genome), [3, 1])
+        self.assertEqual(list(genome.starts),
+                         [9 * 60, MINUTES_PER_DAY + 13 * 60 + 15])
+        self.assertEqual(genome.day(1), 1)
+
+        decoded = self.codec.decode(genome)
+        self.assertEqual([item.attr.name for item in decoded],
+                         ['place_3', 'place_1'])
+        self.assertEqual([item.time_range.start_time for item in decoded],
+                         [item.time_range.start_time for item in schedule])
+        self.assertEqual([item.time_range.end_time for item in decoded],
+                         [item.time_range.end_time for item in schedule])
+
+    def test_copy_keeps_start_times(self):
+        genome = Genome([0, 2, 4], [540, 660, 780])
+        for clone in (copy.deepcopy(genome),
+                      pickle.loads(pickle.dumps(genome))):
+            self.assertEqual(list(clone), [0, 2, 4])
+            self.assertEqual(list(clone.starts), [540, 660, 780])
+            clone.starts[0] = 0
+            self.assertEqual(genome.starts[0], 540)
+
+    def test_length_mismatch(self):
+        with self.assertRaises(ValueError):
+            Genome([0, 1], [540])
+
+
+if __name__ == '__main__':
+    unittest.main()
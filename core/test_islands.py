@@ -0,0 +1,56 @@
+import random
+import time
+import unittest
+
+from core.algorithms import IslandNSGAIIAlgorithm, StoppingConfig
+from core.testing import make_places, read_places, setup_problem
+
+
+class TestIslandNSGAII(unittest.TestCase):
+    def setUp(self):
+        self.setup_args = read_places(make_places(30, random.Random(8)))
+
+    def run_islands(self, ngen=6, **stopping):
+        algo = IslandNSGAIIAlgorithm(population_size=20, ngen=ngen, cxpb=0.5, mutpb=0.2,
+                                     islands=2, migration_interval=2, migrants=2, seed=1,
+                                     stopping=StoppingConfig(**stopping))
+        setup_problem(algo, self.setup_args)
+        started = time.perf_counter()
+        population, hof, routes = algo.run()
+        return algo, population, hof, routes, time.perf_counter() - started
+
+    def test_islands_migrate_and_merge_fronts(self):
+        algo, population, hof, routes, _ = self.run_islands()
+        results = algo.island_results
+        self.assertEqual(sorted(results), [0, 1])
+        for result in results.values():
+            self.assertEqual(result['generations'], 6)
+            # 第 2、4 代結束後各接收 2 個個體
+            self.assertEqual(result['immigrants'], 4)
+
+        # 合併後的族群就是各島的 Pareto front，最終前沿只來自這些個體
+        self.assertEqual(len(population), sum(len(result['front']) for result in results.values()))
+        fronts = {(tuple(indices), tuple(starts))
+                  for result in results.values() for indices, starts in result['front']}
+        for individual in hof:
+            self.assertIn((tuple(individual), tuple(individual.starts)), fronts)
+            self.assertTrue(individual.fitness.valid)
+        self.assertEqual(len(routes), len(hof))
+        self.assertEqual(algo.evaluations, sum(result['evaluations'] for result in results.values()))
+
+    def test_time_limit_is_a_global_deadline(self):
+        algo, _, hof, _, elapsed = self.run_islands(ngen=100000, time_limit=0.8)
+        self.assertEqual(algo.stop_reason, 'time_limit')
+        self.assertTrue(len(hof) > 0)
+        # 包含啟動 process 與合併的時間
+        self.assertLess(elapsed, 1.4)
+
+    def test_stop_request_reaches_islands(self):
+        algo, _, hof, _, elapsed = self.run_islands(ngen=100000, stop_requested=lambda: True)
+        self.assertEqual(algo.stop_reason, 'stopped')
+        self.assertTrue(len(hof) > 0)
+        self.assertLess(algo.generations, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import random
+import unittest
+
+from core.genome import MINUTES_PER_DAY
+from core.problems import OptimizationProblem
+from core.testing import make_places, read_places, setup_problem
+
+
+class TestLocalSearch(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(3)
+        self.problem = setup_problem(OptimizationProblem(), read_places(make_places(30, rng)))
+        self.rng = rng
+
+    def random_individual(self):
+        """三天、每天 5 個景點，每個景點間隔兩小時"""
+        indices = self.rng.sample(self.problem.codec.attraction_indices, 15)
+        starts = [day * MINUTES_PER_DAY + (9 + 2 * slot) * 60
+                  for day in range(3) for slot in range(5)]
+        return self.problem.Individual(indices, starts)
+
+    def test_improvement_only_reorders_within_days(self):
+        problem = self.problem
+        improved_count = 0
+        for _ in range(30):
+            individual = self.random_individual()
+            before = problem.calculate_raw_metrics(individual)
+            original = problem.toolbox.clone(individual)
+            improved = problem.toolbox.local_search(individual)
+            after = problem.calculate_raw_metrics(individual)
+
+            self.assertEqual(list(individual.starts), list(original.starts))
+            self.assertEqual(individual[-1], original[-1])
+            for day in range(3):
+                self.assertEqual(
+                    {index for index, start in zip(individual, individual.starts)
+                     if start // MINUTES_PER_DAY == day},
+                    {index for index, start in zip(original, original.starts)
+                     if start // MINUTES_PER_DAY == day})
+            if improved:
+                improved_count += 1
+                self.assertLess(after['trip_length'], before['trip_length'])
+            else:
+                self.assertEqual(list(individual), list(original))
+            for key in ('price_level_sum', 'rating', 'user_rating_totals', 'place_count'):
+                self.assertAlmostEqual(after[key], before[key])
+            self.assertLessEqual(after['restaurant_penalty'], before['restaurant_penalty'])
+        self.assertGreater(improved_count, 0)
+
+    def test_delta_evaluation_matches_full_evaluation(self):
+        problem = self.problem
+        evaluator = problem.create_delta_evaluator()
+        for _ in range(10):
+            individual = self.random_individual()
+            evaluator.raw_metrics(individual)
+            problem.toolbox.local_search(individual)
+            delta = evaluator.raw_metrics(individual)
+            full = problem.calculate_raw_metrics(individual)
+            for key, value in full.items():
+                self.assertAlmostEqual(delta[key], value, places=6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import random
+import unittest
+
+from core.algorithms import NSGAIIAlgorithm
+from core.genome import MINUTES_PER_DAY
+from core.problems import OptimizationProblem
+from core.testing import make_places, read_places, setup_problem
+
+
+class TestParallelEvaluator(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(10)
+        self.setup_args = read_places(make_places(30, rng))
+        self.rng = rng
+
+    def setup_problem(self, target):
+        return setup_problem(target, self.setup_args)
+
+    def population(self, problem):
+        rng = random.Random(3)
+        population = []
+        for _ in range(40):
+            indices = rng.sample(problem.codec.attraction_indices, 9)
+            starts = [day * MINUTES_PER_DAY + (9 + 3 * slot) * 60
+                      for day in range(3) for slot in range(3)]
+            population.append(problem.Individual(indices, starts))
+        return population
+
+    def evaluate(self, problem):
+        toolbox = problem.toolbox
+        try:
+            return list(toolbox.map(toolbox.evaluate, self.population(problem)))
+        finally:
+            problem.close_evaluator()
+
+    def test_pooled_fitness_matches_serial(self):
+        serial = self.evaluate(self.setup_problem(OptimizationProblem()))
+        pooled = self.evaluate(self.setup_problem(OptimizationProblem(processes=2)))
+        self.assertEqual(pooled, serial)
+
+    def test_pool_is_closed_after_run(self):
+        algo = NSGAIIAlgorithm(population_size=20, ngen=2, cxpb=0.5, mutpb=0.2, processes=2)
+        self.setup_problem(algo)
+        evaluator = algo.problem.evaluator
+        self.assertIsNotNone(evaluator)
+        algo.run()
+        self.assertIsNone(evaluator.pool)
+        self.assertIsNone(algo.problem.evaluator)
+
+
+if __name__ == '__main__':
+    unittest.main()
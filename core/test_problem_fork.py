@@ -0,0 +1,54 @@
+import pickle
+import random
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from core.genome import MINUTES_PER_DAY
+from core.problems import OptimizationProblem
+from core.testing import make_places, read_places, setup_problem
+
+
+class TestProblemFork(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(5)
+        self.problem = setup_problem(OptimizationProblem(), read_places(make_places(30, rng)))
+        self.population = []
+        for _ in range(20):
+            indices = rng.sample(self.problem.codec.attraction_indices, 9)
+            starts = [day * MINUTES_PER_DAY + (9 + 3 * slot) * 60
+                      for day in range(3) for slot in range(3)]
+            self.population.append(self.problem.Individual(indices, starts))
+
+    def evaluate(self, problem):
+        toolbox = problem.toolbox
+        return [toolbox.evaluate(toolbox.clone(individual))
+                for individual in self.population]
+
+    def test_fork_shares_data_but_not_run_state(self):
+        fork = self.problem.fork()
+        self.assertIs(fork.codec, self.problem.codec)
+        self.assertIs(fork.waypoint_distances, self.problem.waypoint_distances)
+        self.assertIsNot(fork.normalizer, self.problem.normalizer)
+        self.assertIsNot(fork.fitness_cache, self.problem.fitness_cache)
+        self.assertFalse(self.problem.waypoint_distances.condensed.flags.writeable)
+
+    def test_concurrent_forks_match_sequential_run(self):
+        expected = self.evaluate(self.problem.fork())
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(
+                lambda problem: self.evaluate(problem),
+                [self.problem.fork() for _ in range(4)]))
+        for result in results:
+            self.assertEqual(result, expected)
+
+    def test_individuals_survive_pickling(self):
+        individual = self.population[0]
+        individual.fitness.values = self.evaluate(self.problem)[0]
+        restored = pickle.loads(pickle.dumps(individual))
+        self.assertEqual(list(restored), list(individual))
+        self.assertEqual(list(restored.starts), list(individual.starts))
+        self.assertEqual(restored.fitness.values, individual.fitness.values)
+
+
+if __name__ == '__main__':
+    unittest.main()
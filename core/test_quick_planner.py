@@ -0,0 +1,48 @@
+import random
+import unittest
+from collections import defaultdict
+
+from core.genome import MINUTES_PER_DAY, minutes_of_day
+from core.problems import OptimizationProblem
+from core.testing import make_places, read_places, setup_problem
+
+
+class TestQuickPlanner(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(4)
+        self.problem = setup_problem(OptimizationProblem(), read_places(make_places(40, rng)))
+
+    def test_plan_respects_opening_hours_and_meal_windows(self):
+        problem = self.problem
+        codec = problem.codec
+        individual = problem.create_quick_planner().plan(problem.Individual)
+
+        self.assertEqual(len(set(individual)), len(individual))
+        self.assertEqual(list(individual.starts), sorted(individual.starts))
+        categories = problem.restaurant_config['restaurant_categories']
+        meals = defaultdict(list)
+        for index, start in zip(individual, individual.starts):
+            day_config = problem.day_configs[start // MINUTES_PER_DAY]
+            minute = start % MINUTES_PER_DAY
+            self.assertGreaterEqual(minute, codec.open_minutes[index])
+            self.assertLessEqual(minute + codec.stay_minutes[index],
+                                 min(codec.close_minutes[index],
+                                     minutes_of_day(day_config.end_time)))
+            place_id = problem.waypoint_distances.place_ids[index]
+            if categories.intersection(problem.place_additional_info[place_id]['category']):
+                meals[start // MINUTES_PER_DAY].append(problem.restaurant_meal(minute))
+
+        self.assertTrue(meals)
+        for day_meals in meals.values():
+            self.assertNotIn(None, day_meals)
+            self.assertEqual(len(day_meals), len(set(day_meals)))
+
+    def test_plan_fills_every_day(self):
+        individual = self.problem.create_quick_planner().plan(self.problem.Individual)
+        days = {start // MINUTES_PER_DAY for start in individual.starts}
+        self.assertEqual(days, set(range(len(self.problem.day_configs))))
+        self.assertEqual(len(self.problem.toolbox.evaluate(individual)), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import random
+import unittest
+
+from core.generate_multiple_day_trip import MultiDayScheduleGenerator, GeneratorConfig
+from core.problems import OptimizationProblem
+from core.testing import make_places, read_places, setup_problem
+
+
+class TestScheduleGenerator(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(6)
+        self.problem = setup_problem(OptimizationProblem(), read_places(make_places(25, rng)))
+
+    def generate(self, **config):
+        problem = self.problem
+        generator = MultiDayScheduleGenerator(
+            problem.attractionsDetail, problem.day_configs, problem.place_additional_info,
+            GeneratorConfig(**{'attempts_per_strategy': 30, 'batch_size': 10,
+                               'min_total_schedules': 5, **config}))
+        return [[(attr_mod.attr.name, attr_mod.time_range.start_time)
+                 for day_schedule in schedule for attr_mod in day_schedule]
+                for schedule in generator.generate_population()]
+
+    def test_same_seed_gives_same_population_in_parallel(self):
+        serial = self.generate(seed=11)
+        self.assertTrue(serial)
+        self.assertEqual(self.generate(seed=11, workers=2), serial)
+        self.assertNotEqual(self.generate(seed=12), serial)
+
+    def test_attempt_budget_limits_generation(self):
+        # 只有一個工作：貪婪策略嘗試 4 次
+        self.assertLessEqual(len(self.generate(max_attempts=4, min_total_schedules=0)), 4)
+
+    def test_geo_strategy_keeps_days_compact(self):
+        problem = self.problem
+        generator = MultiDayScheduleGenerator(
+            problem.attractionsDetail, problem.day_configs, problem.place_additional_info,
+            GeneratorConfig(seed=3))
+        self.assertIn('geo', generator.strategies())
+
+        def mean_leg(schedules):
+            distance = problem.waypoint_distances.distance
+            legs = [distance(problem.place_index[a.attr.name], problem.place_index[b.attr.name])
+                    for schedule in schedules for day_schedule in schedule
+                    for a, b in zip(day_schedule, day_schedule[1:])]
+            return sum(legs) / len(legs)
+
+        geo = generator.generate_batch('geo', 20, seed=1)
+        self.assertTrue(geo)
+        self.assertLess(mean_leg(geo), mean_leg(generator.generate_batch('random', 20, seed=1)))
+
+    def test_geo_strategy_requires_coordinates(self):
+        place_info = {name: {key: value for key, value in info.items() if key != 'lat'}
+                      for name, info in self.problem.place_additional_info.items()}
+        generator = MultiDayScheduleGenerator(
+            self.problem.attractionsDetail, self.problem.day_configs, place_info)
+        self.assertNotIn('geo', generator.strategies())
+
+    def test_population_is_sized_to_request(self):
+        population = self.problem.generate_population(150)
+        self.assertEqual(len(population), 150)
+        self.assertEqual(len({id(individual) for individual in population}), 150)
+        self.assertTrue(all(isinstance(individual, self.problem.Individual)
+                            for individual in population))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+from core.generate_multiple_day_trip import DayConfig
+from core.genome import Genome
+from core.seed_store import SeedStore
+
+
+class TestSeedStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = SeedStore(self.directory.name, max_seeds=3)
+        self.place_ids = ['a', 'b', 'c', 'd']
+        self.day_configs = DayConfig.create_day_configs(
+            "2024-11-19T09:00", "2024-11-21T18:00", "09:00", "21:00")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_key_depends_on_candidates_and_day_structure(self):
+        key = SeedStore.key(self.place_ids, self.day_configs)
+        self.assertEqual(key, SeedStore.key(reversed(self.place_ids), self.day_configs))
+        self.assertNotEqual(key, SeedStore.key(self.place_ids[:3], self.day_configs))
+
+        # 一週後相同星期的行程共用種子，不同星期則不共用
+        next_week = DayConfig.create_day_configs(
+            "2024-11-26T09:00", "2024-11-28T18:00", "09:00", "21:00")
+        next_day = DayConfig.create_day_configs(
+            "2024-11-20T09:00", "2024-11-22T18:00", "09:00", "21:00")
+        self.assertEqual(key, SeedStore.key(self.place_ids, next_week))
+        self.assertNotEqual(key, SeedStore.key(self.place_ids, next_day))
+
+    def test_save_and_load(self):
+        key = SeedStore.key(self.place_ids, self.day_configs)
+        self.assertEqual(self.store.load(key), [])
+
+        genomes = [Genome([i % 4, (i + 1) % 4], [540, 660 + i]) for i in range(6)]
+        self.store.save(key, [SeedStore.to_schedule(genome, self.place_ids)
+                              for genome in genomes])
+        schedules = self.store.load(key)
+        self.assertEqual(len(schedules), 3)
+        self.assertEqual(schedules[0], [('a', 540), ('b', 660)])
+        self.assertEqual(os.listdir(self.directory.name), [f"{key}.json"])
+
+        place_index = {place_id: index for index, place_id in enumerate(self.place_ids)}
+        genome = SeedStore.to_genome(schedules[0], place_index)
+        self.assertEqual((list(genome), list(genome.starts)), ([0, 1], [540, 660]))
+        self.assertIsNone(SeedStore.to_genome([('z', 540)], place_index))
+
+    def test_keeps_most_recently_used_files(self):
+        store = SeedStore(self.directory.name, max_files=2)
+        keys = [SeedStore.key(self.place_ids[:count], self.day_configs) for count in (2, 3, 4)]
+        for age, key in enumerate(keys[:2]):
+            store.save(key, [[('a', 540)]])
+            # 檔案系統的時間精度可能不足，明確設定修改時間
+            os.utime(os.path.join(self.directory.name, f"{key}.json"), (age, age))
+        self.assertTrue(store.load(keys[0]))  # 讀取後成為最近使用的檔案
+        store.save(keys[2], [[('a', 540)]])
+
+        self.assertEqual(sorted(os.listdir(self.directory.name)),
+                         sorted(f"{key}.json" for key in (keys[0], keys[2])))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import random
+import unittest
+
+import numpy as np
+from deap import base, creator, tools
+
+from core.algorithms import NSGAIIAlgorithm
+from core.selection import crowding_distance, non_dominated_fronts, select_nsga2
+from core.testing import make_places, read_places, setup_problem
+
+
+def brute_force_ranks(values):
+    ranks = np.full(len(values), -1)
+    rank = 0
+    while (ranks < 0).any():
+        remaining = np.flatnonzero(ranks < 0)
+        for i in remaining:
+            dominated = any(
+                (values[j] >= values[i]).all() and (values[j] > values[i]).any()
+                for j in remaining)
+            if not dominated:
+                ranks[i] = rank
+        rank += 1
+    return ranks
+
+
+creator.create('SelectionFitness', base.Fitness, weights=(1.0, -1.0, 1.0))
+creator.create('SelectionIndividual', list, fitness=creator.SelectionFitness)
+
+
+class TestSelection(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(3)
+
+    def make_population(self, size):
+        population = []
+        for _ in range(size):
+            individual = creator.SelectionIndividual(
+                [self.rng.randrange(1000) for _ in range(3)])
+            # 使用少量離散值，產生相同 fitness 的個體
+            individual.fitness.values = tuple(
+                float(self.rng.randint(0, 8)) for _ in range(3))
+            population.append(individual)
+        return population
+
+    def test_fronts_match_brute_force(self):
+        values = np.array([[self.rng.randint(0, 8) for _ in range(3)]
+                           for _ in range(300)], dtype=float)
+        expected = brute_force_ranks(values)
+        fronts = non_dominated_fronts(values)
+        self.assertEqual(sum(len(front) for front in fronts), len(values))
+        for rank, front in enumerate(fronts):
+            self.assertTrue((expected[front] == rank).all())
+
+    def test_crowding_distance_matches_deap(self):
+        population = self.make_population(40)
+        front = tools.sortNondominated(population, len(population),
+                                       first_front_only=True)[0]
+        tools.emo.assignCrowdingDist(front)
+        distances = crowding_distance(
+            np.array([ind.fitness.wvalues for ind in front]))
+        np.testing.assert_allclose(
+            distances, [ind.fitness.crowding_dist for ind in front])
+
+    def test_select_returns_distinct_survivors(self):
+        population = self.make_population(200)
+        population += [population[0]] * 50
+        chosen = select_nsga2(population, 120, key=id)
+        self.assertEqual(len(chosen), 120)
+        self.assertEqual(len({id(ind) for ind in chosen}), 120)
+
+        # 與 DEAP 的 selNSGA2 選出的各層前沿數量相同
+        distinct = population[:200]
+        ranks = {id(ind): rank for rank, front in enumerate(
+            tools.sortNondominated(distinct, len(distinct))) for ind in front}
+        self.assertEqual(
+            sorted(ranks[id(ind)] for ind in chosen),
+            sorted(ranks[id(ind)] for ind in tools.selNSGA2(distinct, 120)))
+
+    def test_select_fills_with_duplicates(self):
+        population = self.make_population(10) * 3
+        self.assertEqual(len(select_nsga2(population, 25, key=id)), 25)
+
+
+class TestMuPlusLambda(unittest.TestCase):
+    def test_offspring_fill_lambda(self):
+        random.seed(1)
+        algo = NSGAIIAlgorithm(population_size=60, ngen=5, cxpb=0.7, mutpb=0.3)
+        setup_problem(algo, read_places(make_places(40, random.Random(2))))
+        algo.run()
+        # 沒有親代的複本，去除重複後每代仍接近 lambda（族群大小）個新子代
+        self.assertGreater((algo.evaluations - 60) / algo.generations, 0.9 * 60)
+
+    def test_rates_must_not_exceed_one(self):
+        with self.assertRaises(ValueError):
+            NSGAIIAlgorithm(population_size=10, ngen=1, cxpb=0.8, mutpb=0.3)
+
+
+if __name__ == '__main__':
+    unittest.main()
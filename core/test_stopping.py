@@ -0,0 +1,53 @@
+import random
+import time
+import unittest
+
+from core.algorithms import NSGAIIAlgorithm, StoppingConfig
+from core.testing import make_places, read_places, setup_problem
+
+
+class TestStoppingConfig(unittest.TestCase):
+    def setUp(self):
+        random.seed(1)
+        self.setup_args = read_places(make_places(30, random.Random(7)))
+
+    def run_algorithm(self, ngen=200, **stopping):
+        algo = NSGAIIAlgorithm(population_size=30, ngen=ngen, cxpb=0.5, mutpb=0.2,
+                               stopping=StoppingConfig(**stopping))
+        setup_problem(algo, self.setup_args)
+        started = time.perf_counter()
+        _, hof, _ = algo.run()
+        self.assertTrue(len(hof) > 0)
+        return algo, time.perf_counter() - started
+
+    def test_time_limit(self):
+        algo, elapsed = self.run_algorithm(ngen=100000, time_limit=0.5)
+        self.assertEqual(algo.stop_reason, 'time_limit')
+        self.assertLess(elapsed, 2.0)
+
+    def test_max_evaluations(self):
+        algo, _ = self.run_algorithm(max_evaluations=100)
+        self.assertEqual(algo.stop_reason, 'max_evaluations')
+        self.assertGreaterEqual(algo.evaluations, 100)
+        self.assertLess(algo.generations, 10)
+
+    def test_plateau_generations(self):
+        algo, _ = self.run_algorithm(plateau_generations=2)
+        self.assertEqual(algo.stop_reason, 'plateau')
+        self.assertLess(algo.generations, 200)
+        self.assertEqual(algo.stagnant, 2)
+
+    def test_stop_requested(self):
+        checks = []
+
+        def stop_requested():
+            checks.append(None)
+            return len(checks) > 3
+
+        algo, _ = self.run_algorithm(stop_requested=stop_requested)
+        self.assertEqual(algo.stop_reason, 'stopped')
+        self.assertEqual(algo.generations, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
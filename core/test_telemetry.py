@@ -0,0 +1,50 @@
+import unittest
+
+from deap import base, creator, tools
+
+from core.fitness_cache import FitnessCache
+from core.telemetry import Telemetry
+
+creator.create('TelemetryFitness', base.Fitness, weights=(1.0, -1.0))
+creator.create('TelemetryIndividual', list, fitness=creator.TelemetryFitness)
+
+
+class TestTelemetry(unittest.TestCase):
+    def setUp(self):
+        self.population = []
+        for value in range(10):
+            individual = creator.TelemetryIndividual([value])
+            individual.fitness.values = (float(value), float(10 - value))
+            self.population.append(individual)
+        self.hof = tools.ParetoFront()
+        self.hof.update(self.population)
+
+    def test_record_contents(self):
+        cache = FitnessCache()
+        telemetry = Telemetry()
+        telemetry.start(cache)
+        cache.hits += 3
+        with telemetry.timer('evaluate'):
+            pass
+        entry = telemetry.record(1, self.population, self.hof, 10, cache)
+
+        self.assertEqual(entry.front_size, len(self.hof))
+        self.assertEqual(entry.objective_min, (0.0, 1.0))
+        self.assertEqual(entry.objective_max, (9.0, 10.0))
+        self.assertEqual(entry.cache_hits, 3)
+        self.assertIn('evaluate', entry.timings)
+        self.assertEqual(telemetry.to_list()[0]['evaluations'], 10)
+
+    def test_sampling_and_bounded_memory(self):
+        telemetry = Telemetry(sample_every=5, max_records=3)
+        telemetry.start()
+        for generation in range(1, 31):
+            telemetry.record(generation, self.population, self.hof, 1,
+                             force=generation == 28)
+
+        generations = [entry.generation for entry in telemetry.records]
+        self.assertEqual(generations, [25, 28, 30])
+
+
+if __name__ == '__main__':
+    unittest.main()
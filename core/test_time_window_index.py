@@ -0,0 +1,53 @@
+import random
+import unittest
+from datetime import datetime
+
+from core.generate_initial_trip import Attraction
+from core.genome import Genome, GenomeCodec
+from core.time_window_index import TimeWindowIndex
+
+
+class TestTimeWindowIndex(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(5)
+        self.attractions = []
+        for i in range(200):
+            open_hour = rng.randint(6, 12)
+            close_hour = rng.randint(open_hour + 2, 23)
+            self.attractions.append(
+                Attraction(f"place_{i}",
+                           datetime.strptime(f"{open_hour:02d}:{rng.choice([0, 30])}", "%H:%M"),
+                           datetime.strptime(f"{close_hour:02d}:00", "%H:%M"),
+                           rng.choice([0.5, 1.0, 1.5, 2.0])))
+        place_index = {attraction.name: index for index, attraction in enumerate(self.attractions)}
+        self.codec = GenomeCodec(self.attractions, place_index, datetime(2024, 3, 20, 9, 0))
+        self.index = TimeWindowIndex(self.codec)
+
+    def test_query_matches_linear_scan(self):
+        codec = self.codec
+        genome = Genome([3, 17, 42, 99], [540, 660, 780, 900])
+        visited = self.index.visited(genome)
+        for start, end, max_stay in [(540, 630, 90), (700, 820, 60), (0, 60, 120),
+                                     (1200, 1380, 30), (900, 900, None)]:
+            expected = [
+                index for index in codec.attraction_indices
+                if index not in set(genome)
+                and codec.open_minutes[index] <= start
+                and codec.close_minutes[index] >= end
+                and (max_stay is None or codec.stay_minutes[index] <= max_stay)
+            ]
+            mask = self.index.query(start, end, max_stay=max_stay, exclude=visited)
+            self.assertEqual(TimeWindowIndex.indices(mask), sorted(expected))
+
+    def test_choice(self):
+        mask = self.index.query(600, 700)
+        candidates = set(TimeWindowIndex.indices(mask))
+        rng = random.Random(1)
+        chosen = {TimeWindowIndex.choice(mask, rng) for _ in range(500)}
+        self.assertTrue(chosen <= candidates)
+        self.assertGreater(len(chosen), 1)
+        self.assertIsNone(TimeWindowIndex.choice(0))
+
+
+if __name__ == '__main__':
+    unittest.main()
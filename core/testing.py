@@ -0,0 +1,37 @@
+"""測試共用的假景點資料與問題設定"""
+from core.read_from_csv import DictReader
+
+# 測試行程：每天 09:00 出發、21:00 返回，2024-11-19 至 2024-11-21 共三天
+DAILY_DEPART_TIME = "09:00"
+DAILY_RETURN_TIME = "21:00"
+DEPARTURE_DATETIME = "2024-11-19T09:00"
+RETURN_DATETIME = "2024-11-21T18:00"
+
+
+def make_places(count, rng):
+    """count 個台北附近的隨機景點，格式與 PreferenceService.search_available_places 的結果相同"""
+    categories = [['restaurant', 'food'], ['museum'], ['park'], ['cafe']]
+    return [{
+        'place_id': f"place_{i}",
+        'lat': 25.0 + rng.random() * 0.1,
+        'lng': 121.5 + rng.random() * 0.1,
+        'opening_hour': {'1': ['08:00', '22:00']},
+        'types': rng.choice(categories),
+        'price_level': rng.randint(0, 4),
+        'rating': round(rng.uniform(3.0, 5.0), 1),
+        'user_rating_totals': rng.randint(10, 5000)
+    } for i in range(count)]
+
+
+def read_places(places, stay_time=1.5):
+    """DictReader 讀取景點，回傳 (waypoint_distances, waypoint_durations, all_waypoints_set,
+    attractions, place_additional_info)"""
+    return DictReader(data=places, stay_time=stay_time).read()
+
+
+def setup_problem(target, setup_args, return_datetime=RETURN_DATETIME):
+    """以 read_places() 的結果呼叫 target.setup()，target 為 OptimizationProblem 或演算法"""
+    waypoint_distances, _, all_waypoints_set, attractions, place_additional_info = setup_args
+    target.setup(all_waypoints_set, waypoint_distances, attractions, place_additional_info,
+                 DAILY_DEPART_TIME, DAILY_RETURN_TIME, DEPARTURE_DATETIME, return_datetime)
+    return target
@@ -0,0 +1,80 @@
+import random
+from typing import Iterable, List, Optional, Tuple
+
+from core.genome import Genome, GenomeCodec, MINUTES_PER_DAY
+
+
+def _cumulative_masks(values, indices: Iterable[int], at_most: bool) -> Tuple[int, ...]:
+    """masks[m] 為值 <= m（at_most）或 >= m 的景點 bitset，m 為 0..MINUTES_PER_DAY"""
+    masks = [0] * (MINUTES_PER_DAY + 1)
+    for index in indices:
+        masks[min(max(values[index], 0), MINUTES_PER_DAY)] |= 1 << index
+    if at_most:
+        for minute in range(1, MINUTES_PER_DAY + 1):
+            masks[minute] |= masks[minute - 1]
+    else:
+        for minute in range(MINUTES_PER_DAY - 1, -1, -1):
+            masks[minute] |= masks[minute + 1]
+    return tuple(masks)
+
+
+class TimeWindowIndex:
+    """
+    景點營業時間的索引
+
+    以每分鐘一個 bitset（Python int，第 i 位代表 place_index 為 i 的景點）記錄
+    「開門時間 <= m」、「關門時間 >= m」與「停留時間 <= m」的景點，
+    查詢 [start, end] 內營業且未使用的景點只需幾次位元運算，不必掃描所有景點。
+    """
+
+    def __init__(self, codec: GenomeCodec):
+        indices = codec.attraction_indices
+        self.all = 0
+        for index in indices:
+            self.all |= 1 << index
+        self.open_by = _cumulative_masks(codec.open_minutes, indices, at_most=True)
+        self.close_by = _cumulative_masks(codec.close_minutes, indices, at_most=False)
+        self.stay_by = _cumulative_masks(codec.stay_minutes, indices, at_most=True)
+
+    @staticmethod
+    def visited(genome: Genome) -> int:
+        """個體中已使用景點的 bitset"""
+        mask = 0
+        for index in genome:
+            mask |= 1 << index
+        return mask
+
+    def query(self, start: int, end: int, max_stay: Optional[int] = None,
+              exclude: int = 0) -> int:
+        """
+        在當天 [start, end] 分鐘內營業（open <= start 且 close >= end）、
+        停留時間不超過 max_stay 且不在 exclude 中的景點 bitset
+        """
+        if start < 0 or end > MINUTES_PER_DAY or start > end:
+            return 0
+        mask = self.open_by[start] & self.close_by[end] & ~exclude
+        if max_stay is not None:
+            mask &= self.stay_by[min(max(max_stay, 0), MINUTES_PER_DAY)]
+        return mask
+
+    def unused(self, exclude: int) -> int:
+        return self.all & ~exclude
+
+    @staticmethod
+    def indices(mask: int) -> List[int]:
+        result = []
+        while mask:
+            lowest = mask & -mask
+            result.append(lowest.bit_length() - 1)
+            mask ^= lowest
+        return result
+
+    @staticmethod
+    def choice(mask: int, rng=random) -> Optional[int]:
+        """從 bitset 中隨機取一個景點索引，空集合回傳 None"""
+        count = bin(mask).count('1')
+        if count == 0:
+            return None
+        for _ in range(rng.randrange(count)):
+            mask &= mask - 1  # 移除最低位
+        return (mask & -mask).bit_length() - 1
@@ -3,7 +3,14 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import config
+from services.job_queue import JobQueue, QUICK_LANE
+from services.result_cache import ResultCache
 db = SQLAlchemy()
+# 行程規劃的背景工作佇列
+job_queue = JobQueue(max_workers=config.TRIP_PLAN_WORKERS, ttl=config.TRIP_PLAN_JOB_TTL,
+                     lanes={QUICK_LANE: config.TRIP_PLAN_QUICK_WORKERS})
+# 相同規劃請求的結果快取
+result_cache = ResultCache(max_size=config.RESULT_CACHE_SIZE, ttl=config.RESULT_CACHE_TTL)
 Base = declarative_base()
 engine = create_engine(config.DB_URL, echo=False)
 Base.metadata.create_all(engine)
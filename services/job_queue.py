@@ -0,0 +1,179 @@
+import contextvars
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+# 預設的工作 lane；其他 lane 各自有 thread pool，不會排在預設 lane 的工作後面
+DEFAULT_LANE = 'default'
+# 佇列忙碌時以快速規劃取代 GA 的工作
+QUICK_LANE = 'quick'
+
+
+class JobError(Exception):
+    """工作失敗時回報給使用者的錯誤訊息"""
+
+
+# 目前 thread 正在執行的工作，工作內可以用 current_job() 回報進度或檢查停止要求
+_current_job: contextvars.ContextVar = contextvars.ContextVar('current_job', default=None)
+
+
+def current_job() -> Optional['Job']:
+    return _current_job.get()
+
+
+@dataclass
+class Job:
+    """一個背景工作的狀態與結果"""
+    job_id: str
+    owner: Optional[str] = None  # 建立工作的使用者（session），只有擁有者可以查詢；None 時不開放查詢
+    lane: str = DEFAULT_LANE
+    status: str = QUEUED
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    progress: Optional[Dict[str, Any]] = None  # 工作最近一次回報的進度
+    version: int = 0  # 進度或狀態每次改變時加一
+    _changed: threading.Condition = field(default_factory=threading.Condition, repr=False)
+    _stop: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def report(self, progress: Dict[str, Any]):
+        """回報進度並喚醒等待中的 wait()"""
+        with self._changed:
+            self.progress = progress
+            self.version += 1
+            self._changed.notify_all()
+
+    def wait(self, version: int, timeout: Optional[float] = None) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """等到 version 之後有新的進度或狀態改變（或逾時），回傳 (version, progress)"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version or self.done, timeout)
+            return self.version, self.progress
+
+    def request_stop(self):
+        """要求工作提前結束（例如使用者接受目前的結果），由工作自行檢查 stop_requested"""
+        self._stop.set()
+
+    @property
+    def stop_requested(self) -> bool:
+        return self._stop.is_set()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """工作狀態（不含結果），用於輪詢端點"""
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'progress': self.progress,
+            'stop_requested': self.stop_requested
+        }
+
+
+class JobQueue:
+    """
+    行程內（in-process）的工作佇列
+
+    submit() 立即回傳工作 ID，工作由 max_workers 個 thread 在背景執行，
+    請求處理的 thread 不必等待。完成超過 ttl 秒的工作會在下次 submit() 時清除。
+    lanes 指定其他 lane 的 worker 數（例如 {'quick': 1}），各 lane 使用獨立的 thread pool。
+    """
+
+    def __init__(self, max_workers: int = 2, ttl: float = 3600,
+                 lanes: Optional[Dict[str, int]] = None):
+        self.max_workers = max_workers
+        self.ttl = ttl
+        self.lanes = {DEFAULT_LANE: max_workers, **(lanes or {})}
+        self.__jobs: Dict[str, Job] = {}
+        self.__lock = threading.Lock()
+        self.__executors: Dict[str, ThreadPoolExecutor] = {}
+
+    def submit(self, func: Callable, *args, owner: Optional[str] = None,
+               lane: str = DEFAULT_LANE, **kwargs) -> str:
+        """將 func(*args, **kwargs) 加入 lane 的佇列，回傳工作 ID"""
+        if lane not in self.lanes:
+            raise ValueError(f"未知的工作 lane: {lane}")
+        job = Job(job_id=uuid.uuid4().hex, owner=owner, lane=lane)
+        with self.__lock:
+            self.__evict_expired()
+            self.__jobs[job.job_id] = job
+            executor = self.__executors.get(lane)
+            if executor is None:
+                # 第一次使用時才建立 thread pool
+                executor = ThreadPoolExecutor(max_workers=self.lanes[lane],
+                                              thread_name_prefix=f'job-{lane}')
+                self.__executors[lane] = executor
+        executor.submit(self.__run, job, func, args, kwargs)
+        return job.job_id
+
+    def get(self, job_id: str, owner: Optional[str] = None) -> Optional[Job]:
+        """取得工作；owner 不符或工作沒有擁有者（例如背景更新快取）時視為不存在"""
+        with self.__lock:
+            job = self.__jobs.get(job_id)
+        if job is None or job.owner is None or job.owner != owner:
+            return None
+        return job
+
+    @property
+    def saturated(self) -> bool:
+        """預設 lane 尚未完成的工作數已達 worker 數，新的工作必須排隊等待"""
+        with self.__lock:
+            return sum(not job.done for job in self.__jobs.values()
+                       if job.lane == DEFAULT_LANE) >= self.max_workers
+
+    def shutdown(self, wait: bool = True):
+        with self.__lock:
+            executors, self.__executors = list(self.__executors.values()), {}
+        for executor in executors:
+            executor.shutdown(wait=wait)
+
+    def __run(self, job: Job, func: Callable, args, kwargs):
+        job.started_at = time.time()
+        self.__set_status(job, RUNNING)
+        token = _current_job.set(job)
+        status = FAILED
+        try:
+            job.result = func(*args, **kwargs)
+            status = SUCCEEDED
+        except JobError as e:
+            job.error = str(e)
+        except Exception as e:
+            logger.exception(f"工作 {job.job_id} 執行錯誤")
+            job.error = f'系統錯誤：{str(e)}'
+        finally:
+            _current_job.reset(token)
+            job.finished_at = time.time()
+            self.__set_status(job, status)
+
+    @staticmethod
+    def __set_status(job: Job, status: str):
+        with job._changed:
+            job.status = status
+            job.version += 1
+            job._changed.notify_all()
+
+    def __evict_expired(self):
+        now = time.time()
+        expired = [job_id for job_id, job in self.__jobs.items()
+                   if job.done and now - job.finished_at > self.ttl]
+        for job_id in expired:
+            del self.__jobs[job_id]
@@ -2,7 +2,7 @@ from typing import Dict, Any, Set, Tuple, List, Optional
 import logging
 import re
 from datetime import datetime, timedelta
-from sqlalchemy import and_
+from sqlalchemy import and_, func
 from extensions import db
 from api.google_places import GooglePlacesAPI
 from models import (
@@ -283,6 +283,22 @@ class PlaceService:
             logger.error(f"處理營業時間時發生錯誤: {str(e)}")
             raise
 
+    def candidate_version(self, city_id: int) -> str:
+        """
+        城市候選景點集合的版本，景點新增或資料更新時改變（用於結果快取的 key）
+
+        Args:
+            city_id: 城市ID
+
+        Returns:
+            str: 景點數量與最後更新時間組成的版本字串
+        """
+        count, last_updated = self.db.query(
+            func.count(PlaceInfos.place_id),
+            func.max(PlaceInfos.place_last_updated)
+        ).filter(PlaceInfos.city == city_id).one()
+        return f"{count}:{last_updated.isoformat() if last_updated else ''}"
+
     def get_available_places(self, city_id: int, keyword_ids: Set[int],
                          start_datetime: str, end_datetime: str) -> Dict[str, Dict[str, Any]]:
         """
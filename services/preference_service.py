@@ -40,18 +40,7 @@ class PreferenceService:
             new_preference = self._save_preference(form_data)
 
             # 如果有使用者ID，建立使用者與偏好設定的關聯
-            if user_id:
-                if hasattr(user_id, 'u_id'):  # 如果傳入的是UserInfos物件
-                    user_uuid = str(user_id.u_id)
-                else:  # 如果傳入的是字串
-                    user_uuid = str(user_id)
-
-                user_preference = UserInfosPreference(
-                    u_id=uuid.UUID(user_uuid),  # 轉換為UUID物件
-                    p_id=new_preference.p_id
-                )
-                self.db.add(user_preference)
-                logger.info(f"Created association between user {user_id} and preference {new_preference.p_id}")
+            self._associate_user(new_preference, user_id)
 
             # 獲取CityInfos
             city_info = self.db.query(CityInfosMapping).filter_by(
@@ -72,6 +61,45 @@ class PreferenceService:
             logger.error(f"儲存偏好設定時發生錯誤: {str(e)}")
             raise
 
+    def save_preference(self, form_data: Dict[str, Any],
+                        user_id: Optional[str] = None) -> Preference:
+        """
+        只儲存偏好設定與使用者關聯，不向 Google 取得地點資訊（行程由結果快取取得時使用）
+
+        Args:
+            form_data: 表單資料
+            user_id: 使用者ID (選填)
+
+        Returns:
+            Preference: 新建立的偏好設定實例
+        """
+        try:
+            new_preference = self._save_preference(form_data)
+            self._associate_user(new_preference, user_id)
+            self.db.commit()
+            return new_preference
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"儲存偏好設定時發生錯誤: {str(e)}")
+            raise
+
+    def _associate_user(self, preference: Preference, user_id: Optional[str]) -> None:
+        """建立使用者與偏好設定的關聯，沒有使用者ID時略過"""
+        if not user_id:
+            return
+        if hasattr(user_id, 'u_id'):  # 如果傳入的是UserInfos物件
+            user_uuid = str(user_id.u_id)
+        else:  # 如果傳入的是字串
+            user_uuid = str(user_id)
+
+        user_preference = UserInfosPreference(
+            u_id=uuid.UUID(user_uuid),  # 轉換為UUID物件
+            p_id=preference.p_id
+        )
+        self.db.add(user_preference)
+        logger.info(f"Created association between user {user_id} and preference {preference.p_id}")
+
     def _save_preference(self, form_data: Dict[str, Any]) -> Preference:
         """儲存偏好設定到資料庫"""
         try:
@@ -0,0 +1,84 @@
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# 不影響規劃結果的表單欄位
+IGNORED_FIELDS = {'p_name'}
+
+
+class ResultCache:
+    """
+    相同規劃請求的結果快取
+
+    key 由正規化後的 form_data（pre_process_form_data 的結果）與候選景點集合的版本組成。
+    超過 ttl 秒的結果視為過期，超過 max_size 筆時移除最久未使用的結果；max_size 為 0 時停用。
+    """
+
+    def __init__(self, max_size: int = 200, ttl: float = 6 * 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.__entries: OrderedDict = OrderedDict()  # key -> (儲存時間, 結果)
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def key(form_data: Dict[str, Any], candidate_version: str) -> str:
+        """form_data 的正規化雜湊：忽略行程名稱，關鍵字去除重複並排序"""
+        normalized = {
+            field: value for field, value in form_data.items()
+            if field not in IGNORED_FIELDS and field != 'place_types_keywords'
+        }
+        normalized['place_types_keywords'] = {
+            str(type_id): sorted(set(keywords))
+            for type_id, keywords in form_data.get('place_types_keywords', {}).items()
+            if keywords
+        }
+        payload = json.dumps([normalized, candidate_version], sort_keys=True,
+                             ensure_ascii=False, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """回傳結果的複本，不存在或已過期時回傳 None"""
+        if not self.enabled:
+            return None
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and time.time() - entry[0] > self.ttl:
+                del self.__entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            value = entry[1]
+        # 呼叫端會修改結果（例如填入新的偏好 uuid），因此回傳複本
+        return copy.deepcopy(value)
+
+    def put(self, key: str, value: Dict[str, Any]):
+        if not self.enabled:
+            return
+        value = copy.deepcopy(value)
+        with self.__lock:
+            self.__entries[key] = (time.time(), value)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.__entries)
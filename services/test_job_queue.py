@@ -0,0 +1,141 @@
+import threading
+import time
+import unittest
+
+from services.job_queue import JobQueue, JobError, SUCCEEDED, FAILED, RUNNING, QUICK_LANE, current_job
+
+
+def wait_done(job, timeout=5.0):
+    """等到工作結束，逾時則測試失敗"""
+    deadline = time.time() + timeout
+    while not job.done and time.time() < deadline:
+        job.wait(job.version, timeout=0.1)
+    return job.done
+
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.queue = JobQueue(max_workers=1)
+
+    def tearDown(self):
+        self.queue.shutdown()
+
+    def test_submit_returns_result(self):
+        job_id = self.queue.submit(lambda a, b=0: a + b, 1, b=2, owner='alice')
+        job = self.queue.get(job_id, owner='alice')
+        self.assertTrue(wait_done(job))
+        self.assertEqual(job.status, SUCCEEDED)
+        self.assertEqual(job.result, 3)
+        self.assertIsNone(job.error)
+        self.assertLessEqual(job.started_at, job.finished_at)
+        self.assertNotIn('result', job.to_dict())
+
+    def test_progress_wakes_waiters(self):
+        release = threading.Event()
+
+        def work():
+            job = current_job()
+            job.report({'stage': 'plan', 'generation': 1})
+            release.wait(5)
+            return 'ok'
+
+        job = self.queue.get(self.queue.submit(work, owner='alice'), owner='alice')
+        # 工作開始（RUNNING）與第一次進度各使版本加一
+        version, progress = 0, None
+        for _ in range(2):
+            if progress is None:
+                version, progress = job.wait(version, timeout=5)
+        self.assertEqual(job.status, RUNNING)
+        self.assertEqual(progress, {'stage': 'plan', 'generation': 1})
+
+        # 沒有新進度時等到逾時，版本不變
+        self.assertEqual(job.wait(version, timeout=0.05)[0], version)
+        release.set()
+        self.assertTrue(wait_done(job))
+        self.assertGreater(job.version, version)
+        self.assertIsNone(current_job())
+
+    def test_only_owner_can_get_job(self):
+        job_id = self.queue.submit(lambda: None, owner='alice')
+        self.assertIsNotNone(self.queue.get(job_id, owner='alice'))
+        self.assertIsNone(self.queue.get(job_id, owner='bob'))
+        self.assertIsNone(self.queue.get(job_id))
+        self.assertIsNone(self.queue.get('missing', owner='alice'))
+
+        # 沒有擁有者的工作（背景更新快取）任何人都無法查詢
+        hidden = self.queue.submit(lambda: None)
+        self.assertIsNone(self.queue.get(hidden))
+        self.assertIsNone(self.queue.get(hidden, owner='alice'))
+
+    def test_errors_are_reported(self):
+        def refuse():
+            raise JobError('無法找到符合條件的地點')
+
+        def crash():
+            raise ValueError('boom')
+
+        job = self.queue.get(self.queue.submit(refuse, owner='alice'), owner='alice')
+        self.assertTrue(wait_done(job))
+        self.assertEqual(job.status, FAILED)
+        self.assertEqual(job.error, '無法找到符合條件的地點')
+
+        job = self.queue.get(self.queue.submit(crash, owner='alice'), owner='alice')
+        self.assertTrue(wait_done(job))
+        self.assertEqual(job.status, FAILED)
+        self.assertEqual(job.error, '系統錯誤：boom')
+
+    def test_stop_request_is_visible_to_job(self):
+        def work():
+            job = current_job()
+            deadline = time.time() + 5
+            while not job.stop_requested and time.time() < deadline:
+                time.sleep(0.01)
+            return job.stop_requested
+
+        job = self.queue.get(self.queue.submit(work, owner='alice'), owner='alice')
+        job.request_stop()
+        self.assertTrue(wait_done(job))
+        self.assertIs(job.result, True)
+        self.assertTrue(job.to_dict()['stop_requested'])
+
+    def test_saturated_while_workers_are_busy(self):
+        release = threading.Event()
+        self.assertFalse(self.queue.saturated)
+        job_id = self.queue.submit(release.wait, 5, owner='alice')
+        self.assertTrue(self.queue.saturated)
+        release.set()
+        self.assertTrue(wait_done(self.queue.get(job_id, owner='alice')))
+        self.assertFalse(self.queue.saturated)
+
+    def test_lanes_do_not_wait_for_each_other(self):
+        queue = JobQueue(max_workers=1, lanes={QUICK_LANE: 1})
+        release = threading.Event()
+        self.addCleanup(queue.shutdown)
+        self.addCleanup(release.set)
+        queue.submit(release.wait, 5, owner='alice')
+        self.assertTrue(queue.saturated)
+
+        # 預設 lane 忙碌時 quick lane 的工作仍會執行，且不計入 saturated
+        job_id = queue.submit(lambda: 'quick', owner='alice', lane=QUICK_LANE)
+        job = queue.get(job_id, owner='alice')
+        self.assertTrue(wait_done(job))
+        self.assertEqual((job.lane, job.result), (QUICK_LANE, 'quick'))
+        self.assertTrue(queue.saturated)
+
+        with self.assertRaises(ValueError):
+            queue.submit(lambda: None, lane='missing')
+
+    def test_finished_jobs_expire_after_ttl(self):
+        queue = JobQueue(max_workers=1, ttl=0.05)
+        self.addCleanup(queue.shutdown)
+        old = queue.submit(lambda: None, owner='alice')
+        self.assertTrue(wait_done(queue.get(old, owner='alice')))
+        time.sleep(0.1)
+        # 過期的工作在下一次 submit() 時清除
+        new = queue.submit(lambda: None, owner='alice')
+        self.assertIsNone(queue.get(old, owner='alice'))
+        self.assertIsNotNone(queue.get(new, owner='alice'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import time
+import unittest
+
+from services.result_cache import ResultCache
+
+FORM_DATA = {
+    'p_name': '台北三日遊',
+    'city': 1,
+    'budget': 3000,
+    'place_types_keywords': {'1': ['museum', 'park', 'museum'], '2': []},
+    'departure_datetime': '2024-11-19T09:00',
+    'return_datetime': '2024-11-21T18:00'
+}
+
+
+class TestResultCacheKey(unittest.TestCase):
+    def test_ignores_name_and_keyword_order(self):
+        key = ResultCache.key(FORM_DATA, 'v1')
+        same = dict(FORM_DATA, p_name='另一個名稱',
+                    place_types_keywords={1: ['park', 'museum']})
+        self.assertEqual(key, ResultCache.key(same, 'v1'))
+
+    def test_depends_on_planning_fields_and_candidates(self):
+        key = ResultCache.key(FORM_DATA, 'v1')
+        self.assertNotEqual(key, ResultCache.key(FORM_DATA, 'v2'))
+        self.assertNotEqual(key, ResultCache.key(dict(FORM_DATA, budget=5000), 'v1'))
+        self.assertNotEqual(key, ResultCache.key(
+            dict(FORM_DATA, place_types_keywords={'1': ['museum']}), 'v1'))
+
+
+class TestResultCache(unittest.TestCase):
+    def test_returns_isolated_copies(self):
+        cache = ResultCache()
+        value = {'journey_data': {'form_data': {'uuid': 'a'}}}
+        cache.put('key', value)
+        value['journey_data']['form_data']['uuid'] = 'changed'
+
+        first = cache.get('key')
+        self.assertEqual(first['journey_data']['form_data']['uuid'], 'a')
+        first['journey_data']['form_data']['uuid'] = 'b'
+        self.assertEqual(cache.get('key')['journey_data']['form_data']['uuid'], 'a')
+        self.assertEqual((cache.hits, cache.misses), (2, 0))
+
+    def test_expires_after_ttl(self):
+        cache = ResultCache(ttl=0.05)
+        cache.put('key', {'value': 1})
+        self.assertIsNotNone(cache.get('key'))
+        time.sleep(0.1)
+        self.assertIsNone(cache.get('key'))
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.misses, 1)
+
+    def test_evicts_least_recently_used(self):
+        cache = ResultCache(max_size=2)
+        cache.put('a', {'value': 'a'})
+        cache.put('b', {'value': 'b'})
+        cache.get('a')  # a 成為最近使用
+        cache.put('c', {'value': 'c'})
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), {'value': 'a'})
+        self.assertEqual(cache.get('c'), {'value': 'c'})
+
+    def test_disabled_when_size_is_zero(self):
+        cache = ResultCache(max_size=0)
+        self.assertFalse(cache.enabled)
+        cache.put('key', {'value': 1})
+        self.assertIsNone(cache.get('key'))
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,6 +5,7 @@ const TOURIST_FOOD_TYPE_MIN = 5;
 const TOURIST_FOOD_TYPE_MAX = 10;
 const MAX_TRIP_DAYS = 3;
 const MAX_MONTHS_AHEAD = 1;
+const JOB_POLL_INTERVAL = 2000;  // 輪詢規劃工作狀態的間隔（毫秒）
 
 // 表單初始化
 function initializeForm() {
@@ -429,7 +430,7 @@ function initializeFormSubmission() {
 
         // 只有當所有驗證都通過時才提交
         if (isBasicInfoValid && isTimeValid && isTypeSelectionsValid) {
-            form.submit();
+            submitTripPlan(form);
         } else {
             // 滾動到第一個錯誤元素
             const firstError = form.querySelector('.is-invalid') ||
@@ -441,6 +442,111 @@ function initializeFormSubmission() {
     });
 }
 
+// 以背景工作規劃行程：送出表單後輪詢工作狀態，完成時前往結果頁面
+async function submitTripPlan(form) {
+    const submitButton = form.querySelector('button[type="submit"]');
+    if (submitButton) {
+        submitButton.disabled = true;
+        submitButton.textContent = '行程規劃中...';
+    }
+
+    try {
+        const response = await fetch(form.action, {
+            method: 'POST',
+            body: new FormData(form),
+            headers: { 'Accept': 'application/json' }
+        });
+        const contentType = response.headers.get('Content-Type') || '';
+        if (!contentType.includes('application/json')) {
+            // 表單驗證失敗時伺服器回傳含錯誤訊息的首頁
+            document.open();
+            document.write(await response.text());
+            document.close();
+            return;
+        }
+        const job = await response.json();
+        if (job.cached) {
+            // 相同的請求已有規劃好的行程
+            window.location.href = job.result_url;
+            return;
+        }
+        if (window.EventSource) {
+            watchTripPlanJob(job, submitButton);
+        } else {
+            pollTripPlanJob(job.status_url, job.result_url);
+        }
+    } catch (error) {
+        alert('行程規劃請求失敗，請稍後再試');
+        if (submitButton) {
+            submitButton.disabled = false;
+            submitButton.textContent = '開始規劃旅程';
+        }
+    }
+}
+
+// 以 SSE 接收規劃進度，並提供「接受目前結果」按鈕提前結束 GA
+function watchTripPlanJob(job, submitButton) {
+    const source = new EventSource(job.events_url);
+    const acceptButton = createAcceptButton(job.stop_url, submitButton);
+
+    source.addEventListener('progress', (event) => {
+        const progress = JSON.parse(event.data);
+        if (!submitButton) {
+            return;
+        }
+        if (progress.stage === 'search_places') {
+            submitButton.textContent = '搜尋景點中...';
+        } else if (progress.stage === 'routes') {
+            submitButton.textContent = '規劃交通路線中...';
+        } else if (progress.generation !== undefined) {
+            const best = progress.best;
+            submitButton.textContent = `行程規劃中：第 ${progress.generation} 代，` +
+                `${progress.front_size} 個候選行程` +
+                (best ? `，最佳行程 ${best.place_count} 個景點、${best.trip_length.toFixed(1)} 公里` : '');
+            acceptButton.hidden = false;
+        }
+    });
+    source.addEventListener('done', (event) => {
+        source.close();
+        window.location.href = JSON.parse(event.data).result_url;
+    });
+    source.onerror = () => {
+        // 連線中斷時改為輪詢
+        source.close();
+        pollTripPlanJob(job.status_url, job.result_url);
+    };
+}
+
+function createAcceptButton(stopUrl, submitButton) {
+    const button = document.createElement('button');
+    button.type = 'button';
+    button.className = 'btn btn-outline-secondary ms-2';
+    button.textContent = '接受目前結果';
+    button.hidden = true;
+    button.addEventListener('click', () => {
+        button.disabled = true;
+        fetch(stopUrl, { method: 'POST', headers: { 'Accept': 'application/json' } });
+    });
+    if (submitButton) {
+        submitButton.insertAdjacentElement('afterend', button);
+    }
+    return button;
+}
+
+function pollTripPlanJob(statusUrl, resultUrl) {
+    fetch(statusUrl, { headers: { 'Accept': 'application/json' } })
+        .then(response => response.json())
+        .then(job => {
+            if (job.status === 'queued' || job.status === 'running') {
+                setTimeout(() => pollTripPlanJob(statusUrl, resultUrl), JOB_POLL_INTERVAL);
+            } else {
+                // 成功時結果頁面會顯示行程，失敗時回到首頁顯示錯誤訊息
+                window.location.href = resultUrl;
+            }
+        })
+        .catch(() => setTimeout(() => pollTripPlanJob(statusUrl, resultUrl), JOB_POLL_INTERVAL));
+}
+
 // 清除之前的驗證狀態，確保正確重置時間驗證狀態
 function clearValidationStates() {
     const form = document.getElementById('tripPlannerForm');